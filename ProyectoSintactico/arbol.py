@@ -0,0 +1,86 @@
+# Arbol sintactico que construye AnalizadorSintactico(construir_ast=True).
+# Un solo tipo de nodo generico: 'tipo' es uno de TIPOS_NODO, 'valor' guarda el
+# lexema que distingue al nodo (nombre, operador, literal) y 'hijos' sus subarboles.
+#
+#   programa    hijos: sentencias
+#   funcion     valor: nombre            hijos: parametros, bloque
+#   parametros  hijos: parametro*        (tambien los de lambda, sin tipo)
+#   parametro   valor: nombre            hijos: tipo?
+#   tipo        valor: nombre            (tipo_lista: [nombre])
+#   bloque      hijos: sentencias
+#   if          hijos: rama+, bloque?    (rama: condicion, bloque; el bloque final es el else)
+#   while       hijos: condicion, bloque
+#   for         valor: variable          hijos: iterable, bloque
+#   pass / break / continue
+#   return      hijos: expresion?
+#   print       hijos: argumentos
+#   asignacion  hijos: destino+, valor
+#   expresion   hijos: expresion         (sentencia formada por una expresion)
+#
+#   nombre / numero / cadena / constante valor: lexema
+#   binaria     valor: operador          hijos: izquierda, derecha
+#   unaria      valor: operador          hijos: operando
+#   llamada     hijos: funcion, argumentos*
+#   subindice   hijos: valor, indice
+#   atributo    valor: nombre            hijos: valor
+#   lista / tupla                        hijos: elementos
+#   lambda      hijos: parametros, cuerpo
+#   generador   hijos: elemento, comp_for+
+#   comp_for    valor: variable          hijos: iterable, condiciones*
+
+TIPOS_NODO = (
+    "programa", "funcion", "parametros", "parametro", "tipo", "tipo_lista", "bloque", "if", "rama",
+    "while", "for", "pass", "break", "continue", "return", "print", "asignacion", "expresion",
+    "nombre", "numero", "cadena", "constante", "binaria", "unaria", "llamada", "subindice",
+    "atributo", "lista", "tupla", "lambda", "generador", "comp_for",
+)
+
+
+class Nodo:
+    # sin __dict__ por instancia, igual que Token
+    __slots__ = ("tipo", "valor", "hijos", "linea", "col")
+
+    def __init__(self, tipo, valor=None, hijos=None, linea=0, col=0):
+        self.tipo = tipo
+        self.valor = valor
+        self.hijos = hijos if hijos is not None else []
+        self.linea = linea
+        self.col = col
+
+    def __repr__(self):
+        return f"Nodo({self.tipo!r},{self.valor!r},{len(self.hijos)} hijos,{self.linea},{self.col})"
+
+    def __eq__(self, otro):
+        # igualdad estructural (incluye posiciones), sin recursion
+        pendientes = [(self, otro)]
+        while pendientes:
+            a, b = pendientes.pop()
+            if not isinstance(b, Nodo):
+                return False
+            if (a.tipo, a.valor, a.linea, a.col, len(a.hijos)) != (b.tipo, b.valor, b.linea, b.col, len(b.hijos)):
+                return False
+            pendientes.extend(zip(a.hijos, b.hijos))
+        return True
+
+    __hash__ = None
+
+
+def recorrer(nodo):
+    # preorden sin recursion
+    pendientes = [nodo]
+    while pendientes:
+        n = pendientes.pop()
+        yield n
+        pendientes.extend(reversed(n.hijos))
+
+
+def volcar(nodo):
+    # texto indentado, un nodo por linea
+    lineas = []
+    pendientes = [(nodo, 0)]
+    while pendientes:
+        n, nivel = pendientes.pop()
+        valor = f" {n.valor}" if n.valor is not None else ""
+        lineas.append(f"{'  ' * nivel}{n.tipo}{valor} <{n.linea},{n.col}>")
+        pendientes.extend((h, nivel + 1) for h in reversed(n.hijos))
+    return "\n".join(lineas)
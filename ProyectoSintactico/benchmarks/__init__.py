@@ -0,0 +1,2 @@
+# Benchmarks del analizador. Ejecutar desde la carpeta ProyectoSintactico:
+#   python -m benchmarks.bench_escaner
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from lexer import Scanner
+from benchmarks.escaner_original import ScannerOriginal
+
+PLANTILLA = '''# funcion {n}
+def calcular_{n}(items:[int], x:int):
+    total = 0
+    for v in items:
+        if v >= x and not v == {n}:
+            total = total + v * 2 - (x % 3)
+        else:
+            print("valor descartado: ", v)
+    return total
+'''
+
+
+def generar_fuente(kb):
+    partes = []
+    tam = 0
+    n = 0
+    while tam < kb * 1024:
+        bloque = PLANTILLA.format(n=n)
+        partes.append(bloque)
+        tam += len(bloque)
+        n += 1
+    return "".join(partes)
+
+
+def medir(texto, crear, repeticiones):
+    mejor = None
+    tokens = None
+    for _ in range(repeticiones):
+        sc = crear(texto)
+        t0 = time.perf_counter()
+        sc.analizar()
+        dt = time.perf_counter() - t0
+        mejor = dt if mejor is None else min(mejor, dt)
+        tokens = sc.tokens
+    return mejor, tokens
+
+
+def firma(tokens):
+    return [(t.tipo, t.lexema, t.linea, t.col) for t in tokens]
+
+
+# 'original' es la cadena de automatas tal como era antes del modo tabla (copia fija en
+# benchmarks/escaner_original.py); 'afd' es la misma cadena con los cambios posteriores
+ESCANERES = (
+    ("original", ScannerOriginal),
+    ("afd", lambda texto: Scanner(texto, modo="afd")),
+    ("tabla", lambda texto: Scanner(texto, modo="tabla")),
+)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench_escaner",
+                                 description="Escaner original, modo afd y modo tabla sobre la misma fuente.")
+    ap.add_argument("--kb", type=int, default=512)
+    ap.add_argument("--repeticiones", type=int, default=3)
+    args = ap.parse_args()
+    texto = generar_fuente(args.kb)
+
+    resultados = [(nombre, *medir(texto, crear, args.repeticiones)) for nombre, crear in ESCANERES]
+    t_original, toks_original = resultados[0][1], resultados[0][2]
+    referencia = firma(resultados[-1][2])
+
+    print(f"Fuente: {len(texto) / 1024:.0f} KB, {len(toks_original)} tokens")
+    for nombre, dt, toks in resultados:
+        print(f"  {nombre:<8}: {dt:.3f} s  ({len(toks) / dt:,.0f} tokens/s)  x{t_original / dt:.1f} "
+              f"frente al original  tokens identicos a tabla: {firma(toks) == referencia}")
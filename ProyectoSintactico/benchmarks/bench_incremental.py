@@ -0,0 +1,53 @@
+import io
+import sys
+import time
+
+from incremental import SesionIncremental
+from parser import analizar_texto
+from benchmarks.bench_escaner import PLANTILLA
+
+
+def generar_lineas(n_lineas):
+    bloques = []
+    n = 0
+    while len(bloques) * PLANTILLA.count("\n") < n_lineas:
+        bloques.append(PLANTILLA.format(n=n))
+        n += 1
+    return "".join(bloques)
+
+
+def cronometrar(f):
+    t0 = time.perf_counter()
+    r = f()
+    return time.perf_counter() - t0, r
+
+
+if __name__ == "__main__":
+    n_lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    texto = generar_lineas(n_lineas)
+    medio = texto.count("\n") // 2
+    # linea "    total = 0" de la funcion que cae a la mitad del archivo
+    lineas = texto.split("\n")
+    while not lineas[medio - 1].startswith("    total = 0"):
+        medio += 1
+
+    t_completo, _ = cronometrar(lambda: analizar_texto(texto, io.StringIO()))
+    t_sesion, s = cronometrar(lambda: SesionIncremental(texto))
+    print(f"Archivo: {texto.count(chr(10))} lineas")
+    print(f"  analisis completo      : {t_completo * 1000:8.1f} ms")
+    print(f"  apertura de la sesion  : {t_sesion * 1000:8.1f} ms")
+
+    ediciones = [
+        ("escribir un caracter", (medio, 13, medio, 13, "1")),
+        ("borrar un caracter", (medio, 13, medio, 14, "")),
+        ("romper la sintaxis", (medio, 13, medio, 14, ":")),
+        ("arreglar la sintaxis", (medio, 13, medio, 14, "0")),
+        ("insertar una linea", (medio, 1, medio, 1, "    extra = 1\n")),
+        ("borrar esa linea", (medio, 1, medio + 1, 1, "")),
+    ]
+    for nombre, edicion in ediciones:
+        dt, res = cronometrar(lambda: s.editar(*edicion))
+        esperado = io.StringIO()
+        analizar_texto(s.texto, esperado)
+        ok = res == esperado.getvalue()
+        print(f"  {nombre:22s}: {dt * 1000:8.2f} ms  ({dt / t_completo:6.2%} del completo)  igual: {ok}")
@@ -0,0 +1,57 @@
+import argparse
+import gc
+import tracemalloc
+
+from lexer import Scanner
+from benchmarks.bench_escaner import generar_fuente
+
+
+class TokenConDict:
+    # Token tal como era antes de __slots__, como referencia
+    def __init__(self, tipo, lexema, linea, col):
+        self.tipo = tipo
+        self.lexema = lexema
+        self.linea = linea
+        self.col = col
+
+
+def medir(construir):
+    gc.collect()
+    tracemalloc.start()
+    tokens = construir()
+    usado = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(tokens), usado
+
+
+def con_dict(texto):
+    sc = Scanner(texto, modo="tabla")
+    sc.analizar()
+    return [TokenConDict(t.tipo, t.lexema[:], t.linea, t.col) for t in sc.tokens]
+
+
+def con_slots(texto):
+    sc = Scanner(texto, modo="tabla")
+    sc.analizar()
+    return sc.tokens
+
+
+def compacto(texto):
+    sc = Scanner(texto, modo="tabla", compacto=True)
+    sc.analizar()
+    return sc.tokens
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench_memoria",
+                                 description="Memoria de los tokens: objetos con __dict__, con __slots__ y TokenArray.")
+    ap.add_argument("--kb", type=int, default=1024)
+    args = ap.parse_args()
+    texto = generar_fuente(args.kb)
+    print(f"Fuente: {len(texto) / 1024:.0f} KB (el texto fuente no se cuenta)")
+    for nombre, construir in (("Token con __dict__", con_dict),
+                              ("Token con __slots__", con_slots),
+                              ("TokenArray", compacto)):
+        n, usado = medir(lambda: construir(texto))
+        mb = usado / (1024 * 1024)
+        print(f"  {nombre:20s}: {mb:8.2f} MB  {usado / n:6.1f} B/token  {n / mb:12,.0f} tokens/MB")
@@ -0,0 +1,44 @@
+import argparse
+import io
+import time
+
+from lexer import Scanner
+from parser import AnalizadorSintactico
+from benchmarks.bench_escaner import generar_fuente
+from benchmarks.parser_original import ParserOriginal
+
+# Parser actual (decide sobre codigos enteros de token) frente a la copia fija del parser
+# que decidia comparando cadenas (benchmarks/parser_original.py), sobre los mismos tokens.
+# Se mide solo programa(), sin escribir el resultado.
+
+
+def medir(tokens, repeticiones, clase=AnalizadorSintactico):
+    mejor = None
+    for _ in range(repeticiones):
+        p = clase(tokens, salida=io.StringIO())
+        t0 = time.perf_counter()
+        p.programa()
+        dt = time.perf_counter() - t0
+        mejor = dt if mejor is None else min(mejor, dt)
+    return mejor
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench_parser",
+                                 description="Parser con codigos enteros frente al parser original con cadenas.")
+    ap.add_argument("--kb", type=int, default=512)
+    ap.add_argument("--repeticiones", type=int, default=3)
+    args = ap.parse_args()
+    sc = Scanner(generar_fuente(args.kb), modo="tabla")
+    sc.analizar()
+    n = len(sc.tokens)
+    # alternados en cada repeticion, para que el ruido afecte a los dos
+    cadenas = enteros = None
+    for _ in range(args.repeticiones):
+        dt = medir(sc.tokens, 1, ParserOriginal)
+        cadenas = dt if cadenas is None else min(cadenas, dt)
+        dt = medir(sc.tokens, 1)
+        enteros = dt if enteros is None else min(enteros, dt)
+    print(f"Parser: {n} tokens")
+    print(f"  cadenas (original): {cadenas:.3f} s ({n / cadenas:,.0f} tokens/s)")
+    print(f"  codigos enteros   : {enteros:.3f} s ({n / enteros:,.0f} tokens/s)  x{cadenas / enteros:.2f}")
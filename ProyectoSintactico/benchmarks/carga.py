@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import io
+import sys
+import time
+
+from parser import analizar_texto
+from servicio import ServicioAsincrono
+from benchmarks.generador import PERFILES, generar_programa
+
+# Prueba de carga local de ServicioAsincrono: 'concurrencia' clientes envian en total
+# 'peticiones' programas (un tercio con un error) y se informa la latencia por peticion
+# (desde que el cliente la envia, incluida la espera por contrapresion).
+
+
+def percentil(ordenados, p):
+    # rango mas cercano
+    if not ordenados:
+        return 0.0
+    k = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[k]
+
+
+def preparar_programas(cantidad, kb, perfil):
+    programas = []
+    for i in range(cantidad):
+        error = (None, "sintactico", "lexico")[i % 3]
+        texto = generar_programa(kb, error=error, semilla=i, **PERFILES[perfil])
+        # la mitad llega como bytes, como en un servicio web
+        programas.append(texto.encode("utf-8") if i % 2 else texto)
+    return programas
+
+
+async def carga(servicio, programas, peticiones, concurrencia):
+    latencias = []
+    resultados = {}
+    pendientes = iter(range(peticiones))
+
+    async def cliente():
+        for i in pendientes:
+            fuente = programas[i % len(programas)]
+            t0 = time.perf_counter()
+            r = await servicio.analizar(fuente)
+            latencias.append(time.perf_counter() - t0)
+            resultados[i % len(programas)] = r
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    return latencias, resultados, time.perf_counter() - t0
+
+
+def verificar(programas, resultados):
+    # cada programa debe dar el mismo texto que el analisis secuencial
+    malos = 0
+    for i, r in resultados.items():
+        fuente = programas[i]
+        texto = fuente.decode("utf-8") if isinstance(fuente, bytes) else fuente
+        esperado = io.StringIO()
+        analizar_texto(texto, esperado)
+        malos += r.texto() != esperado.getvalue()
+    return malos
+
+
+async def principal(args):
+    programas = preparar_programas(args.programas, args.kb, args.perfil)
+    async with ServicioAsincrono(args.trabajadores, args.max_pendientes, procesos=args.procesos) as servicio:
+        # calentamiento: arranque de hilos/procesos
+        await asyncio.gather(*(servicio.analizar(p) for p in programas[:servicio.trabajadores]))
+        latencias, resultados, total = await carga(servicio, programas, args.peticiones, args.concurrencia)
+    latencias.sort()
+    ejecutor = "procesos" if args.procesos else "hilos"
+    print(f"{args.peticiones} peticiones de {args.kb} KB ({args.perfil}), concurrencia {args.concurrencia}, "
+          f"{servicio.trabajadores} {ejecutor}, max. pendientes {servicio.max_pendientes}")
+    print(f"total {total:.2f} s  ({args.peticiones / total:.1f} peticiones/s)")
+    for nombre, p in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100)):
+        print(f"{nombre:<4} {percentil(latencias, p) * 1000:>9.2f} ms")
+    malos = verificar(programas, resultados)
+    print(f"resultados distintos del analisis secuencial: {malos}")
+    return 1 if malos else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.carga",
+                                 description="Prueba de carga del servicio asincrono.")
+    ap.add_argument("--peticiones", type=int, default=500)
+    ap.add_argument("--concurrencia", type=int, default=32)
+    ap.add_argument("--kb", type=int, default=8, help="tamaño de cada programa")
+    ap.add_argument("--perfil", choices=sorted(PERFILES), default="mixto")
+    ap.add_argument("--programas", type=int, default=30, help="programas distintos que se reparten")
+    ap.add_argument("--trabajadores", type=int, default=None)
+    ap.add_argument("--max-pendientes", type=int, default=None)
+    ap.add_argument("--procesos", action="store_true", help="usar procesos en vez de hilos")
+    args = ap.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    sys.exit(asyncio.run(principal(args)))
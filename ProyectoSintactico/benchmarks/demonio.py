@@ -0,0 +1,97 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from cliente import ClienteDemonio
+from benchmarks.carga import percentil
+from benchmarks.generador import PERFILES, generar_programa
+
+# Latencia por archivo de 'python main.py archivo' (interprete, imports y salida.txt en
+# cada llamada) frente al demonio:
+#   cli              python main.py archivo (en un directorio temporal)
+#   cliente          python cliente.py archivo (interprete chico, sin lexer ni parser)
+#   ida_y_vuelta     una peticion por vez desde un ClienteDemonio ya conectado
+#   encadenado       todas las peticiones seguidas en una conexion, por archivo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def preparar_archivos(directorio, cantidad, kb, perfil):
+    rutas = []
+    for i in range(cantidad):
+        error = (None, "sintactico", "lexico")[i % 3]
+        ruta = os.path.join(directorio, f"programa_{i}.py")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(generar_programa(kb, error=error, semilla=i, **PERFILES[perfil]))
+        rutas.append(ruta)
+    return rutas
+
+
+def latencias_proceso(comando, rutas, directorio):
+    tiempos = []
+    for ruta in rutas:
+        t0 = time.perf_counter()
+        subprocess.run(comando + [ruta], cwd=directorio, stdout=subprocess.DEVNULL, check=False)
+        tiempos.append(time.perf_counter() - t0)
+    return sorted(tiempos)
+
+
+def esperar_socket(ruta, limite=10.0):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if os.path.exists(ruta):
+            return
+        time.sleep(0.01)
+    raise RuntimeError(f"el demonio no creo '{ruta}'")
+
+
+def medir(rutas, directorio, socket):
+    python = sys.executable
+    filas = [("cli", latencias_proceso([python, os.path.join(RAIZ, "main.py")], rutas, directorio))]
+    demonio = subprocess.Popen([python, os.path.join(RAIZ, "demonio.py"), "--socket", socket],
+                               stdout=subprocess.DEVNULL)
+    try:
+        esperar_socket(socket)
+        filas.append(("cliente", latencias_proceso([python, os.path.join(RAIZ, "cliente.py"), "--socket", socket],
+                                                   rutas, directorio)))
+        with ClienteDemonio(socket) as cliente:
+            tiempos = []
+            for ruta in rutas:
+                t0 = time.perf_counter()
+                cliente.analizar(ruta=ruta)
+                tiempos.append(time.perf_counter() - t0)
+            filas.append(("ida_y_vuelta", sorted(tiempos)))
+            t0 = time.perf_counter()
+            cliente.analizar_varios(rutas)
+            por_archivo = (time.perf_counter() - t0) / len(rutas)
+            filas.append(("encadenado", [por_archivo]))
+            cliente.detener()
+        demonio.wait(timeout=10)
+    finally:
+        if demonio.poll() is None:
+            demonio.terminate()
+            demonio.wait()
+    return filas
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.demonio",
+                                 description="Latencia del CLI frente al demonio.")
+    ap.add_argument("--archivos", type=int, default=30)
+    ap.add_argument("--kb", type=int, default=4, help="tamaño de cada archivo")
+    ap.add_argument("--perfil", choices=sorted(PERFILES), default="mixto")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = preparar_archivos(tmp, args.archivos, args.kb, args.perfil)
+        filas = medir(rutas, tmp, os.path.join(tmp, "demonio.sock"))
+    print(f"{args.archivos} archivos de {args.kb} KB ({args.perfil})")
+    print(f"{'modo':<14} {'p50':>10} {'p90':>10} {'max':>10}")
+    base = percentil(filas[0][1], 50)
+    for nombre, tiempos in filas:
+        p50 = percentil(tiempos, 50)
+        print(f"{nombre:<14} {p50 * 1000:>8.2f}ms {percentil(tiempos, 90) * 1000:>8.2f}ms "
+              f"{tiempos[-1] * 1000:>8.2f}ms  ({base / p50:.0f}x)")
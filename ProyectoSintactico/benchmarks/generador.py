@@ -0,0 +1,162 @@
+import random
+import sys
+
+# Generador de programas sinteticos para la gramatica del parser.
+# Los programas validos se aceptan sin errores; los invalidos llevan un unico
+# error (sintactico o lexico) en una linea elegida al azar.
+
+NOMBRES = ["x", "y", "total", "items", "valor", "resultado", "i", "n", "datos", "obj"]
+ATOMOS = ["{nombre}", "{nombre}", "{entero}", "True", "False", "None", "{nombre}.{nombre}",
+          "{nombre}[{entero}]", "{nombre}({nombre})", "[{entero}, {entero}]", "()"]
+OPERADORES_BIN = ["+", "-", "*", "/", "%", "==", "!=", "<", ">", "<=", ">=", "and", "or", "in", "is"]
+PALABRAS = ["hola", "mundo", "valor", "dato", "resultado", "lista", "texto", "numero"]
+
+# formas predefinidas: parametros de generar_programa
+PERFILES = {
+    "mixto": {},
+    "plano": {"profundidad": 0},
+    "anidado": {"profundidad": 8},
+    "expresiones": {"largo_expr": 12},
+    "cadenas": {"densidad_cadenas": 0.8},
+    "comentarios": {"densidad_comentarios": 0.6},
+}
+
+
+class _Generador:
+    def __init__(self, r, profundidad, largo_expr, densidad_cadenas, densidad_comentarios):
+        self.r = r
+        self.profundidad = profundidad
+        self.largo_expr = largo_expr
+        self.densidad_cadenas = densidad_cadenas
+        self.densidad_comentarios = densidad_comentarios
+        self.n = 0
+
+    def nombre(self):
+        return self.r.choice(NOMBRES)
+
+    def cadena(self):
+        palabras = " ".join(self.r.choice(PALABRAS) for _ in range(self.r.randint(1, 6)))
+        return f'"{palabras}"' if self.r.random() < 0.5 else f"'{palabras}'"
+
+    def atomo(self):
+        if self.r.random() < self.densidad_cadenas:
+            return self.cadena()
+        a = self.r.choice(ATOMOS)
+        return a.format(nombre=self.nombre(), entero=self.r.randint(0, 999))
+
+    def expresion(self, largo=None):
+        largo = self.r.randint(0, self.largo_expr) if largo is None else largo
+        partes = [self.atomo()]
+        for _ in range(largo):
+            partes.append(self.r.choice(OPERADORES_BIN))
+            if self.r.random() < 0.1:
+                partes.append("(" + self.expresion(self.r.randint(1, 2)) + ")")
+            else:
+                partes.append(self.atomo())
+        e = " ".join(partes)
+        return "not " + e if self.r.random() < 0.05 else e
+
+    def comentario(self):
+        if self.r.random() < self.densidad_comentarios:
+            return "  # " + " ".join(self.r.choice(PALABRAS) for _ in range(self.r.randint(1, 8)))
+        return ""
+
+    def simple(self, sangria):
+        k = self.r.random()
+        if k < 0.45:
+            s = f"{self.nombre()} = {self.expresion()}"
+        elif k < 0.60:
+            s = f"print({self.expresion()}, {self.atomo()})"
+        elif k < 0.70:
+            s = f"{self.nombre()}, {self.nombre()} = {self.atomo()}, {self.atomo()}"
+        elif k < 0.80:
+            s = f"return {self.expresion()}"
+        elif k < 0.90:
+            s = f"{self.nombre()}({self.expresion()})"
+        else:
+            s = self.r.choice(["pass", "break", "continue"])
+        return [sangria + s + self.comentario()]
+
+    def sentencia(self, nivel):
+        sangria = "    " * nivel
+        if nivel >= self.profundidad or self.r.random() < 0.5:
+            return self.simple(sangria)
+        k = self.r.random()
+        if k < 0.25:
+            self.n += 1
+            cab = [f"def funcion_{self.n}(a:int, b:[str], c):"]
+        elif k < 0.55:
+            cab = [f"if {self.expresion()}:"]
+        elif k < 0.75:
+            cab = [f"while {self.expresion()}:"]
+        else:
+            cab = [f"for {self.nombre()} in {self.expresion()}:"]
+        lineas = [sangria + cab[0] + self.comentario()]
+        ramas = []
+        if cab[0].startswith("if"):
+            if self.r.random() < 0.4:
+                ramas.append(f"{sangria}elif {self.expresion()}:")
+            if self.r.random() < 0.4:
+                ramas.append(f"{sangria}else:")
+        lineas += self.bloque(nivel + 1, cierre_simple=bool(ramas))
+        for i, rama in enumerate(ramas):
+            lineas.append(rama)
+            lineas += self.bloque(nivel + 1, cierre_simple=i < len(ramas) - 1)
+        return lineas
+
+    def bloque(self, nivel, cierre_simple=False):
+        # cierre_simple: el parser no acepta un elif/else justo despues de cerrar
+        # varios niveles de sangria, asi que esos bloques terminan en una sentencia simple
+        lineas = []
+        for _ in range(self.r.randint(1, 4)):
+            lineas += self.sentencia(nivel)
+        if cierre_simple:
+            lineas += self.simple("    " * nivel)
+        return lineas
+
+
+def introducir_error(lineas, r, tipo):
+    # un solo error en una linea elegida al azar (sin tocar lineas de comentario)
+    candidatas = [i for i, l in enumerate(lineas) if l.strip() and not l.lstrip().startswith("#")]
+    i = r.choice(candidatas)
+    linea = lineas[i]
+    if tipo == "lexico":
+        # al comienzo de la sentencia: dentro de una cadena no seria un error
+        pos = len(linea) - len(linea.lstrip())
+        lineas[i] = linea[:pos] + "$" + linea[pos:]
+    else:
+        # una sentencia de asignacion sin lado derecho siempre es un error sintactico
+        sangria = linea[:len(linea) - len(linea.lstrip())]
+        lineas.insert(i, sangria + "x = = 1")
+    return lineas
+
+
+def generar_programa(kb=64, profundidad=3, largo_expr=4, densidad_cadenas=0.15, densidad_comentarios=0.1,
+                     error=None, semilla=0):
+    # kb: tamaño aproximado; profundidad: anidamiento maximo de def/if/while/for;
+    # largo_expr: operadores binarios por expresion (maximo); densidades: probabilidad
+    # de que un atomo sea cadena / de que una linea lleve comentario;
+    # error: None, "sintactico" o "lexico"
+    if error not in (None, "sintactico", "lexico"):
+        raise ValueError(f"tipo de error desconocido: {error!r}")
+    r = random.Random(semilla)
+    g = _Generador(r, profundidad, largo_expr, densidad_cadenas, densidad_comentarios)
+    lineas = []
+    tam = 0
+    while tam < kb * 1024:
+        if r.random() < g.densidad_comentarios / 4:
+            lineas.append("# " + " ".join(r.choice(PALABRAS) for _ in range(r.randint(2, 10))))
+        nuevas = g.sentencia(0)
+        lineas += nuevas
+        tam += sum(len(l) + 1 for l in nuevas)
+    if error:
+        lineas = introducir_error(lineas, r, error)
+    return "\n".join(lineas) + "\n"
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.generador [perfil] [KB] [sintactico|lexico] > archivo.py
+    perfil = sys.argv[1] if len(sys.argv) > 1 else "mixto"
+    kb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    error = sys.argv[3] if len(sys.argv) > 3 else None
+    sys.stdout.write(generar_programa(kb, error=error, **PERFILES[perfil]))
@@ -0,0 +1,87 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+
+from lexer import Scanner
+from parser import AnalizadorSintactico, construir_arbol
+from instantanea import cargar_instantanea, crear_instantanea
+from benchmarks.generador import PERFILES, generar_programa
+from benchmarks.suite import mejor_tiempo
+
+# Compara volver a escanear (y analizar) un archivo con cargar su instantanea:
+#   carga     abrir y mapear la instantanea (sin tocar los tokens)
+#   columnas  carga + recorrer la columna de tipos completa
+#   tokens    carga + construir un Token por elemento
+#   parser    analizar desde la instantanea en vez de desde el escaner
+#   arbol     reconstruir el arbol guardado en vez de construir_arbol(texto)
+
+
+def medir(texto, ruta, repeticiones):
+    crear_instantanea(texto, ruta)
+
+    def escanear(_):
+        Scanner(texto, modo="tabla").analizar()
+
+    def escanear_y_analizar(_):
+        sc = Scanner(texto, modo="tabla")
+        sc.analizar()
+        AnalizadorSintactico(sc.tokens, salida=io.StringIO()).analizar()
+
+    def cargar(_):
+        cargar_instantanea(ruta).cerrar()
+
+    def columnas(_):
+        with cargar_instantanea(ruta) as ins:
+            sum(ins.tokens.tipos)
+
+    def tokens(_):
+        with cargar_instantanea(ruta) as ins:
+            for _ in ins.tokens:
+                pass
+
+    def analizar_instantanea(_):
+        with cargar_instantanea(ruta) as ins:
+            AnalizadorSintactico(ins.tokens, salida=io.StringIO()).analizar()
+
+    def arbol_texto(_):
+        construir_arbol(texto)
+
+    def arbol_instantanea(_):
+        with cargar_instantanea(ruta) as ins:
+            ins.arbol()
+
+    def t(ejecutar):
+        return mejor_tiempo(lambda: None, ejecutar, repeticiones)
+
+    re_escaneo = t(escanear)
+    return [
+        ("carga", re_escaneo, t(cargar)),
+        ("columnas", re_escaneo, t(columnas)),
+        ("tokens", re_escaneo, t(tokens)),
+        ("parser", t(escanear_y_analizar), t(analizar_instantanea)),
+        ("arbol", t(arbol_texto), t(arbol_instantanea)),
+    ]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.instantanea",
+                                 description="Carga de instantaneas frente a volver a escanear.")
+    ap.add_argument("--kb", type=int, default=1024)
+    ap.add_argument("--perfil", choices=sorted(PERFILES), default="mixto")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--semilla", type=int, default=0)
+    args = ap.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    texto = generar_programa(args.kb, semilla=args.semilla, **PERFILES[args.perfil])
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "programa.psin")
+        filas = medir(texto, ruta, args.repeticiones)
+        tam = os.path.getsize(ruta)
+    print(f"{args.kb} KB de fuente ({args.perfil}), instantanea de {tam / 1024:.0f} KB")
+    print(f"{'medida':<10} {'desde texto':>12} {'instantanea':>12} {'aceleracion':>12}")
+    for nombre, desde_texto, desde_instantanea in filas:
+        print(f"{nombre:<10} {desde_texto * 1000:>10.2f}ms {desde_instantanea * 1000:>10.2f}ms "
+              f"{desde_texto / desde_instantanea:>11.1f}x")
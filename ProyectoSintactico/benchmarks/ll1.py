@@ -0,0 +1,86 @@
+import argparse
+import sys
+
+from diagnosticos import DestinoMemoria
+from lexer import ErrorLexico, Scanner
+from ll1 import AnalizadorLL1, tabla_ll1
+from parser import AnalizadorSintactico
+from benchmarks.generador import PERFILES, generar_programa
+from benchmarks.suite import mejor_tiempo
+
+# Motor LL(1) (ll1.py) frente al parser descendente recursivo:
+#   coincidencia   programas con errores sintacticos de cada perfil: mismos diagnosticos
+#                  con ambos motores, con y sin recuperacion
+#   tokens/s       analisis completo (construccion del analizador incluida) sobre la
+#                  lista de tokens y sobre el TokenArray del escaner compacto
+#   anidamiento    bloques anidados hasta la profundidad dada: el recursivo se queda
+#                  sin pila y el LL(1) no
+
+CASOS_COINCIDENCIA = 40
+
+
+def resultado(clase, tokens, **opciones):
+    destino = DestinoMemoria()
+    try:
+        exito = clase(tokens, salida=destino, **opciones).analizar()
+    except RecursionError:
+        return None
+    return exito, [d.a_dict() for d in destino.registros]
+
+
+def coincidencias(perfil):
+    iguales = total = 0
+    for semilla in range(CASOS_COINCIDENCIA):
+        texto = generar_programa(4, error="sintactico", semilla=semilla, **PERFILES[perfil])
+        try:
+            sc = Scanner(texto, modo="tabla")
+            sc.analizar()
+        except ErrorLexico:
+            continue
+        for opciones in ({}, {"recuperar": True}):
+            total += 1
+            iguales += resultado(AnalizadorSintactico, sc.tokens, **opciones) == \
+                resultado(AnalizadorLL1, sc.tokens, **opciones)
+    return iguales, total
+
+
+def tokens_por_segundo(tokens, clase, repeticiones):
+    dt = mejor_tiempo(lambda: None, lambda _: clase(tokens, salida=DestinoMemoria()).analizar(), repeticiones)
+    return len(tokens) / dt
+
+
+def anidado(profundidad):
+    lineas = [" " * (4 * k) + "if x:\n" for k in range(profundidad)]
+    return "".join(lineas) + " " * (4 * profundidad) + "pass\n"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.ll1",
+                                 description="Motor LL(1) frente al parser descendente recursivo.")
+    ap.add_argument("--kb", type=int, default=512)
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--profundidad", type=int, default=5000)
+    args = ap.parse_args()
+
+    tabla_ll1()
+    print(f"{args.kb} KB por perfil; tokens/s con lista | con TokenArray")
+    print(f"{'perfil':<12} {'coinciden':>10} {'recursivo':>23} {'ll1':>23}")
+    for perfil in sorted(PERFILES):
+        iguales, total = coincidencias(perfil)
+        texto = generar_programa(args.kb, semilla=0, **PERFILES[perfil])
+        columnas = []
+        for clase in (AnalizadorSintactico, AnalizadorLL1):
+            velocidades = []
+            for compacto in (False, True):
+                sc = Scanner(texto, modo="tabla", compacto=compacto)
+                sc.analizar()
+                velocidades.append(tokens_por_segundo(sc.tokens, clase, args.repeticiones))
+            columnas.append(f"{velocidades[0]:>10,.0f} | {velocidades[1]:>10,.0f}")
+        print(f"{perfil:<12} {f'{iguales}/{total}':>10} {columnas[0]:>23} {columnas[1]:>23}")
+
+    sc = Scanner(anidado(args.profundidad), modo="tabla", compacto=True)
+    sc.analizar()
+    recursivo = resultado(AnalizadorSintactico, sc.tokens)
+    print(f"\n{args.profundidad} bloques anidados (limite de recursion {sys.getrecursionlimit()}): "
+          f"recursivo {'RecursionError' if recursivo is None else 'ok'}, "
+          f"ll1 {'ok' if resultado(AnalizadorLL1, sc.tokens)[0] else 'error'}")
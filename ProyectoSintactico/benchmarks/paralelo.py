@@ -0,0 +1,55 @@
+import argparse
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from parser import analizar_texto
+from paralelo import analizar_en_paralelo
+from benchmarks.generador import PERFILES, generar_programa
+from benchmarks.suite import mejor_tiempo
+
+# Escalado de analizar_en_paralelo con la cantidad de procesos frente al analisis
+# secuencial de un mismo archivo grande. El pool se crea (y se calienta) antes de medir.
+
+
+def medir(texto, trabajadores, repeticiones):
+    esperado = io.StringIO()
+    analizar_texto(texto, esperado)
+    secuencial = mejor_tiempo(lambda: None, lambda _: analizar_texto(texto, io.StringIO()), repeticiones)
+    filas = []
+    for n in trabajadores:
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            list(pool.map(abs, range(n)))
+            salida = io.StringIO()
+            analizar_en_paralelo(texto, salida, trabajadores=n, ejecutor=pool)
+            t = mejor_tiempo(lambda: None,
+                             lambda _: analizar_en_paralelo(texto, io.StringIO(), trabajadores=n, ejecutor=pool),
+                             repeticiones)
+        filas.append((n, t, salida.getvalue() == esperado.getvalue()))
+    return secuencial, filas
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.paralelo",
+                                 description="Analisis paralelo de un archivo grande frente al secuencial.")
+    ap.add_argument("--kb", type=int, default=8192)
+    ap.add_argument("--perfil", choices=sorted(PERFILES), default="plano")
+    ap.add_argument("--error", choices=["sintactico", "lexico"], default=None,
+                    help="incluir un error en una linea al azar")
+    ap.add_argument("--trabajadores", type=int, nargs="+", default=None,
+                    help="cantidades de procesos a medir (por defecto 1, 2, 4, ... hasta las CPU)")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--semilla", type=int, default=0)
+    args = ap.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    cpus = os.cpu_count() or 1
+    trabajadores = args.trabajadores or sorted({min(2 ** k, cpus) for k in range(cpus.bit_length() + 1)})
+    texto = generar_programa(args.kb, error=args.error, semilla=args.semilla, **PERFILES[args.perfil])
+    secuencial, filas = medir(texto, trabajadores, args.repeticiones)
+    print(f"{args.kb} KB ({args.perfil}), {cpus} CPU")
+    print(f"{'procesos':<10} {'tiempo':>10} {'aceleracion':>12}  misma salida")
+    print(f"{'secuencial':<10} {secuencial * 1000:>8.0f}ms {1.0:>11.2f}x")
+    for n, t, igual in filas:
+        print(f"{n:<10} {t * 1000:>8.0f}ms {secuencial / t:>11.2f}x  {'si' if igual else 'NO'}")
@@ -0,0 +1,61 @@
+import argparse
+import io
+import sys
+
+from lexer import Scanner
+from parser import analizar_texto
+from prevalidacion import primer_error_lexico
+from benchmarks.generador import PERFILES, generar_programa
+from benchmarks.suite import mejor_tiempo
+
+# Costo de la prevalidacion en archivos validos y ganancia en archivos rotos:
+#   valido          el programa generado, sin errores
+#   cadena_al_final una cadena sin cerrar en la ultima linea
+#   lexico_al_final un caracter invalido al 90% del archivo
+#   parentesis      un '(' sin cerrar al 10% del archivo
+
+
+def variantes(texto):
+    lineas = texto.splitlines(keepends=True)
+    cerca_del_final = len(lineas) * 9 // 10
+    cerca_del_inicio = len(lineas) // 10
+    return [
+        ("valido", texto),
+        ("cadena_al_final", texto + "x = 'sin cerrar\n"),
+        ("lexico_al_final", "".join(lineas[:cerca_del_final] + ["x = $\n"] + lineas[cerca_del_final:])),
+        ("parentesis", "".join(lineas[:cerca_del_inicio] + ["x = (1 +\n"] + lineas[cerca_del_inicio:])),
+    ]
+
+
+def medir(texto, repeticiones):
+    def t(ejecutar):
+        return mejor_tiempo(lambda: None, ejecutar, repeticiones)
+
+    filas = []
+    for nombre, fuente in variantes(texto):
+        normal = t(lambda _: analizar_texto(fuente, io.StringIO()))
+        prevalidado = t(lambda _: analizar_texto(fuente, io.StringIO(), prevalidar=True))
+        filas.append((nombre, normal, prevalidado))
+    escaneo = t(lambda _: Scanner(texto, modo="tabla").analizar())
+    lexico = t(lambda _: primer_error_lexico(texto))
+    return filas, escaneo, lexico
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.prevalidacion",
+                                 description="Prevalidacion rapida frente al analisis completo.")
+    ap.add_argument("--kb", type=int, default=2048)
+    ap.add_argument("--perfil", choices=sorted(PERFILES), default="mixto")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--semilla", type=int, default=0)
+    args = ap.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    texto = generar_programa(args.kb, semilla=args.semilla, **PERFILES[args.perfil])
+    filas, escaneo, lexico = medir(texto, args.repeticiones)
+    print(f"{args.kb} KB ({args.perfil})")
+    print(f"{'entrada':<16} {'normal':>10} {'prevalidar':>11} {'relacion':>9}")
+    for nombre, normal, prevalidado in filas:
+        print(f"{nombre:<16} {normal * 1000:>8.1f}ms {prevalidado * 1000:>9.1f}ms {prevalidado / normal:>8.3f}x")
+    print(f"escaner completo {escaneo * 1000:.1f} ms; primer_error_lexico {lexico * 1000:.1f} ms "
+          f"({lexico / escaneo:.1%})")
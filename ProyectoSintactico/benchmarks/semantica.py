@@ -0,0 +1,54 @@
+import argparse
+
+from diagnosticos import DestinoMemoria
+from lexer import Scanner
+from parser import AnalizadorSintactico
+from benchmarks.generador import PERFILES, generar_programa
+from benchmarks.suite import memoria_maxima, mejor_tiempo
+
+# Costo de los chequeos semanticos (semantica.py) frente al analisis solo sintactico,
+# sobre los tokens ya escaneados de cada perfil:
+#   tiempo    mejor de varias corridas de cada modo
+#   memoria   pico de tracemalloc durante el analisis (sin contar los tokens)
+#   arbol     referencia para una pasada semantica aparte: solo construir el arbol que
+#             esa pasada recorreria (construir_ast=True), sin recorrerlo
+
+
+MODOS = ({}, {"semantica": True}, {"construir_ast": True})
+
+
+def analizar(tokens, opciones):
+    destino = DestinoMemoria()
+    AnalizadorSintactico(tokens, salida=destino, **opciones).analizar()
+    return destino
+
+
+def tiempos(tokens, repeticiones):
+    # los modos alternados en cada repeticion, para que el ruido afecte a todos
+    mejores = [None] * len(MODOS)
+    for _ in range(repeticiones):
+        for k, opciones in enumerate(MODOS):
+            dt = mejor_tiempo(lambda: None, lambda _: analizar(tokens, opciones), 1)
+            mejores[k] = dt if mejores[k] is None else min(mejores[k], dt)
+    return mejores
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.semantica",
+                                 description="Costo de los chequeos semanticos frente al modo solo sintactico.")
+    ap.add_argument("--kb", type=int, default=256)
+    ap.add_argument("--repeticiones", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{args.kb} KB por perfil")
+    print(f"{'':<12} {'tiempo':>36} {'memoria maxima':>36}")
+    print(f"{'perfil':<12} {'sintaxis':>9} {'+semantica':>15} {'arbol':>10} "
+          f"{'sintaxis':>9} {'+semantica':>15} {'arbol':>10}")
+    for perfil in sorted(PERFILES):
+        sc = Scanner(generar_programa(args.kb, semilla=0, **PERFILES[perfil]), modo="tabla")
+        sc.analizar()
+        sin, con, arbol = tiempos(sc.tokens, args.repeticiones)
+        memorias = [memoria_maxima(lambda: analizar(sc.tokens, opciones)) for opciones in MODOS]
+        print(f"{perfil:<12} {sin * 1000:>7.0f}ms {con * 1000:>6.0f}ms {con / sin - 1:>+6.0%} "
+              f"{arbol / sin - 1:>+10.0%} {memorias[0] / 1024:>7.0f}KB {memorias[1] / 1024:>6.0f}KB "
+              f"{memorias[1] / memorias[0]:>6.1f}x {memorias[2] / memorias[0]:>9.0f}x")
@@ -0,0 +1,105 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from diagnosticos import DestinoMemoria
+from parser import analizar_texto
+from simbolos import IndiceSimbolos, SimbolosArchivo
+from benchmarks.generador import PERFILES, generar_programa
+from benchmarks.suite import mejor_tiempo
+
+# Costo del indice de simbolos (simbolos.py):
+#   analisis      tiempo de analisis sin y con recoleccion de simbolos, por perfil
+#   construccion  indexar un arbol de archivos desde cero: tiempo y tamano en disco
+#   busqueda      abrir el indice en frio (un IndiceSimbolos nuevo que lee el catalogo) y
+#                 buscar un nombre que aparece en pocos archivos y uno que esta en casi todos
+#   actualizacion cambiar un archivo y reindexar solo ese (segmento + catalogo) frente a
+#                 reconstruir el indice entero
+
+NOMBRES_BUSCADOS = ("unico_0", "funcion_1", "x")
+
+
+def tiempos_analisis(texto, repeticiones):
+    # sin y con simbolos alternados en cada repeticion, para que el ruido afecte a ambos
+    mejores = [None, None]
+    for _ in range(repeticiones):
+        for k, simbolos in enumerate((None, SimbolosArchivo)):
+            dt = mejor_tiempo(lambda: simbolos and simbolos(),
+                              lambda s: analizar_texto(texto, DestinoMemoria(), simbolos=s), 1)
+            mejores[k] = dt if mejores[k] is None else min(mejores[k], dt)
+    return mejores
+
+
+def preparar_arbol(raiz, cantidad, kb):
+    rutas = []
+    for i in range(cantidad):
+        ruta = os.path.join(raiz, f"p{i}.py")
+        with open(ruta, "w", encoding="utf-8") as f:
+            # un nombre propio de cada archivo, llamado desde el siguiente
+            f.write(f"def unico_{i}(a: int, b):\n    return b\nunico_{max(i - 1, 0)}(1, 2)\n")
+            f.write(generar_programa(kb, semilla=i))
+        rutas.append(ruta)
+    return rutas
+
+
+def tamano(directorio):
+    return sum(os.path.getsize(os.path.join(raiz, a)) for raiz, _, archivos in os.walk(directorio)
+               for a in archivos)
+
+
+def construir(directorio, rutas):
+    shutil.rmtree(directorio, ignore_errors=True)
+    indice = IndiceSimbolos(directorio)
+    for ruta in rutas:
+        indice.indexar_archivo(ruta)
+    indice.guardar()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.simbolos",
+                                 description="Costo de recolectar, guardar y consultar el indice de simbolos.")
+    ap.add_argument("--kb", type=int, default=256, help="KB por perfil para medir el analisis")
+    ap.add_argument("--archivos", type=int, default=2000)
+    ap.add_argument("--kb-archivo", type=int, default=4)
+    ap.add_argument("--repeticiones", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'perfil':<12} {'sin simbolos':>13} {'con simbolos':>13} {'costo':>7}")
+    for perfil in sorted(PERFILES):
+        texto = generar_programa(args.kb, semilla=0, **PERFILES[perfil])
+        sin, con = tiempos_analisis(texto, args.repeticiones)
+        print(f"{perfil:<12} {sin * 1000:>11.0f}ms {con * 1000:>11.0f}ms {con / sin - 1:>+7.1%}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fuentes = os.path.join(tmp, "fuentes")
+        os.makedirs(fuentes)
+        rutas = preparar_arbol(fuentes, args.archivos, args.kb_archivo)
+        directorio = os.path.join(tmp, "indice")
+        t0 = time.perf_counter()
+        construir(directorio, rutas)
+        completo = time.perf_counter() - t0
+        print(f"\n{args.archivos} archivos de ~{args.kb_archivo} KB "
+              f"({tamano(fuentes) / 1024 / 1024:.1f} MB de fuente)")
+        print(f"construccion: {completo:.2f}s, indice {tamano(directorio) / 1024 / 1024:.2f} MB "
+              f"(catalogo {os.path.getsize(os.path.join(directorio, 'catalogo.psix')) / 1024:.0f} KB)")
+
+        for nombre in NOMBRES_BUSCADOS:
+            def buscar(_):
+                return IndiceSimbolos(directorio).buscar(nombre)
+            dt = mejor_tiempo(lambda: None, buscar, args.repeticiones)
+            definiciones, llamadas = buscar(None)
+            archivos = len({d.ruta for d in definiciones} | {ll.ruta for ll in llamadas})
+            print(f"busqueda en frio de {nombre!r:<12} {dt * 1000:>8.2f}ms  "
+                  f"{len(definiciones)} definiciones, {len(llamadas)} llamadas en {archivos} archivos")
+
+        def actualizar(_):
+            with open(rutas[0], "a", encoding="utf-8") as f:
+                f.write(f"agregado_{time.perf_counter_ns()}(1)\n")
+            indice = IndiceSimbolos(directorio)
+            indice.indexar_archivo(rutas[0])
+            indice.guardar()
+        dt = mejor_tiempo(lambda: None, actualizar, args.repeticiones)
+        print(f"reindexar un archivo cambiado: {dt * 1000:.1f}ms, reconstruir todo: {completo * 1000:.0f}ms "
+              f"({completo / dt:.0f}x)")
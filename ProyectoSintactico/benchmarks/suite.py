@@ -0,0 +1,180 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lexer import Scanner
+from parser import AnalizadorSintactico, analizar_archivo
+from benchmarks.generador import PERFILES, generar_programa
+
+# Suite de rendimiento: para cada perfil del generador mide por separado
+# Scanner.analizar, AnalizadorSintactico.analizar y analizar_archivo de punta a punta.
+# Cada corrida se agrega a un archivo JSONL para comparar entre commits.
+
+RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados.jsonl")
+ETAPAS = ("escaner", "parser", "archivo")
+
+
+def mejor_tiempo(preparar, ejecutar, repeticiones):
+    # preparar() no se mide; ejecutar(dato) si
+    mejor = None
+    for _ in range(repeticiones):
+        dato = preparar()
+        gc.collect()
+        t0 = time.perf_counter()
+        ejecutar(dato)
+        dt = time.perf_counter() - t0
+        mejor = dt if mejor is None else min(mejor, dt)
+    return mejor
+
+
+def memoria_maxima(ejecutar):
+    gc.collect()
+    tracemalloc.start()
+    ejecutar()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico
+
+
+def medir_perfil(texto, repeticiones, ruta):
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(texto)
+    sc = Scanner(texto, modo="tabla")
+    sc.analizar()
+    tokens = sc.tokens
+    lineas = texto.count("\n")
+
+    def escanear(sc):
+        sc.analizar()
+
+    def parsear(p):
+        p.analizar()
+
+    def de_punta_a_punta(_):
+        analizar_archivo(ruta, os.devnull)
+
+    medidas = {
+        "escaner": (lambda: Scanner(texto, modo="tabla"), escanear,
+                    lambda: Scanner(texto, modo="tabla").analizar()),
+        "parser": (lambda: AnalizadorSintactico(tokens, salida=io.StringIO()), parsear,
+                   lambda: AnalizadorSintactico(tokens, salida=io.StringIO()).analizar()),
+        "archivo": (lambda: None, de_punta_a_punta, lambda: analizar_archivo(ruta, os.devnull)),
+    }
+    resultado = {"bytes": len(texto.encode("utf-8")), "lineas": lineas, "tokens": len(tokens)}
+    for etapa, (preparar, ejecutar, una_vez) in medidas.items():
+        dt = mejor_tiempo(preparar, ejecutar, repeticiones)
+        resultado[etapa] = {
+            "segundos": dt,
+            "tokens_s": len(tokens) / dt,
+            "lineas_s": lineas / dt,
+            "memoria_max": memoria_maxima(una_vez),
+        }
+    return resultado
+
+
+def commit_actual():
+    try:
+        r = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    if r.returncode != 0:
+        return None
+    sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                           text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    return r.stdout.strip() + ("+" if sucio else "")
+
+
+def cargar_corridas(ruta):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, "r", encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+
+def buscar_referencia(corridas, actual, commit=None):
+    # ultima corrida comparable (mismos KB y semilla); de un commit dado si se pide
+    for c in reversed(corridas):
+        if c["kb"] != actual["kb"] or c["semilla"] != actual["semilla"]:
+            continue
+        if commit is None or c["commit"] and c["commit"].startswith(commit):
+            return c
+    return None
+
+
+def imprimir(corrida, referencia=None, umbral=0.10):
+    # devuelve la cantidad de regresiones (tokens/s mas de 'umbral' por debajo de la referencia)
+    regresiones = 0
+    print(f"commit {corrida['commit']}  {corrida['kb']} KB por perfil, semilla {corrida['semilla']}")
+    if referencia:
+        print(f"comparado con {referencia['commit']} ({referencia['fecha']})")
+    print(f"{'perfil':<12} {'etapa':<8} {'tokens/s':>12} {'lineas/s':>11} {'mem. max':>10}  cambio")
+    for perfil, r in corrida["perfiles"].items():
+        for etapa in ETAPAS:
+            m = r[etapa]
+            cambio = ""
+            ref = referencia and referencia["perfiles"].get(perfil)
+            if ref:
+                delta = m["tokens_s"] / ref[etapa]["tokens_s"] - 1
+                cambio = f"{delta:+.1%}"
+                if delta < -umbral:
+                    cambio += "  <-- regresion"
+                    regresiones += 1
+            print(f"{perfil:<12} {etapa:<8} {m['tokens_s']:>12,.0f} {m['lineas_s']:>11,.0f} "
+                  f"{m['memoria_max'] / 2**20:>8.1f}MB  {cambio}")
+    return regresiones
+
+
+def construir_argumentos():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                 description="Suite de rendimiento del escaner y el parser.")
+    ap.add_argument("--kb", type=int, default=256, help="tamaño de cada programa generado")
+    ap.add_argument("--repeticiones", type=int, default=3, help="se informa el mejor tiempo")
+    ap.add_argument("--perfiles", nargs="+", choices=sorted(PERFILES), default=sorted(PERFILES))
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--resultados", default=RESULTADOS, help="archivo JSONL con las corridas")
+    ap.add_argument("--no-guardar", action="store_true", help="no agregar esta corrida al archivo")
+    ap.add_argument("--comparar", nargs="?", const="", default=None, metavar="COMMIT",
+                    help="comparar con la ultima corrida guardada (o la de COMMIT)")
+    ap.add_argument("--umbral", type=float, default=0.10,
+                    help="caida relativa de tokens/s que cuenta como regresion (por defecto 0.10)")
+    return ap
+
+
+if __name__ == "__main__":
+    args = construir_argumentos().parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    corrida = {
+        "commit": commit_actual(),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "kb": args.kb,
+        "semilla": args.semilla,
+        "perfiles": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "programa.py")
+        for perfil in args.perfiles:
+            texto = generar_programa(args.kb, semilla=args.semilla, **PERFILES[perfil])
+            corrida["perfiles"][perfil] = medir_perfil(texto, args.repeticiones, ruta)
+
+    corridas = cargar_corridas(args.resultados)
+    referencia = None
+    if args.comparar is not None:
+        referencia = buscar_referencia(corridas, corrida, args.comparar or None)
+        if referencia is None:
+            print("No hay una corrida guardada comparable.")
+    regresiones = imprimir(corrida, referencia, args.umbral)
+
+    if not args.no_guardar:
+        with open(args.resultados, "a", encoding="utf-8") as f:
+            f.write(json.dumps(corrida) + "\n")
+    sys.exit(1 if regresiones else 0)
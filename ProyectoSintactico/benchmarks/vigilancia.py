@@ -0,0 +1,84 @@
+import argparse
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from vigilancia import Vigilante
+
+# Costo del modo vigilancia sobre un arbol con muchos archivos, con inotify y con sondeo:
+#   inicial     analisis de todos los archivos al empezar
+#   inactivo    CPU usada por el proceso mientras no cambia nada (% de un nucleo)
+#   latencia    desde que se guarda un archivo hasta que llega su resultado (incluye la
+#               espera de la rafaga)
+#   sin cambio  reescribir el mismo contenido no produce ningun resultado
+
+POR_DIRECTORIO = 500
+
+
+def preparar_arbol(raiz, cantidad):
+    for i in range(cantidad):
+        directorio = os.path.join(raiz, f"d{i // POR_DIRECTORIO}")
+        if i % POR_DIRECTORIO == 0:
+            os.makedirs(directorio)
+        with open(os.path.join(directorio, f"p{i}.py"), "w", encoding="utf-8") as f:
+            f.write(f"x{i} = {i}\n")
+
+
+def medir(raiz, sondeo, inactivo, muestras):
+    resultados = queue.Queue()
+    vigilante = Vigilante([raiz], sondeo=sondeo)
+    t0 = time.perf_counter()
+    vigilante.iniciar()
+    inicial = time.perf_counter() - t0
+    hilo = threading.Thread(target=vigilante.vigilar, args=(resultados.put,))
+    hilo.start()
+    try:
+        time.sleep(1.0)
+        cpu = time.process_time()
+        time.sleep(inactivo)
+        uso = (time.process_time() - cpu) / inactivo
+
+        latencias = []
+        for k in range(muestras):
+            ruta = os.path.join(raiz, "d0", f"p{k}.py")
+            t0 = time.perf_counter()
+            with open(ruta, "w", encoding="utf-8") as f:
+                # contenido nuevo en cada corrida, la mitad con un error
+                f.write(f"y = {time.perf_counter_ns()}{' +' if k % 2 else ''}\n")
+            resultados.get(timeout=30)
+            latencias.append(time.perf_counter() - t0)
+
+        ruta = os.path.join(raiz, "d0", "p0.py")
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        with open(ruta, "wb") as f:
+            f.write(contenido)
+        try:
+            resultados.get(timeout=vigilante.espera + 6.0)
+            sin_cambio = "reanalizado"
+        except queue.Empty:
+            sin_cambio = "ignorado"
+    finally:
+        vigilante.detener()
+        hilo.join()
+    return vigilante.observador.nombre, inicial, uso, sorted(latencias), sin_cambio
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.vigilancia",
+                                 description="CPU inactiva y latencia del modo vigilancia.")
+    ap.add_argument("--archivos", type=int, default=20000)
+    ap.add_argument("--inactivo", type=float, default=10.0, help="segundos sin cambios que se miden")
+    ap.add_argument("--muestras", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        preparar_arbol(tmp, args.archivos)
+        print(f"{args.archivos} archivos en {-(-args.archivos // POR_DIRECTORIO)} directorios")
+        print(f"{'observador':<10} {'inicial':>9} {'inactivo':>9} {'latencia p50':>13} {'max':>9}  sin cambio")
+        for sondeo in (False, True):
+            nombre, inicial, uso, latencias, sin_cambio = medir(tmp, sondeo, args.inactivo, args.muestras)
+            print(f"{nombre:<10} {inicial:>8.2f}s {uso:>8.2%} {latencias[len(latencias) // 2] * 1000:>11.0f}ms "
+                  f"{latencias[-1] * 1000:>7.0f}ms  {sin_cambio}")
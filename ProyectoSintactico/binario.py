@@ -0,0 +1,69 @@
+import os
+import sys
+from array import array
+
+# Piezas comunes de los formatos binarios de instantanea.py y simbolos.py:
+#
+#   cabecera | columnas
+#
+# Las columnas son arrays de enteros (o bytes) en el orden de bytes de la maquina que
+# escribio el archivo, cada una alineada a ALINEACION. Las cadenas van en una tabla:
+# una columna de desplazamientos y otra con los bytes utf-8 de todas seguidas, y se
+# referencian por indice.
+
+ALINEACION = 8
+ORDEN_BYTES = 0 if sys.byteorder == "little" else 1
+
+
+class TablaCadenas:
+    # cada cadena distinta se agrega una sola vez; indice() da su numero
+    def __init__(self, cadenas=()):
+        self.indices = {}
+        self.desplazamientos = array("q", [0])
+        self.datos = bytearray()
+        for c in cadenas:
+            self.indice(c)
+
+    def indice(self, cadena):
+        k = self.indices.get(cadena)
+        if k is None:
+            k = self.indices[cadena] = len(self.indices)
+            self.datos += cadena.encode("utf-8")
+            self.desplazamientos.append(len(self.datos))
+        return k
+
+
+def escribir_columnas(ruta, cabecera, secciones):
+    # escritura atomica, igual que la cache: otro proceso nunca ve un archivo a medias
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(cabecera)
+        pos = len(cabecera)
+        for seccion in secciones:
+            relleno = -pos % ALINEACION
+            f.write(bytes(relleno))
+            f.write(seccion)
+            pos += relleno + memoryview(seccion).nbytes
+    os.replace(temporal, ruta)
+
+
+class LectorColumnas:
+    # recorre las columnas de 'vista' (un memoryview) a partir de 'pos';
+    # truncado: el mensaje del ValueError si el archivo termina antes
+    def __init__(self, vista, pos, truncado):
+        self.vista = vista
+        self.pos = pos
+        self.truncado = truncado
+
+    def tramo(self, formato, n):
+        # los bytes de la columna siguiente, sin convertir
+        self.pos += -self.pos % ALINEACION
+        tam = array(formato).itemsize * n
+        if self.pos + tam > len(self.vista):
+            raise ValueError(self.truncado)
+        parte = self.vista[self.pos:self.pos + tam]
+        self.pos += tam
+        return parte
+
+    def columna(self, formato, n):
+        return self.tramo(formato, n).cast(formato)
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+import conjuntos
+import gramatica
+import lexer
+import ll1
+import parser
+import semantica
+from lexer import OPERADORES, RESERVADAS, TIPOS_TOKEN
+
+# cambiar a mano si cambia el formato de la salida sin cambiar el codigo de los modulos
+VERSION_CACHE = 2
+TAM_MAXIMO_CACHE = 64 * 1024 * 1024
+# marca de los directorios que escribe la cache (formato CACHEDIR.TAG, que las herramientas
+# de respaldo reconocen): solo se borra lo que la tiene
+ARCHIVO_MARCA = "CACHEDIR.TAG"
+CONTENIDO_MARCA = ("Signature: 8a477f597d28d172789f06886806bc55\n"
+                   "# cache de resultados del analizador sintactico (cache.py)\n")
+PATRON_HUELLA = re.compile(r"[0-9a-f]{16}\Z")
+
+
+def huella_gramatica():
+    # identifica la version del lexer/parser: si cambian RESERVADAS, OPERADORES,
+    # la gramatica o el codigo de los modulos, cambia la huella y la cache anterior
+    # deja de usarse
+    h = hashlib.sha256()
+    h.update(f"{VERSION_CACHE}|{sys.version_info[:2]}".encode())
+    h.update(repr(sorted(RESERVADAS)).encode())
+    h.update(repr(sorted(OPERADORES.items())).encode())
+    h.update(repr(TIPOS_TOKEN).encode())
+    for modulo in (lexer, parser, gramatica, conjuntos, ll1, semantica):
+        with open(modulo.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class CacheResultados:
+    # cache en disco de resultados de analisis, por contenido del archivo.
+    # <directorio>/<huella>/<clave[:2]>/<clave>.json ; la antiguedad de uso es el mtime
+    # del archivo (se actualiza en cada acierto) y se expulsan los mas antiguos cuando
+    # el total supera tam_maximo
+    def __init__(self, directorio, tam_maximo=TAM_MAXIMO_CACHE):
+        self.huella = huella_gramatica()
+        self.raiz = directorio
+        self.directorio = os.path.join(directorio, self.huella[:16])
+        self.tam_maximo = tam_maximo
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsados = 0
+        self._preparar_raiz()
+        os.makedirs(self.directorio, exist_ok=True)
+        if not marcado(self.directorio):
+            marcar(self.directorio)
+        self._descartar_otras_huellas()
+        self.tam_total = sum(tam for _, _, tam in self._entradas())
+
+    def clave(self, datos, **opciones):
+        h = hashlib.sha256(datos)
+        h.update(json.dumps(opciones, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def clave_archivo(self, ruta, **opciones):
+        # igual que clave(), leyendo el archivo por bloques
+        h = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        h.update(json.dumps(opciones, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave + ".json")
+
+    def obtener(self, clave):
+        # (exito, salida) o None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                entrada = json.load(f)
+            os.utime(ruta)
+        except (OSError, ValueError):
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return entrada["exito"], entrada["salida"]
+
+    def guardar(self, clave, exito, salida):
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        datos = json.dumps({"exito": exito, "salida": salida}, ensure_ascii=False).encode("utf-8")
+        # escritura atomica: varios procesos del modo lote pueden compartir la cache
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        # si otro proceso ya guardo la misma clave, la entrada se reemplaza: solo cuenta
+        # la diferencia de tamano
+        try:
+            anterior = os.stat(ruta).st_size
+        except OSError:
+            anterior = 0
+        os.replace(temporal, ruta)
+        self.tam_total += len(datos) - anterior
+        if self.tam_total > self.tam_maximo:
+            self._expulsar()
+
+    def invalidar(self):
+        # borra todas las entradas (de cualquier huella); la raiz y lo que no escribio la
+        # cache quedan como estan
+        for ruta in self._huellas():
+            shutil.rmtree(ruta, ignore_errors=True)
+        os.makedirs(self.directorio, exist_ok=True)
+        marcar(self.directorio)
+        self.tam_total = 0
+
+    def estadisticas(self):
+        return {"aciertos": self.aciertos, "fallos": self.fallos,
+                "expulsados": self.expulsados, "bytes": self.tam_total}
+
+    def _entradas(self):
+        for sub in os.scandir(self.directorio):
+            if not sub.is_dir():
+                continue
+            try:
+                contenido = list(os.scandir(sub.path))
+            except OSError:
+                continue
+            for e in contenido:
+                if e.name.endswith(".json"):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    yield st.st_mtime, e.path, st.st_size
+
+    def _expulsar(self):
+        # LRU: se vuelve a medir el directorio (otros procesos pudieron escribir)
+        # y se borran las entradas usadas hace mas tiempo hasta quedar en 3/4 del maximo
+        entradas = sorted(self._entradas())
+        total = sum(tam for _, _, tam in entradas)
+        limite = self.tam_maximo * 3 // 4
+        for _, ruta, tam in entradas:
+            if total <= limite:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tam
+            self.expulsados += 1
+        self.tam_total = total
+
+    def _preparar_raiz(self):
+        # un directorio que no es de la cache solo se acepta vacio: nunca se borra
+        # nada que no tenga la marca
+        os.makedirs(self.raiz, exist_ok=True)
+        if marcado(self.raiz):
+            return
+        if os.listdir(self.raiz):
+            raise ValueError(f"'{self.raiz}' no esta vacio y no es un directorio de cache; "
+                             f"use un directorio nuevo o vacio")
+        marcar(self.raiz)
+
+    def _huellas(self):
+        # subdirectorios de huella escritos por la cache
+        with os.scandir(self.raiz) as entradas:
+            return [e.path for e in entradas
+                    if e.is_dir(follow_symlinks=False) and PATRON_HUELLA.match(e.name) and marcado(e.path)]
+
+    def _descartar_otras_huellas(self):
+        for ruta in self._huellas():
+            if ruta != self.directorio:
+                shutil.rmtree(ruta, ignore_errors=True)
+
+
+def marcado(directorio):
+    return os.path.isfile(os.path.join(directorio, ARCHIVO_MARCA))
+
+
+def marcar(directorio):
+    with open(os.path.join(directorio, ARCHIVO_MARCA), "w", encoding="utf-8") as f:
+        f.write(CONTENIDO_MARCA)
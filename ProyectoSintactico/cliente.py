@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Cliente del demonio (demonio.py). Solo usa la biblioteca estandar y no importa el
+# lexer ni el parser, asi que arranca rapido. Protocolo: un objeto JSON por linea en
+# cada sentido; las respuestas llegan en el mismo orden que las peticiones, por lo que
+# se pueden enviar varias seguidas sin esperar (ver analizar_varios).
+
+# sin tempfile, para que el cliente arranque mas rapido
+RUTA_SOCKET = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"proyecto_sintactico_{os.getuid()}.sock")
+
+
+class DemonioNoDisponible(Exception):
+    pass
+
+
+class ClienteDemonio:
+    def __init__(self, ruta=RUTA_SOCKET, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(ruta)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            self.sock.close()
+            raise DemonioNoDisponible(f"no hay un demonio escuchando en '{ruta}': {e}") from None
+        self._lector = self.sock.makefile("rb")
+        self._siguiente_id = 0
+
+    def enviar(self, peticion):
+        # devuelve el id de la peticion
+        if "id" not in peticion:
+            self._siguiente_id += 1
+            peticion = {**peticion, "id": self._siguiente_id}
+        self.sock.sendall((json.dumps(peticion, ensure_ascii=False) + "\n").encode("utf-8"))
+        return peticion["id"]
+
+    def recibir(self):
+        linea = self._lector.readline()
+        if not linea:
+            raise DemonioNoDisponible("el demonio cerro la conexion")
+        return json.loads(linea)
+
+    def analizar(self, fuente=None, ruta=None, **opciones):
+        # fuente: el texto a analizar; ruta: un archivo que lee el demonio
+        self.enviar(_peticion(fuente, ruta, opciones))
+        return self.recibir()
+
+    def analizar_varios(self, rutas, **opciones):
+        # todas las peticiones se envian antes de leer la primera respuesta
+        for ruta in rutas:
+            self.enviar(_peticion(None, ruta, opciones))
+        return [self.recibir() for _ in rutas]
+
+    def ping(self):
+        self.enviar({"op": "ping"})
+        return self.recibir()
+
+    def detener(self):
+        # el demonio termina las peticiones pendientes y se cierra
+        self.enviar({"op": "cerrar"})
+        return self.recibir()
+
+    def cerrar(self):
+        self._lector.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _peticion(fuente, ruta, opciones):
+    if fuente is not None:
+        return {"op": "analizar", "fuente": fuente, **opciones}
+    return {"op": "analizar", "ruta": os.path.abspath(ruta), **opciones}
+
+
+def principal(argv=None):
+    ap = argparse.ArgumentParser(prog="cliente.py", description="Analizar archivos con el demonio en ejecucion.")
+    ap.add_argument("entradas", nargs="*", metavar="entrada", help="archivos a analizar ('-' lee la entrada estandar)")
+    ap.add_argument("--socket", default=RUTA_SOCKET)
+    ap.add_argument("--recuperar", action="store_true")
+    ap.add_argument("--max-errores", type=int, default=None)
+    ap.add_argument("--prevalidar", action="store_true")
+    ap.add_argument("--detener", action="store_true", help="pedir al demonio que termine")
+    args = ap.parse_args(argv)
+    if not args.entradas and not args.detener:
+        ap.error("falta al menos una entrada")
+
+    opciones = {}
+    if args.recuperar:
+        opciones["recuperar"] = True
+    if args.max_errores is not None:
+        opciones["max_errores"] = args.max_errores
+    if args.prevalidar:
+        opciones["prevalidar"] = True
+    try:
+        with ClienteDemonio(args.socket) as cliente:
+            if args.detener:
+                cliente.detener()
+                return 0
+            rutas = [e for e in args.entradas if e != "-"]
+            respuestas = cliente.analizar_varios(rutas, **opciones)
+            if "-" in args.entradas:
+                respuestas.append(cliente.analizar(sys.stdin.read(), **opciones))
+                rutas.append("-")
+    except DemonioNoDisponible as e:
+        print(e, file=sys.stderr)
+        return 2
+    errores = 0
+    for ruta, r in zip(rutas, respuestas):
+        if "error" in r:
+            print(f"{ruta}: {r['error']}")
+            errores += 1
+            continue
+        errores += not r["exito"]
+        if len(rutas) == 1:
+            print(r["salida"].rstrip("\n"))
+        else:
+            primera = r["salida"].strip().splitlines()[0] if r["salida"].strip() else ""
+            print(f"{ruta}: {primera}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
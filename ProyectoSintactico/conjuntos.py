@@ -0,0 +1,34 @@
+from functools import lru_cache
+from types import MappingProxyType
+
+from gramatica import LENGUAJE
+
+# Conjuntos PRIMEROS, SIGUIENTES y PREDICCION calculados a partir de la gramatica de
+# gramatica.py, la misma que usa el motor LL(1) (ll1.py). Terminales representados por
+# lexemas o por tipos de token cuando aplica. PREDICCION va por produccion, con el texto
+# de la produccion como clave ("instruccion → sentencia_if").
+
+# congelados al importar: se construyen una sola vez por proceso
+def _congelar(conjuntos):
+    return MappingProxyType({nombre: frozenset(terms) for nombre, terms in conjuntos.items()})
+
+PRIMEROS = _congelar(LENGUAJE.primeros)
+SIGUIENTES = _congelar(LENGUAJE.siguientes)
+PREDICCION = _congelar({str(p): LENGUAJE.prediccion[p.numero] for p in LENGUAJE.producciones})
+
+
+@lru_cache(maxsize=None)
+def reporte_conjuntos():
+    # texto del reporte de conjuntos; se formatea solo la primera vez
+    lineas = ["\nCONJUNTOS ", "PRIMEROS:"]
+    for nt in sorted(PRIMEROS):
+        lineas.append(f"  PRIMEROS({nt}) = {{{', '.join(sorted(PRIMEROS[nt]))}}}")
+
+    lineas.append("\nSIGUIENTES:")
+    for nt in sorted(SIGUIENTES):
+        lineas.append(f"  SIGUIENTES({nt}) = {{{', '.join(sorted(SIGUIENTES[nt]))}}}")
+
+    lineas.append("\nPREDICCION")
+    for prod in sorted(PREDICCION):
+        lineas.append(f"  PRED({prod}) = {{{', '.join(sorted(PREDICCION[prod]))}}}")
+    return "\n".join(lineas)
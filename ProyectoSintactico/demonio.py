@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+
+from cliente import RUTA_SOCKET
+from servicio import ServicioAsincrono
+
+# Demonio de analisis sobre un socket Unix local, para editores y hooks que analizan
+# un archivo por vez: el interprete, los imports y las tablas del lexer y del parser
+# se cargan una sola vez. Protocolo (ver cliente.py): un objeto JSON por linea.
+#
+#   {"id": 1, "fuente": "x = 1\n"}                 analizar un texto
+#   {"id": 2, "ruta": "/abs/archivo.py"}           analizar un archivo (lo lee el demonio)
+#   {"id": 3, "op": "ping"}
+#   {"id": 4, "op": "cerrar"}                      terminar ordenadamente
+#
+# Las peticiones de analisis aceptan las opciones de OPCIONES. La respuesta lleva el
+# mismo id, exito, diagnosticos, segundos y "salida" (el texto de siempre), o "error".
+# En una conexion se pueden enviar varias peticiones sin esperar: se analizan a la vez
+# (hasta MAX_EN_VUELO por conexion) y se responden en el orden en que llegaron.
+# Al cerrar (op "cerrar", SIGTERM o SIGINT) no se aceptan conexiones ni peticiones
+# nuevas, se responden las pendientes y se borra el socket.
+
+OPCIONES = ("modo_escaner", "recuperar", "max_errores", "mostrar_conjuntos", "prevalidar")
+MAX_EN_VUELO = 64
+LIMITE_MENSAJE = 64 * 1024 * 1024
+
+
+def codificar(respuesta):
+    return (json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class Demonio:
+    def __init__(self, ruta=RUTA_SOCKET, trabajadores=1, max_pendientes=None, procesos=False):
+        self.ruta = ruta
+        self.servicio = ServicioAsincrono(trabajadores, max_pendientes, procesos=procesos)
+        self.servidor = None
+        self.conexiones = set()
+        self.lecturas = set()
+        self._detenido = None
+
+    async def iniciar(self):
+        self._liberar_ruta()
+        self._detenido = asyncio.Event()
+        # calentamiento: la primera llamada ya no paga nada que se pueda pagar antes
+        await self.servicio.analizar("def f(a):\n    return a\n")
+        self.servidor = await asyncio.start_unix_server(self._atender, path=self.ruta, limit=LIMITE_MENSAJE)
+        os.chmod(self.ruta, 0o600)
+
+    def _liberar_ruta(self):
+        # un socket que quedo de un demonio anterior se reemplaza; uno activo no
+        if not os.path.exists(self.ruta):
+            return
+        prueba = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            prueba.connect(self.ruta)
+        except ConnectionRefusedError:
+            os.unlink(self.ruta)
+            return
+        finally:
+            prueba.close()
+        raise RuntimeError(f"ya hay un demonio escuchando en '{self.ruta}'")
+
+    async def servir(self):
+        await self.iniciar()
+        await self.esperar()
+
+    async def esperar(self):
+        # hasta detener() o una senal; despues cierra ordenadamente
+        bucle = asyncio.get_running_loop()
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            bucle.add_signal_handler(senal, self.detener)
+        try:
+            await self._detenido.wait()
+        finally:
+            for senal in (signal.SIGTERM, signal.SIGINT):
+                bucle.remove_signal_handler(senal)
+            await self.cerrar()
+
+    def detener(self):
+        self._detenido.set()
+
+    async def cerrar(self):
+        self.servidor.close()
+        for lectura in list(self.lecturas):
+            lectura.cancel()
+        await asyncio.gather(*self.conexiones, return_exceptions=True)
+        await self.servidor.wait_closed()
+        if os.path.exists(self.ruta):
+            os.unlink(self.ruta)
+        await self.servicio.__aexit__()
+
+    # -------------------- conexiones --------------------
+    async def _atender(self, lector, escritor):
+        self.conexiones.add(asyncio.current_task())
+        cola = asyncio.Queue()
+        lugares = asyncio.Semaphore(MAX_EN_VUELO)
+        lectura = asyncio.create_task(self._leer(lector, cola, lugares))
+        self.lecturas.add(lectura)
+        try:
+            while True:
+                pendiente = await cola.get()
+                if pendiente is None:
+                    break
+                respuesta = await pendiente
+                lugares.release()
+                escritor.write(codificar(respuesta))
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            lectura.cancel()
+            self.lecturas.discard(lectura)
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+            self.conexiones.discard(asyncio.current_task())
+
+    async def _leer(self, lector, cola, lugares):
+        try:
+            while True:
+                await lugares.acquire()
+                try:
+                    linea = await lector.readline()
+                except ValueError:
+                    # linea mas larga que LIMITE_MENSAJE: se responde y se corta la conexion
+                    cola.put_nowait(_listo({"id": None, "error": "mensaje demasiado largo"}))
+                    break
+                if not linea:
+                    break
+                cola.put_nowait(asyncio.ensure_future(self._responder(linea)))
+        except ConnectionError:
+            pass
+        finally:
+            cola.put_nowait(None)
+
+    async def _responder(self, linea):
+        try:
+            peticion = json.loads(linea)
+            if not isinstance(peticion, dict):
+                raise ValueError("se esperaba un objeto JSON")
+        except ValueError as e:
+            return {"id": None, "error": f"peticion invalida: {e}"}
+        ident = peticion.get("id")
+        op = peticion.get("op", "analizar")
+        if op == "ping":
+            return {"id": ident, "ok": True, "pid": os.getpid(), "pendientes": self.servicio.pendientes}
+        if op == "cerrar":
+            self.detener()
+            return {"id": ident, "ok": True}
+        if op != "analizar":
+            return {"id": ident, "error": f"operacion desconocida: {op!r}"}
+
+        opciones = {k: peticion[k] for k in OPCIONES if k in peticion}
+        if "fuente" in peticion:
+            fuente = peticion["fuente"]
+        elif "ruta" in peticion:
+            try:
+                with open(peticion["ruta"], "rb") as f:
+                    fuente = f.read()
+            except OSError as e:
+                return {"id": ident, "error": f">>> No se pudo leer el archivo: {e}"}
+        else:
+            return {"id": ident, "error": "falta 'fuente' o 'ruta'"}
+        try:
+            r = await self.servicio.analizar(fuente, **opciones)
+        except (TypeError, ValueError) as e:
+            return {"id": ident, "error": f"opciones invalidas: {e}"}
+        return {"id": ident, **r.a_dict(), "salida": r.texto()}
+
+
+def _listo(valor):
+    futuro = asyncio.get_running_loop().create_future()
+    futuro.set_result(valor)
+    return futuro
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="demonio.py", description="Demonio de analisis sobre un socket Unix.")
+    ap.add_argument("--socket", default=RUTA_SOCKET)
+    ap.add_argument("--trabajadores", type=int, default=1,
+                    help="analisis simultaneos (hilos, o procesos con --procesos)")
+    ap.add_argument("--max-pendientes", type=int, default=None)
+    ap.add_argument("--procesos", action="store_true")
+    args = ap.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    async def principal(demonio):
+        await demonio.iniciar()
+        print(f"Escuchando en '{demonio.ruta}' (detener con: python cliente.py --detener)", flush=True)
+        await demonio.esperar()
+
+    try:
+        asyncio.run(principal(Demonio(args.socket, args.trabajadores, args.max_pendientes, args.procesos)))
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,152 @@
+import json
+import sys
+
+from lexer import ErrorLexico
+
+# Diagnosticos del analisis como registros (linea, col, encontrado, esperados) y
+# destinos donde se acumulan. El texto se arma recien al vaciar el destino o al
+# pedir texto(), con el mismo formato de siempre, y cada vaciado es una sola escritura.
+#
+#   DestinoMemoria   solo guarda los registros
+#   DestinoTexto     escribe el texto en un objeto con write (archivo abierto, StringIO)
+#   DestinoConsola   DestinoTexto sobre sys.stdout
+#   DestinoArchivo   escribe el texto completo en una ruta
+#   DestinoJSONL     un objeto JSON por diagnostico
+#
+# Todos guardan los registros, asi que despues de vaciar se puede volver a pedir texto().
+
+MENSAJE_EXITO = "El analisis sintactico ha finalizado exitosamente."
+TIPOS_DIAGNOSTICO = ("sintactico", "indentacion", "lexico", "semantico", "limite", "exito", "conjuntos", "entrada")
+
+
+class Diagnostico:
+    __slots__ = ("tipo", "linea", "col", "encontrado", "esperados", "mensaje")
+
+    # mensaje: texto ya armado para los tipos sin posicion ("limite", "exito", "conjuntos", "entrada")
+    # y la descripcion de un error "semantico" (con 'encontrado' = el nombre)
+    def __init__(self, tipo, linea=0, col=0, encontrado=None, esperados=(), mensaje=None):
+        self.tipo = tipo
+        self.linea = linea
+        self.col = col
+        self.encontrado = encontrado
+        self.esperados = tuple(esperados)
+        self.mensaje = mensaje
+
+    def __repr__(self):
+        return f"Diagnostico({self.tipo!r},{self.linea},{self.col},{self.encontrado!r},{self.esperados!r})"
+
+    def formatear(self):
+        if self.tipo == "sintactico":
+            esperados = ", ".join(f"\"{e}\"" for e in self.esperados)
+            return (f"<{self.linea},{self.col}> Error sintactico: se encontro: \"{self.encontrado}\"; "
+                    f"se esperaba: {esperados}.\n")
+        if self.tipo == "indentacion":
+            return f"<{self.linea},{self.col}>Error sintactico: falla de indentacion\n"
+        if self.tipo == "lexico":
+            # sin salto de linea final, como siempre
+            return str(ErrorLexico(self.linea, self.col))
+        if self.tipo == "semantico":
+            return f"<{self.linea},{self.col}> Error semantico: {self.mensaje}\n"
+        return self.mensaje + "\n"
+
+    def a_dict(self):
+        d = {"tipo": self.tipo}
+        if self.tipo in ("sintactico", "indentacion", "lexico", "semantico"):
+            d["linea"], d["col"] = self.linea, self.col
+        if self.tipo == "semantico":
+            d["encontrado"] = self.encontrado
+        if self.tipo == "sintactico":
+            d["encontrado"], d["esperados"] = self.encontrado, list(self.esperados)
+        if self.mensaje is not None:
+            d["mensaje"] = self.mensaje
+        return d
+
+    @classmethod
+    def desde_dict(cls, d):
+        return cls(d["tipo"], d.get("linea", 0), d.get("col", 0), d.get("encontrado"),
+                   d.get("esperados", ()), d.get("mensaje"))
+
+    @classmethod
+    def desde_error_lexico(cls, error):
+        return cls("lexico", error.linea, error.col)
+
+
+def formatear(registros):
+    return "".join(d.formatear() for d in registros)
+
+
+class DestinoMemoria:
+    def __init__(self):
+        self.registros = []
+        self._vaciados = 0
+
+    def agregar(self, diagnostico):
+        self.registros.append(diagnostico)
+
+    def _pendientes(self):
+        pendientes = self.registros[self._vaciados:]
+        self._vaciados = len(self.registros)
+        return pendientes
+
+    def vaciar(self):
+        self._vaciados = len(self.registros)
+
+    def texto(self):
+        return formatear(self.registros)
+
+    def errores(self):
+        return [d for d in self.registros if d.tipo in ("sintactico", "indentacion", "lexico", "semantico")]
+
+
+class DestinoTexto(DestinoMemoria):
+    def __init__(self, archivo):
+        super().__init__()
+        self.archivo = archivo
+
+    def vaciar(self):
+        pendientes = self._pendientes()
+        if pendientes:
+            self.archivo.write(formatear(pendientes))
+
+
+class DestinoConsola(DestinoTexto):
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+
+class DestinoArchivo(DestinoMemoria):
+    # el archivo se crea (o se reemplaza) en cada vaciado con todo el texto
+    def __init__(self, ruta, encoding="utf-8"):
+        super().__init__()
+        self.ruta = ruta
+        self.encoding = encoding
+
+    def vaciar(self):
+        super().vaciar()
+        with open(self.ruta, "w", encoding=self.encoding) as f:
+            f.write(self.texto())
+
+
+class DestinoJSONL(DestinoMemoria):
+    # 'campos' se agregan a cada linea (p.ej. archivo=ruta en el modo lote)
+    def __init__(self, archivo, **campos):
+        super().__init__()
+        self.archivo = archivo
+        self.campos = campos
+
+    def vaciar(self):
+        pendientes = self._pendientes()
+        if pendientes:
+            self.archivo.write("".join(json.dumps({**self.campos, **d.a_dict()}, ensure_ascii=False) + "\n"
+                                       for d in pendientes))
+
+
+def destino_para(salida):
+    # acepta un destino, un objeto con write o None (consola)
+    if isinstance(salida, DestinoMemoria):
+        return salida
+    if salida is None:
+        return DestinoConsola()
+    if hasattr(salida, "write"):
+        return DestinoTexto(salida)
+    raise TypeError(f"salida no soportada: {salida!r}")
@@ -0,0 +1,321 @@
+from lexer import OPERADORES, RESERVADAS, TIPOS_TOKEN, codigo
+
+# Gramatica del lenguaje en una sola definicion declarativa. De aqui salen los conjuntos
+# PRIMEROS/SIGUIENTES/PREDICCION (conjuntos.py), las decisiones del parser recursivo que
+# dependen de ellos y la tabla del motor LL(1) (ll1.py). El parser recursivo acepta el
+# mismo lenguaje con los mismos mensajes de error.
+#
+# Notacion: una regla por linea 'A → α | β' (las lineas que empiezan con '|' continuan la
+# anterior). Los terminales son lexemas entre comillas ('def', '(') o tipos de token (id,
+# tk_entero, tk_decimal, tk_cadena); el resto de los nombres son no terminales.
+#   ε            la alternativa vacia
+#   sino α       se elige con cualquier token que no predice otra alternativa (la rama
+#                'else' del parser recursivo); el error aparece despues, mas adentro
+#   @accion      accion de sangria en ese punto; no consume nada
+#   ?predicado   al inicio: la alternativa se elige si el predicado de sangria se cumple,
+#                antes de mirar la tabla
+#   &'t'         alternativa vacia que predice solo el token t
+# Las acciones y los predicados los implementa ll1.py, igual que el parser recursivo.
+
+GRAMATICA = """
+programa               → ε | sino sentencia programa
+sentencia              → @nueva_linea instruccion
+instruccion            → definicion_funcion | sentencia_if | sentencia_while | sentencia_for
+                       | sino sentencia_simple
+sentencia_simple       → 'pass' | 'break' | 'continue' | 'return' valor_return
+                       | 'print' '(' argumentos ')' | sino sentencia_expresion
+valor_return           → ?fin_de_linea | sino expresion
+sentencia_expresion    → lista_expresiones asignaciones
+asignaciones           → '=' lista_expresiones asignaciones | sino ε
+lista_expresiones      → expresion mas_expresiones
+mas_expresiones        → ',' expresion mas_expresiones | sino ε
+
+definicion_funcion     → 'def' id '(' parametros_opt ')' ':' bloque
+sentencia_if           → 'if' expresion ':' bloque ramas_elif rama_else
+ramas_elif             → 'elif' expresion ':' bloque ramas_elif | sino ε
+rama_else              → 'else' ':' bloque | sino ε
+sentencia_while        → 'while' expresion ':' bloque
+sentencia_for          → 'for' id 'in' expresion ':' bloque
+bloque                 → @indentar sentencias_bloque @dedentar
+sentencias_bloque      → ?fin_de_bloque | sino sentencia sentencias_bloque
+
+parametros_opt         → ε | sino parametros
+parametros             → parametro mas_parametros
+mas_parametros         → ',' tras_coma_parametro | sino ε
+tras_coma_parametro    → ε | sino parametro mas_parametros
+parametro              → id anotacion
+anotacion              → ':' tipo_anotado | sino ε
+tipo_anotado           → '[' nombre_tipo ']' | sino nombre_tipo
+nombre_tipo            → id
+
+expresion              → operando resto_expresion
+operando               → 'not' operando | sino operando_aritmetico
+operando_aritmetico    → '+' operando_aritmetico | '-' operando_aritmetico | sino atomo
+resto_expresion        → '(' argumentos ')' resto_expresion
+                       | '[' expresion ']' resto_expresion
+                       | '.' id resto_expresion
+                       | 'or' operando resto_expresion | 'and' operando resto_expresion
+                       | op_comparacion operando_aritmetico resto_expresion
+                       | op_aritmetico operando_aritmetico resto_expresion
+                       | sino ε
+op_comparacion         → '==' | '!=' | '<' | '>' | '<=' | '>=' | 'in' | 'is'
+op_aritmetico          → '+' | '-' | '*' | '/' | '%'
+atomo                  → id | tk_entero | tk_decimal | tk_cadena | 'True' | 'False' | 'None'
+                       | '(' resto_parentesis | '[' resto_lista
+                       | 'lambda' parametros_lambda ':' expresion
+resto_parentesis       → ')' | sino expresion ')'
+resto_lista            → ']' | sino expresion mas_elementos
+mas_elementos          → ',' tras_coma_lista | sino ']'
+tras_coma_lista        → ']' | sino expresion mas_elementos
+parametros_lambda      → ε | sino id mas_parametros_lambda
+mas_parametros_lambda  → ',' id mas_parametros_lambda | sino ε
+
+argumentos             → ε | sino expresion tras_primer_argumento
+tras_primer_argumento  → comprension mas_comprension | ',' tras_coma_argumento | ε
+tras_coma_argumento    → ε | sino expresion tras_argumento
+tras_argumento         → comprension mas_comprension_cierre | ',' tras_coma_argumento | ε
+comprension            → 'for' id 'in' expresion
+mas_comprension        → 'if' expresion mas_comprension | comprension mas_comprension | sino ε
+mas_comprension_cierre → 'if' expresion mas_comprension_cierre | comprension mas_comprension_cierre
+                       | ε | &','
+"""
+
+# lo que se informa como esperado cuando un no terminal sin 'sino' no tiene alternativa
+# para el token actual (si falta, los terminales que predicen sus alternativas)
+ESPERADOS = {
+    "atomo": ("id", "num", "cadena", "(", "[", "lambda", "True", "False", "None"),
+    "nombre_tipo": ("tipo/identificador",),
+    "tras_primer_argumento": (")", ","),
+    "tras_argumento": (")", ","),
+    "mas_comprension_cierre": (")", ","),
+}
+
+# nombre con el que se muestra un terminal esperado que no coincide (por defecto el lexema
+# o el tipo de token)
+NOMBRES_TERMINAL = {"id": "identificador"}
+
+EPSILON = "ε"
+SINO = "sino"
+FLECHA = "→"
+
+# terminales: lexemas de operadores y palabras reservadas, y los tipos de token que no
+# se escriben con su lexema
+TIPOS_SIN_LEXEMA = frozenset(("EOF", "id", "tk_entero", "tk_decimal", "tk_cadena"))
+TERMINALES = frozenset(OPERADORES) | frozenset(RESERVADAS) | TIPOS_SIN_LEXEMA
+
+
+class ErrorGramatica(Exception):
+    pass
+
+
+class Produccion:
+    __slots__ = ("numero", "cabeza", "simbolos", "por_defecto")
+
+    def __init__(self, numero, cabeza, simbolos, por_defecto):
+        self.numero = numero
+        self.cabeza = cabeza
+        self.simbolos = simbolos      # tupla de simbolos (ver es_terminal, es_accion, ...)
+        self.por_defecto = por_defecto
+
+    def __str__(self):
+        cuerpo = " ".join(_mostrar(s) for s in self.simbolos) if self.simbolos else EPSILON
+        return f"{self.cabeza} {FLECHA} {cuerpo}"
+
+    @property
+    def predicado(self):
+        # nombre del predicado que la guarda, o None
+        if self.simbolos and es_predicado(self.simbolos[0]):
+            return self.simbolos[0][1:]
+        return None
+
+
+# los terminales se guardan como "'x'" para distinguirlos de los no terminales;
+# id, tk_entero, ... y EOF tambien
+def es_terminal(s):
+    return s[0] == "'"
+
+def es_accion(s):
+    return s[0] == "@"
+
+def es_predicado(s):
+    return s[0] == "?"
+
+def es_anticipacion(s):
+    return s[0] == "&"
+
+def terminal(s):
+    # nombre del terminal ("def", "(", "id") a partir del simbolo
+    return s.strip("&'")
+
+def _mostrar(s):
+    if es_terminal(s) and s[1:-1] in TIPOS_SIN_LEXEMA:
+        return s[1:-1]
+    return s
+
+
+class Gramatica:
+    def __init__(self, texto, inicial):
+        self.inicial = inicial
+        self.reglas = {}          # no terminal -> [Produccion]
+        self.producciones = []
+        self._leer(texto)
+        self.anulables = set()
+        self.primeros = {nt: set() for nt in self.reglas}
+        self.siguientes = {nt: set() for nt in self.reglas}
+        self._calcular_primeros()
+        self._calcular_siguientes()
+        self.prediccion = {p.numero: self._predecir(p) for p in self.producciones}
+        self.tabla = self._construir_tabla()
+
+    # -------------------- lectura --------------------
+    def _leer(self, texto):
+        lineas = []
+        for linea in texto.splitlines():
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            if linea.startswith("|"):
+                if not lineas:
+                    raise ErrorGramatica(f"continuacion sin regla: {linea!r}")
+                lineas[-1] += " " + linea
+            else:
+                lineas.append(linea)
+        crudas = []
+        for linea in lineas:
+            cabeza, flecha, cuerpo = linea.partition(FLECHA)
+            cabeza = cabeza.strip()
+            if not flecha or not cabeza.isidentifier():
+                raise ErrorGramatica(f"regla invalida: {linea!r}")
+            if cabeza in self.reglas:
+                raise ErrorGramatica(f"no terminal definido dos veces: {cabeza}")
+            self.reglas[cabeza] = []
+            crudas.append((cabeza, cuerpo))
+        if self.inicial not in self.reglas:
+            raise ErrorGramatica(f"falta el simbolo inicial {self.inicial}")
+
+        for cabeza, cuerpo in crudas:
+            for alternativa in cuerpo.split("|"):
+                partes = alternativa.split()
+                por_defecto = bool(partes) and partes[0] == SINO
+                if por_defecto:
+                    partes = partes[1:]
+                simbolos = tuple(self._simbolo(cabeza, s) for s in partes if s != EPSILON)
+                p = Produccion(len(self.producciones), cabeza, simbolos, por_defecto)
+                self._validar(p)
+                self.reglas[cabeza].append(p)
+                self.producciones.append(p)
+            if sum(p.por_defecto for p in self.reglas[cabeza]) > 1:
+                raise ErrorGramatica(f"{cabeza} tiene mas de una alternativa 'sino'")
+            if sum(p.predicado is not None for p in self.reglas[cabeza]) > 1:
+                raise ErrorGramatica(f"{cabeza} tiene mas de una alternativa con predicado")
+
+    def _simbolo(self, cabeza, s):
+        if s[0] in "@?" and s[1:].isidentifier():
+            return s
+        if s[0] == "&":
+            if terminal(s) not in TERMINALES:
+                raise ErrorGramatica(f"terminal desconocido en {cabeza}: {s}")
+            return s
+        if s[0] == "'" and s[-1] == "'" and len(s) > 2:
+            if s[1:-1] not in TERMINALES:
+                raise ErrorGramatica(f"terminal desconocido en {cabeza}: {s}")
+            return s
+        if s in self.reglas:
+            return s
+        if s in TERMINALES:
+            return f"'{s}'"
+        raise ErrorGramatica(f"simbolo desconocido en {cabeza}: {s}")
+
+    def _validar(self, p):
+        for k, s in enumerate(p.simbolos):
+            if es_predicado(s) and k != 0:
+                raise ErrorGramatica(f"el predicado debe ir al inicio: {p}")
+            if es_anticipacion(s) and len(p.simbolos) != 1:
+                raise ErrorGramatica(f"una anticipacion va sola en su alternativa: {p}")
+        if p.predicado is not None and p.por_defecto:
+            raise ErrorGramatica(f"una alternativa con predicado no puede ser 'sino': {p}")
+
+    # -------------------- conjuntos --------------------
+    def primeros_de(self, simbolos):
+        # (PRIMEROS de la secuencia, si la secuencia es anulable)
+        resultado = set()
+        for s in simbolos:
+            if es_terminal(s):
+                resultado.add(terminal(s))
+                return resultado, False
+            if s in self.reglas:
+                resultado |= self.primeros[s]
+                if s not in self.anulables:
+                    return resultado, False
+            # acciones, predicados y anticipaciones no consumen nada
+        return resultado, True
+
+    def _calcular_primeros(self):
+        cambio = True
+        while cambio:
+            cambio = False
+            for p in self.producciones:
+                primeros, anulable = self.primeros_de(p.simbolos)
+                antes = len(self.primeros[p.cabeza])
+                self.primeros[p.cabeza] |= primeros
+                if anulable and p.cabeza not in self.anulables:
+                    self.anulables.add(p.cabeza)
+                    cambio = True
+                cambio = cambio or len(self.primeros[p.cabeza]) != antes
+
+    def _calcular_siguientes(self):
+        self.siguientes[self.inicial].add("EOF")
+        cambio = True
+        while cambio:
+            cambio = False
+            for p in self.producciones:
+                for k, s in enumerate(p.simbolos):
+                    if s not in self.reglas:
+                        continue
+                    primeros, anulable = self.primeros_de(p.simbolos[k + 1:])
+                    if anulable:
+                        primeros |= self.siguientes[p.cabeza]
+                    antes = len(self.siguientes[s])
+                    self.siguientes[s] |= primeros
+                    cambio = cambio or len(self.siguientes[s]) != antes
+
+    def _predecir(self, p):
+        if p.simbolos and es_anticipacion(p.simbolos[0]):
+            return {terminal(p.simbolos[0])}
+        primeros, anulable = self.primeros_de(p.simbolos)
+        if anulable:
+            primeros |= self.siguientes[p.cabeza]
+        return primeros
+
+    # -------------------- tabla LL(1) --------------------
+    def _construir_tabla(self):
+        # tabla[no terminal][codigo de token] = numero de produccion, o -1 (error).
+        # Las alternativas con predicado no entran (se eligen antes de mirar la tabla) y
+        # la alternativa 'sino' ocupa las celdas que ninguna otra predice.
+        tabla = {}
+        for nt, producciones in self.reglas.items():
+            fila = [-1] * len(TIPOS_TOKEN)
+            for p in producciones:
+                if p.por_defecto or p.predicado is not None:
+                    continue
+                for t in self.prediccion[p.numero]:
+                    cod = codigo(t)
+                    if fila[cod] != -1:
+                        otra = self.producciones[fila[cod]]
+                        raise ErrorGramatica(f"conflicto LL(1) con {t!r}: '{otra}' y '{p}'")
+                    fila[cod] = p.numero
+            for p in producciones:
+                if p.por_defecto:
+                    fila = [p.numero if n == -1 else n for n in fila]
+            tabla[nt] = fila
+        return tabla
+
+    def produccion(self, texto):
+        # la produccion con ese texto ("instruccion → sentencia_if")
+        for p in self.producciones:
+            if str(p) == texto:
+                return p
+        raise KeyError(texto)
+
+
+LENGUAJE = Gramatica(GRAMATICA, inicial="programa")
@@ -0,0 +1,303 @@
+from bisect import bisect_right
+from itertools import islice
+
+from lexer import Scanner, ErrorLexico, Token
+from parser import AnalizadorSintactico, AbortarSintaxis, K_EOF
+from conjuntos import reporte_conjuntos
+from diagnosticos import MENSAJE_EXITO, DestinoMemoria
+
+
+def dividir_lineas(texto):
+    # igual que el lexer, solo '\n' separa lineas; cada linea conserva su '\n'
+    partes = texto.split("\n")
+    return [p + "\n" for p in partes[:-1]] + [partes[-1]]
+
+
+class SesionIncremental:
+    # Mantiene el texto, los tokens y el resultado del analisis por sentencia de
+    # nivel superior. editar() vuelve a escanear solo las lineas afectadas y vuelve
+    # a analizar solo las sentencias de nivel superior que las contienen, hasta que
+    # el analisis se resincroniza con el anterior. El resultado es el mismo texto
+    # que produce analizar_texto() sobre el archivo completo.
+    #
+    # Posiciones de edicion: lineas desde 1 y columnas en caracteres desde 1
+    # (sin expandir tabs); el rango [inicio, fin) se reemplaza por 'reemplazo'.
+    def __init__(self, texto, mostrar_conjuntos=False, margen_lineas=32):
+        self.mostrar_conjuntos = mostrar_conjuntos
+        self.margen_lineas = margen_lineas
+        self.lineas = dividir_lineas(texto)
+        self._analisis_completo()
+
+    # -------------------- consulta --------------------
+    @property
+    def texto(self):
+        return "".join(self.lineas)
+
+    def resultado(self):
+        if self.error_lexico is not None:
+            return self.error_lexico
+        texto = (self.mensaje_error if self.error_en is not None else MENSAJE_EXITO) + "\n"
+        if self.mostrar_conjuntos:
+            texto += reporte_conjuntos() + "\n"
+        return texto
+
+    # -------------------- edicion --------------------
+    def editar(self, linea_ini, col_ini, linea_fin, col_fin, reemplazo):
+        lineas = self.lineas
+        if not (1 <= linea_ini <= linea_fin <= len(lineas)):
+            raise ValueError("rango de lineas fuera del texto")
+        # una columna puede estar a lo sumo justo despues del ultimo caracter, antes del
+        # '\n': mas alla se perderia el salto de linea y las lineas dejarian de coincidir
+        # con las posiciones guardadas
+        if not (1 <= col_ini <= len(lineas[linea_ini - 1].rstrip("\n")) + 1
+                and 1 <= col_fin <= len(lineas[linea_fin - 1].rstrip("\n")) + 1):
+            raise ValueError("columna fuera de la linea")
+        if linea_ini == linea_fin and col_fin < col_ini:
+            raise ValueError("el fin del rango esta antes del inicio")
+        prefijo = lineas[linea_ini - 1][:col_ini - 1]
+        sufijo = lineas[linea_fin - 1][col_fin - 1:]
+        nuevas = dividir_lineas(prefijo + reemplazo + sufijo)
+        if nuevas[-1] == "" and linea_fin < len(lineas):
+            nuevas.pop()
+        lineas[linea_ini - 1:linea_fin] = nuevas
+        nueva_fin = linea_ini + len(nuevas) - 1
+
+        if self.error_lexico is not None or not self._reescanear(linea_ini, linea_fin, nueva_fin):
+            self._analisis_completo()
+        return self.resultado()
+
+    # -------------------- analisis completo --------------------
+    def _analisis_completo(self):
+        self.error_lexico = None
+        texto = "".join(self.lineas)
+        inicios_linea = [0]
+        for linea in self.lineas[:-1]:
+            inicios_linea.append(inicios_linea[-1] + len(linea))
+        sc = Scanner(texto, modo="tabla")
+        self.tokens = []
+        self.pos = []
+        try:
+            for tipo, ini, fin, linea, col in sc._recorrer():
+                self.tokens.append(Token(tipo, texto[ini:fin], linea, col))
+                self.pos.append(ini - inicios_linea[linea - 1])
+        except ErrorLexico as le:
+            self.error_lexico = str(le)
+            self.tokens, self.pos = [], []
+            self.ini_sent, self.estado_sent, self.error_en = [], [], None
+            self.reserva_ini, self.reserva_estado, self.reserva_error = [], [], None
+            return
+        self._agregar_eof()
+        self.ini_sent, self.estado_sent = [], []
+        self.reserva_ini, self.reserva_estado, self.reserva_error = [], [], None
+        self._parsear_desde(0, None)
+
+    def _agregar_eof(self):
+        if self.tokens:
+            ultimo = self.tokens[-1]
+            self.tokens.append(Token("EOF", "", ultimo.linea, ultimo.col + 1))
+        else:
+            self.tokens.append(Token("EOF", "", 1, 1))
+        self.pos.append(-1)
+
+    # -------------------- reescaneo por lineas --------------------
+    def _reescanear(self, linea_ini, linea_fin, nueva_fin):
+        # devuelve False si hace falta un analisis completo
+        toks, pos = self.tokens, self.pos
+        delta = nueva_fin - linea_fin
+        # una cadena que empieza antes y llega a la linea 'desde' obliga a empezar antes
+        desde = linea_ini
+        n_previos = self._primer_token_en_linea(desde)
+        while n_previos > 0:
+            previo = toks[n_previos - 1]
+            if previo.linea + previo.lexema.count("\n") < desde:
+                break
+            desde = previo.linea
+            n_previos = self._primer_token_en_linea(desde)
+        # candidatos de resincronizacion: tokens viejos despues de las lineas editadas
+        k_viejo = self._primer_token_en_linea(linea_fin + 1)
+        ultimo_viejo = len(toks) - 1  # indice del EOF viejo
+
+        hasta = min(len(self.lineas), nueva_fin + self.margen_lineas)
+        while True:
+            res = self._escanear_ventana(desde, hasta, nueva_fin, delta, k_viejo, ultimo_viejo)
+            if res is not None:
+                break
+            if hasta >= len(self.lineas):
+                return False
+            hasta = min(len(self.lineas), nueva_fin + max(1, 2 * (hasta - nueva_fin)))
+        nuevos, nuevas_pos, k_sync = res
+
+        n_nuevos = len(nuevos)
+        if k_sync is None:
+            # se escaneo hasta el final del archivo
+            toks[n_previos:] = nuevos
+            pos[n_previos:] = nuevas_pos
+            self._agregar_eof()
+            self._reparsear(n_previos, None, 0, 0)
+            return True
+        toks[n_previos:k_sync] = nuevos
+        pos[n_previos:k_sync] = nuevas_pos
+        sync_nuevo = n_previos + n_nuevos
+        if delta:
+            for t in islice(toks, sync_nuevo, None):
+                t.linea += delta
+        self._reparsear(n_previos, sync_nuevo, sync_nuevo - k_sync, delta)
+        return True
+
+    def _primer_token_en_linea(self, linea):
+        # indice del primer token (sin contar EOF) con token.linea >= linea
+        toks = self.tokens
+        lo, hi = 0, len(toks) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if toks[mid].linea < linea:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _escanear_ventana(self, desde, hasta, nueva_fin, delta, k_viejo, ultimo_viejo):
+        # escanea las lineas [desde, hasta]; devuelve (tokens, posiciones, indice viejo
+        # de resincronizacion o None si se llego al final), o None si hay que ampliar
+        lineas = self.lineas
+        texto = "".join(lineas[desde - 1:hasta])
+        inicios_linea = [0]
+        for linea in lineas[desde - 1:hasta - 1]:
+            inicios_linea.append(inicios_linea[-1] + len(linea))
+        sc = Scanner(texto, modo="tabla")
+        sc.buf.linea = desde
+        viejos, pos_viejas = self.tokens, self.pos
+        j = k_viejo
+        nuevos, nuevas_pos = [], []
+        try:
+            for tipo, ini, fin, linea, col in sc._recorrer():
+                p = ini - inicios_linea[linea - desde]
+                if linea > nueva_fin:
+                    objetivo = (linea - delta, p)
+                    while j < ultimo_viejo and (viejos[j].linea, pos_viejas[j]) < objetivo:
+                        j += 1
+                    if j < ultimo_viejo and (viejos[j].linea, pos_viejas[j]) == objetivo:
+                        return nuevos, nuevas_pos, j
+                nuevos.append(Token(tipo, texto[ini:fin], linea, col))
+                nuevas_pos.append(p)
+        except ErrorLexico:
+            # puede ser una cadena cortada por el borde de la ventana
+            return None
+        if hasta < len(lineas):
+            return None
+        return nuevos, nuevas_pos, None
+
+    # -------------------- analisis por sentencias --------------------
+    # Cada sentencia de nivel superior guarda el indice de su primer token y el
+    # estado del parser al empezarla (pila de indentacion, ultima linea). Desde
+    # cualquiera de esos puntos el analisis del resto depende solo de los tokens
+    # siguientes, asi que sirven para resincronizar despues de una edicion.
+    # Cuando un analisis falla, los puntos viejos posteriores al error se guardan
+    # en una cadena de reserva para poder resincronizar cuando se corrija.
+    def _reparsear(self, k_cambio, sync_nuevo, delta_tokens, delta_lineas):
+        reserva = self._desplazar(self.reserva_ini, self.reserva_estado, self.reserva_error,
+                                  sync_nuevo, delta_tokens, delta_lineas)
+        self.reserva_ini, self.reserva_estado, self.reserva_error = reserva
+
+        ini, estados = self.ini_sent, self.estado_sent
+        # el analisis anterior se detuvo antes del cambio: el resultado no cambia
+        if self.error_en is not None and self.i_error < k_cambio:
+            return
+        # primera sentencia cuyo ultimo token mirado (el siguiente a ella) cambio
+        r = max(0, bisect_right(ini, k_cambio) - 1)
+        if r > 0 and ini[r] == k_cambio:
+            r -= 1
+        error_viejo = None if self.error_en is None else self.error_en - (r + 1)
+        cadena = self._desplazar(ini[r + 1:], estados[r + 1:], error_viejo,
+                                 sync_nuevo, delta_tokens, delta_lineas)
+        inicio = ini[r] if ini else 0
+        # la primera sentencia parte del estado inicial del parser (depende del primer token)
+        estado = estados[r] if r > 0 else None
+        del ini[r:], estados[r:]
+        self._parsear_desde(inicio, estado, [cadena, reserva])
+
+    @staticmethod
+    def _desplazar(cadena_ini, cadena_estado, error, sync_nuevo, delta_tokens, delta_lineas):
+        # lleva una cadena de puntos a la numeracion nueva; solo valen los que
+        # quedan despues de la zona reescaneada
+        if sync_nuevo is None:
+            return [], [], None
+        nuevos_ini, nuevos_estado = [], []
+        for k, (pila, ult) in zip(cadena_ini, cadena_estado):
+            if k + delta_tokens >= sync_nuevo:
+                nuevos_ini.append(k + delta_tokens)
+                nuevos_estado.append((pila, ult + delta_lineas))
+        if error is not None:
+            error -= len(cadena_ini) - len(nuevos_ini)
+            if error < 0:
+                return [], [], None
+        return nuevos_ini, nuevos_estado, error
+
+    def _parsear_desde(self, inicio, estado, cadenas=()):
+        # cadenas: [(ini, estados, error)] con las que se puede resincronizar
+        puntos = {}
+        for c, (c_ini, c_estado, _) in enumerate(cadenas):
+            for idx, (k, est) in enumerate(zip(c_ini, c_estado)):
+                puntos.setdefault(k, []).append((c, idx, est))
+
+        destino = DestinoMemoria()
+        p = AnalizadorSintactico(self.tokens, salida=destino)
+        p.i = inicio
+        p.act = self.tokens[inicio]
+        if estado is not None:
+            p.pila_indent = list(estado[0])
+            p.ult_linea_sent = estado[1]
+        ini, estados = self.ini_sent, self.estado_sent
+        self.error_en = None
+        self.mensaje_error = None
+        while p.act.cod != K_EOF:
+            actual = (tuple(p.pila_indent), p.ult_linea_sent)
+            for c, idx, est in puntos.get(p.i, ()):
+                if est == actual:
+                    self._resincronizar(cadenas, c, idx)
+                    return
+            ini.append(p.i)
+            estados.append(actual)
+            try:
+                p.sentencia()
+            except AbortarSintaxis:
+                self.error_en = len(ini) - 1
+                self.i_error = p.i
+                self.mensaje_error = destino.texto().rstrip("\n")
+                # los puntos viejos posteriores quedan de reserva
+                for c_ini, c_estado, c_error in cadenas:
+                    if c_ini:
+                        self.reserva_ini, self.reserva_estado, self.reserva_error = c_ini, c_estado, c_error
+                        break
+                return
+        self.reserva_ini, self.reserva_estado, self.reserva_error = [], [], None
+
+    def _resincronizar(self, cadenas, c, idx):
+        # el resto del analisis es el de la cadena c a partir de su punto idx
+        c_ini, c_estado, c_error = cadenas[c]
+        base = len(self.ini_sent)
+        self.ini_sent.extend(c_ini[idx:])
+        self.estado_sent.extend(c_estado[idx:])
+        if c != 0:
+            # se uso la reserva: ya no queda otra
+            self.reserva_ini, self.reserva_estado, self.reserva_error = [], [], None
+        if c_error is not None:
+            self._regenerar_error(base + c_error - idx)
+
+    def _regenerar_error(self, r):
+        # vuelve a analizar solo la sentencia que fallaba para obtener el mensaje
+        # con las posiciones actualizadas
+        destino = DestinoMemoria()
+        p = AnalizadorSintactico(self.tokens, salida=destino)
+        p.i = self.ini_sent[r]
+        p.act = self.tokens[p.i]
+        pila, ult = self.estado_sent[r]
+        p.pila_indent = list(pila)
+        p.ult_linea_sent = ult
+        del self.ini_sent[r + 1:], self.estado_sent[r + 1:]
+        try:
+            p.sentencia()
+        except AbortarSintaxis:
+            self.error_en = r
+            self.i_error = p.i
+            self.mensaje_error = destino.texto().rstrip("\n")
@@ -0,0 +1,238 @@
+import hashlib
+import mmap
+import struct
+from array import array
+
+from arbol import Nodo, TIPOS_NODO
+from binario import ORDEN_BYTES, LectorColumnas, TablaCadenas, escribir_columnas
+from diagnosticos import DestinoMemoria
+from lexer import Scanner, Token, TokenArray, TIPOS_TOKEN
+from parser import AnalizadorSintactico
+
+# Instantanea binaria de los tokens de un archivo (y de su arbol, si el analisis
+# termino sin errores) para no volver a escanear ni analizar en otra corrida.
+#
+#   cabecera | tabla de cadenas | columnas de tokens | columnas de nodos
+#
+# Cada lexema distinto se guarda una sola vez en la tabla de cadenas y los tokens y
+# nodos lo referencian por indice; la tabla y las columnas siguen a binario.py. Al
+# cargar se mapea el archivo con mmap y se leen con memoryview.cast, sin crear un
+# Token por elemento. Los nodos van en preorden con su cantidad de hijos.
+
+MAGICO = b"PSIN"
+VERSION_INSTANTANEA = 1
+# magico, version, orden de bytes, huella de formato, huella del fuente,
+# tokens, cadenas, bytes de cadenas, nodos
+CABECERA = struct.Struct("<4sHBx16s32sQQQQ")
+CODIGO_NODO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_NODO)}
+NODOS_ATOMO = frozenset(("nombre", "numero", "cadena", "constante"))
+
+
+def huella_formato():
+    # si cambian los codigos de token o los tipos de nodo, las instantaneas viejas no sirven
+    h = hashlib.sha256(repr((VERSION_INSTANTANEA, TIPOS_TOKEN, TIPOS_NODO)).encode())
+    return h.digest()[:16]
+
+
+def huella_fuente(texto):
+    return hashlib.sha256(texto.encode("utf-8")).digest()
+
+
+def guardar_instantanea(ruta, tokens, arbol=None, texto=None):
+    # tokens: lista de Token o TokenArray (con su EOF); arbol: Nodo 'programa' o None;
+    # texto: el fuente, para poder comprobar despues si la instantanea sigue vigente
+    cadenas = TablaCadenas()
+    if isinstance(tokens, TokenArray):
+        tipos = array("B", tokens.tipos)
+        lineas = array("i", tokens.lineas)
+        cols = array("i", tokens.cols)
+        indices = array("I", (cadenas.indice(tokens.lexema(i)) for i in range(len(tokens))))
+    else:
+        tipos, lineas, cols, indices = array("B"), array("i"), array("i"), array("I")
+        for t in tokens:
+            tipos.append(t.cod)
+            lineas.append(t.linea)
+            cols.append(t.col)
+            indices.append(cadenas.indice(t.lexema))
+
+    n_tipos, n_valores, n_hijos = array("B"), array("i"), array("I")
+    n_lineas, n_cols = array("i"), array("i")
+    if arbol is not None:
+        pendientes = [arbol]
+        while pendientes:
+            n = pendientes.pop()
+            n_tipos.append(CODIGO_NODO[n.tipo])
+            n_valores.append(-1 if n.valor is None else cadenas.indice(n.valor))
+            n_hijos.append(len(n.hijos))
+            n_lineas.append(n.linea)
+            n_cols.append(n.col)
+            pendientes.extend(reversed(n.hijos))
+
+    cabecera = CABECERA.pack(MAGICO, VERSION_INSTANTANEA, ORDEN_BYTES, huella_formato(),
+                             huella_fuente(texto) if texto is not None else bytes(32),
+                             len(tipos), len(cadenas.indices), len(cadenas.datos), len(n_tipos))
+    secciones = [cadenas.desplazamientos, cadenas.datos, indices, lineas, cols, tipos,
+                 n_valores, n_hijos, n_lineas, n_cols, n_tipos]
+    escribir_columnas(ruta, cabecera, secciones)
+
+
+class TokensInstantanea(TokenArray):
+    # TokenArray de solo lectura sobre las columnas de una instantanea. Los lexemas
+    # salen de la tabla de cadenas y cada uno se decodifica una sola vez, al pedirlo.
+    def __init__(self, tipos, lineas, cols, indices, tabla):
+        self.texto = None
+        self.tipos = tipos
+        self.lineas = lineas
+        self.cols = cols
+        self.indices = indices
+        self.tabla = tabla
+
+    def agregar(self, tipo, ini, fin, linea, col):
+        raise TypeError("los tokens de una instantanea son de solo lectura")
+
+    def extender(self, registros):
+        raise TypeError("los tokens de una instantanea son de solo lectura")
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.tipos)
+        return Token(TIPOS_TOKEN[self.tipos[i]], self.tabla.cadena(self.indices[i]), self.lineas[i], self.cols[i])
+
+    def __iter__(self):
+        tipos, cadena = TIPOS_TOKEN, self.tabla.cadena
+        for cod, k, linea, col in zip(self.tipos, self.indices, self.lineas, self.cols):
+            yield Token(tipos[cod], cadena(k), linea, col)
+
+    def lexema(self, i):
+        return self.tabla.cadena(self.indices[i])
+
+
+class _CadenasInstantanea:
+    def __init__(self, desplazamientos, datos):
+        self.desplazamientos = desplazamientos
+        self.datos = datos
+        self.cache = [None] * (len(desplazamientos) - 1)
+
+    def cadena(self, k):
+        s = self.cache[k]
+        if s is None:
+            d = self.desplazamientos
+            s = self.cache[k] = str(self.datos[d[k]:d[k + 1]], "utf-8")
+        return s
+
+
+class Instantanea:
+    # instantanea cargada desde disco; usar con 'with' o llamar a cerrar()
+    def __init__(self, ruta):
+        with open(ruta, "rb") as f:
+            try:
+                self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"instantanea invalida: {ruta}") from None
+        self.ruta = ruta
+        self._vistas = []
+        try:
+            self._leer()
+        except Exception:
+            self.cerrar()
+            raise
+
+    def _leer(self):
+        vista = self._vista(memoryview(self._mapa))
+        if len(vista) < CABECERA.size:
+            raise ValueError(f"instantanea invalida: {self.ruta}")
+        (magico, version, orden, formato, fuente,
+         n_tokens, n_cadenas, n_bytes, n_nodos) = CABECERA.unpack_from(vista)
+        if magico != MAGICO or version != VERSION_INSTANTANEA or formato != huella_formato():
+            raise ValueError(f"instantanea de otra version o invalida: {self.ruta}")
+        self.huella_fuente = fuente
+        self._otro_orden = orden != ORDEN_BYTES
+        self._lector = LectorColumnas(vista, CABECERA.size, f"instantanea truncada: {self.ruta}")
+
+        desplazamientos = self._columna("q", n_cadenas + 1)
+        datos = self._columna("B", n_bytes)
+        tabla = _CadenasInstantanea(desplazamientos, datos)
+        indices = self._columna("I", n_tokens)
+        lineas = self._columna("i", n_tokens)
+        cols = self._columna("i", n_tokens)
+        tipos = self._columna("B", n_tokens)
+        self.tokens = TokensInstantanea(tipos, lineas, cols, indices, tabla)
+        self._nodos = (self._columna("i", n_nodos), self._columna("I", n_nodos),
+                       self._columna("i", n_nodos), self._columna("i", n_nodos),
+                       self._columna("B", n_nodos))
+        self.n_nodos = n_nodos
+
+    def _vista(self, v):
+        self._vistas.append(v)
+        return v
+
+    def _columna(self, formato, n):
+        parte = self._lector.tramo(formato, n)
+        if not self._otro_orden or parte.nbytes == n:
+            return self._vista(self._vista(parte).cast(formato))
+        # escrita en una maquina con el otro orden de bytes: se copia
+        columna = array(formato)
+        columna.frombytes(parte)
+        columna.byteswap()
+        parte.release()
+        return columna
+
+    def corresponde(self, texto):
+        # True si la instantanea se genero a partir de este texto
+        return self.huella_fuente == huella_fuente(texto)
+
+    def arbol(self):
+        # reconstruye el arbol (Nodo 'programa'), o None si no se guardo
+        if not self.n_nodos:
+            return None
+        valores, hijos, lineas, cols, tipos = self._nodos
+        cadena = self.tokens.tabla.cadena
+        raiz = None
+        pendientes = []  # (nodo, hijos que le faltan)
+        for i in range(self.n_nodos):
+            tipo = TIPOS_NODO[tipos[i]]
+            v = valores[i]
+            nodo = Nodo(tipo, cadena(v) if v >= 0 else None, () if tipo in NODOS_ATOMO else [],
+                        lineas[i], cols[i])
+            if pendientes:
+                padre = pendientes[-1]
+                padre[0].hijos.append(nodo)
+                padre[1] -= 1
+                if not padre[1]:
+                    pendientes.pop()
+            else:
+                raiz = nodo
+            if hijos[i]:
+                pendientes.append([nodo, hijos[i]])
+        return raiz
+
+    def cerrar(self):
+        if self._mapa is None:
+            return
+        for v in reversed(self._vistas):
+            v.release()
+        self._vistas = []
+        self._mapa.close()
+        self._mapa = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def cargar_instantanea(ruta):
+    return Instantanea(ruta)
+
+
+def crear_instantanea(texto, ruta, modo_escaner="tabla"):
+    # escanea y analiza 'texto' y guarda la instantanea; el arbol solo se incluye
+    # si el analisis termina sin errores. Devuelve ese resultado (True/False).
+    # Un ErrorLexico se propaga: sin tokens completos no hay instantanea.
+    sc = Scanner(texto, modo=modo_escaner, compacto=True)
+    sc.analizar()
+    p = AnalizadorSintactico(sc.tokens, salida=DestinoMemoria(), construir_ast=True)
+    exito = p.analizar()
+    guardar_instantanea(ruta, sc.tokens, p.arbol if exito else None, texto)
+    return exito
@@ -1,4 +1,9 @@
+import re
 import sys
+from array import array
+from bisect import bisect_right
+from collections import deque
+from sys import intern
 
 RESERVADAS = {
     "class","def","if","else","elif","while","for","return","print",
@@ -32,6 +37,17 @@ OPERADORES = {
     "%":"tk_mod"
 }
 
+# tabla de tipos de token: cada tipo tiene un codigo entero estable que se
+# asigna al crear el Token (Token.cod); el parser decide sobre estos codigos
+TIPOS_TOKEN = (["EOF", "id", "tk_entero", "tk_decimal", "tk_cadena"]
+               + sorted(OPERADORES.values())
+               + sorted(RESERVADAS))
+CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+
+def codigo(simbolo):
+    # codigo de tipo a partir del lexema de un operador o del nombre del tipo
+    return CODIGO_TIPO[OPERADORES.get(simbolo, simbolo)]
+
 def es_letra(ch):
     return ('a' <= ch <= 'z') or ('A' <= ch <= 'Z') or ch == '_'
 
@@ -69,9 +85,44 @@ class Buffer:
     def get_pos(self):
         return self.linea, self.col
 
+class IndiceLineas:
+    # Desplazamiento de inicio de cada linea (solo '\n' separa lineas, como en el
+    # escaner), construido de una vez con str.find. posicion(i) da (linea, col) del
+    # caracter i por busqueda binaria, con el mismo ancho de tab que Buffer.siguiente.
+    # linea/col: posicion del caracter 'desde' (para textos que son parte de otro,
+    # como las ventanas de ScannerFragmentado).
+    def __init__(self, texto, linea=1, col=1, desde=0):
+        self.texto = texto
+        self.linea = linea
+        self.col = col
+        self.desde = desde
+        self.hay_tabs = "\t" in texto
+        inicios = array('q', [desde])
+        buscar = texto.find
+        i = buscar("\n", desde)
+        while i >= 0:
+            inicios.append(i + 1)
+            i = buscar("\n", i + 1)
+        self.inicios = inicios
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def posicion(self, i):
+        k = bisect_right(self.inicios, i) - 1
+        ini = self.inicios[k]
+        col = (self.col if k == 0 else 1) + i - ini
+        if self.hay_tabs:
+            col += 3 * self.texto.count("\t", ini, i)
+        return self.linea + k, col
+
 class Token:
+    # sin __dict__ por instancia: con millones de tokens la diferencia es grande
+    __slots__ = ("tipo", "lexema", "linea", "col", "cod")
+
     def __init__(self, tipo, lexema, linea, col):
         self.tipo = tipo      # p.ej., 'id', 'tk_entero', 'def', 'tk_par_izq'
+        self.cod = CODIGO_TIPO.get(tipo, -1)  # codigo entero del tipo (ver TIPOS_TOKEN)
         self.lexema = lexema  # texto real
         self.linea = linea
         self.col = col
@@ -150,51 +201,338 @@ class AFDOperador(Automata):
             return (OPERADORES[ch], ch, buf.linea, buf.col, 1)
         return None
 
+# los automatas no guardan estado: todos los escaneres (de cualquier hilo) comparten estos
+AUTOMATAS = (AFDCadena(), AFDOperador(), AFDIdentificador(), AFDEntero())
+
+# -------------------- escaner por tabla --------------------
+# Un solo patron maestro construido a partir de OPERADORES: salta espacios y
+# comentarios y reconoce el siguiente token en una sola llamada al motor de re.
+# El lookahead impide que un comentario se recorte al retroceder.
+# El orden de las alternativas es el mismo que el de la cadena de AFDs.
+def _construir_patron_maestro():
+    ops = sorted(OPERADORES, key=len, reverse=True)
+    return re.compile(
+        r"(?:\s|#[^\n]*(?![^\n]))*"
+        r"(?:(?P<cad>\"[^\"\\]*(?:\\.[^\"\\]*)*\"|'[^'\\]*(?:\\.[^'\\]*)*')"
+        r"|(?P<op>" + "|".join(re.escape(o) for o in ops) + ")"
+        r"|(?P<id>[A-Za-z_][A-Za-z0-9_]*)"
+        r"|(?P<ent>[0-9]+))",
+        re.S,
+    )
+
+# indices de grupo del patron maestro (lastindex)
+CAD, OP, ID, ENT = 1, 2, 3, 4
+
+PATRON_MAESTRO = _construir_patron_maestro()
+PATRON_ESPACIOS = re.compile(r"(?:\s|#[^\n]*(?![^\n]))*")
+
+MODOS_ESCANER = ("afd", "tabla")
+
 class Scanner:
-    def __init__(self, texto):
+    def __init__(self, texto, modo="tabla", compacto=False):
+        if modo not in MODOS_ESCANER:
+            raise ValueError(f"modo de escaner desconocido: {modo!r}")
         self.buf = Buffer(texto)
-        self.automatas = [AFDCadena(), AFDOperador(), AFDIdentificador(), AFDEntero()]
-        self.tokens = []
+        self.modo = modo
+        self.automatas = AUTOMATAS
+        # compacto=True guarda los tokens en columnas (TokenArray) en vez de objetos
+        self.tokens = TokenArray(texto) if compacto else []
 
     def analizar(self):
+        # ambos caminos conservan los tokens ya producidos si aparece un ErrorLexico
+        if isinstance(self.tokens, TokenArray):
+            self.tokens.extender(self._recorrer())
+        else:
+            self.tokens.extend(self.iterar())
+
+    def iterar(self):
+        # generador perezoso: produce los tokens a medida que se reconocen,
+        # terminando con el token EOF, sin guardarlos en self.tokens
+        texto = self.buf.texto
+        tok = None
+        for tipo, ini, fin, linea, col in self._recorrer():
+            tok = Token(tipo, intern(texto[ini:fin]) if tipo == "id" else texto[ini:fin], linea, col)
+            yield tok
+        if tok is not None:
+            yield Token("EOF", "", tok.linea, tok.col+1)
+        else:
+            yield Token("EOF", "", 1, 1)
+
+    def _recorrer(self):
+        # produce (tipo, inicio, fin, linea, col) por token, sin el EOF;
+        # el lexema es texto[inicio:fin]
+        if self.modo == "tabla":
+            return self._recorrer_tabla()
+        return self._recorrer_afd()
+
+    def _recorrer_afd(self):
+        # los automatas reconocen cada token; espacios y comentarios se saltan con
+        # PATRON_ESPACIOS y las posiciones salen del indice de lineas (busqueda binaria)
+        # en vez de avanzar caracter por caracter con Buffer.siguiente
         b = self.buf
-        while not b.eof():
-            ch = b.ver()
-            if ch.isspace():
-                self._consumir_espacios()
-                continue
-            if ch == '#':
-                self._ignorar_comentario()
-                continue
-            match = None
+        texto = b.texto
+        n = len(texto)
+        indice = IndiceLineas(texto, b.linea, b.col, desde=b.i)
+        saltar = PATRON_ESPACIOS.match
+        while True:
+            b.i = saltar(texto, b.i).end()
+            b.linea, b.col = indice.posicion(b.i)
+            if b.i >= n:
+                return
             for afd in self.automatas:
                 match = afd.aceptar(b)
                 if match:
-                    tipo, lexema, linea, col, n = match
-                    for _ in range(n):
-                        b.siguiente()
-                    self.tokens.append(Token(tipo, lexema, linea, col))
+                    tipo, lexema, linea, col, k = match
+                    ini = b.i
+                    b.i += k
+                    yield (tipo, ini, ini + k, linea, col)
                     break
-            if not match:
+            else:
                 # Error lexico, se trata como token desconocido
-                linea, col = b.get_pos()
-                raise ErrorLexico(linea, col)
-        # token EOF
-        if self.tokens:
-            ultimo = self.tokens[-1]
-            self.tokens.append(Token("EOF", "", ultimo.linea, ultimo.col+1))
-        else:
-            self.tokens.append(Token("EOF", "", 1, 1))
+                raise ErrorLexico(b.linea, b.col)
 
-    def _consumir_espacios(self):
+    def _recorrer_tabla(self):
         b = self.buf
-        while not b.eof() and b.ver().isspace():
-            b.siguiente()
+        texto = b.texto
+        n = len(texto)
+        coincidir = PATRON_MAESTRO.match
+        hay_tabs = "\t" in texto
+        # (linea, col) corresponden siempre a la posicion 'base' del texto
+        linea, col, base = b.linea, b.col, b.i
+        pos = base
+        while pos < n:
+            m = coincidir(texto, pos)
+            if m is None:
+                ini = PATRON_ESPACIOS.match(texto, pos).end()
+                if ini >= n:
+                    pos = n
+                    break
+                if not texto[ini].isdigit():
+                    # ningun automata reconoce el caracter (o cadena sin cerrar)
+                    linea, col = self._posicion(texto, linea, col, base, ini, hay_tabs)
+                    b.i, b.linea, b.col = ini, linea, col
+                    raise ErrorLexico(linea, col)
+                # digitos unicode: isdigit() los acepta pero [0-9] no
+                clase, fin = ENT, ini
+            else:
+                clase = m.lastindex
+                ini, fin = m.span(clase)
 
-    def _ignorar_comentario(self):
-        b = self.buf
-        while not b.eof() and b.ver() != '\n':
-            b.siguiente()
+            if fin < n and clase >= ID and texto[fin] >= "\x80":
+                fin = self._extender(texto, fin, clase)
+
+            # posicion del inicio del token a partir de la ultima base conocida
+            if ini != base:
+                nl = texto.rfind("\n", base, ini)
+                if nl < 0:
+                    col += ini - base
+                    if hay_tabs:
+                        col += 3 * texto.count("\t", base, ini)
+                else:
+                    linea += texto.count("\n", base, nl + 1)
+                    col = ini - nl
+                    if hay_tabs:
+                        col += 3 * texto.count("\t", nl + 1, ini)
+                base = ini
+
+            if clase == ID:
+                lexema = texto[ini:fin]
+                tipo = lexema if lexema in RESERVADAS else "id"
+            elif clase == OP:
+                tipo = OPERADORES[texto[ini:fin]]
+            elif clase == ENT:
+                tipo = "tk_entero"
+            else:
+                tipo = "tk_cadena"
+            pos = fin
+            yield (tipo, ini, fin, linea, col)
+        b.i = pos
+        b.linea, b.col = self._posicion(texto, linea, col, base, pos, hay_tabs)
+
+    @staticmethod
+    def _posicion(texto, linea, col, desde, hasta, hay_tabs):
+        nl = texto.rfind("\n", desde, hasta)
+        if nl < 0:
+            col += hasta - desde
+            ini_linea = desde
+        else:
+            linea += texto.count("\n", desde, nl + 1)
+            col = 1 + hasta - (nl + 1)
+            ini_linea = nl + 1
+        if hay_tabs:
+            col += 3 * texto.count("\t", ini_linea, hasta)
+        return linea, col
+
+    @staticmethod
+    def _extender(texto, fin, clase):
+        n = len(texto)
+        if clase == ID:
+            while fin < n and (es_letra(texto[fin]) or texto[fin].isdigit()):
+                fin += 1
+        else:
+            while fin < n and texto[fin].isdigit():
+                fin += 1
+        return fin
+
+TAM_FRAGMENTO = 1 << 20
+
+class ScannerFragmentado:
+    # Escaner sobre un archivo de texto abierto que se lee por fragmentos, para
+    # entradas que no conviene cargar enteras. La ventana es el texto leido y aun
+    # no escaneado, cortado en el ultimo '\n': ningun token salvo una cadena cruza
+    # un salto de linea, y una cadena que no cierra dentro de la ventana se vuelve
+    # a escanear con el fragmento siguiente. El archivo debe abrirse en modo texto
+    # (el decodificador incremental resuelve los caracteres UTF-8 partidos y los
+    # '\r\n' entre fragmentos). Produce los mismos tokens y posiciones que Scanner.
+    def __init__(self, archivo, modo="tabla", tam_fragmento=TAM_FRAGMENTO):
+        if modo not in MODOS_ESCANER:
+            raise ValueError(f"modo de escaner desconocido: {modo!r}")
+        self.archivo = archivo
+        self.modo = modo
+        self.tam_fragmento = tam_fragmento
+
+    def iterar(self):
+        # igual que Scanner.iterar
+        tok = None
+        for tok in self._recorrer():
+            yield tok
+        if tok is not None:
+            yield Token("EOF", "", tok.linea, tok.col+1)
+        else:
+            yield Token("EOF", "", 1, 1)
+
+    def _recorrer(self):
+        pendiente = ""
+        linea, col = 1, 1
+        fin_archivo = False
+        minimo = 0  # la ventana siguiente debe ser mas larga que esto
+        while True:
+            corte = pendiente.rfind("\n") + 1
+            while corte <= minimo and not fin_archivo:
+                bloque = self.archivo.read(self.tam_fragmento)
+                if bloque:
+                    pendiente += bloque
+                    corte = pendiente.rfind("\n") + 1
+                else:
+                    fin_archivo = True
+            if fin_archivo:
+                corte = len(pendiente)
+            ventana, pendiente = pendiente[:corte], pendiente[corte:]
+
+            sc = Scanner(ventana, modo=self.modo)
+            b = sc.buf
+            b.linea, b.col = linea, col
+            try:
+                for tipo, ini, fin, lin, c in sc._recorrer():
+                    lexema = ventana[ini:fin]
+                    yield Token(tipo, intern(lexema) if tipo == "id" else lexema, lin, c)
+            except ErrorLexico:
+                # solo una comilla puede deberse al corte de la ventana
+                if fin_archivo or ventana[b.i] not in "\"'":
+                    raise
+                pendiente = ventana[b.i:] + pendiente
+                minimo = len(ventana) - b.i
+                linea, col = b.linea, b.col
+                continue
+            if fin_archivo:
+                return
+            minimo = 0
+            linea, col = b.linea, b.col
+
+class TokenArray:
+    # Almacenamiento columnar de tokens: codigo de tipo, linea, col y el lexema
+    # como (inicio, longitud) dentro del texto fuente. Se comporta como una
+    # secuencia de solo lectura; tokens[i] construye un Token bajo demanda.
+    def __init__(self, texto):
+        self.texto = texto
+        self.tipos = array('B')
+        self.lineas = array('i')
+        self.cols = array('i')
+        self.inicios = array('q')
+        self.longitudes = array('i')
+
+    def agregar(self, tipo, ini, fin, linea, col):
+        self.tipos.append(CODIGO_TIPO[tipo])
+        self.inicios.append(ini)
+        self.longitudes.append(fin - ini)
+        self.lineas.append(linea)
+        self.cols.append(col)
+
+    def extender(self, registros):
+        # registros: (tipo, inicio, fin, linea, col) como los de Scanner._recorrer;
+        # agrega al final el token EOF igual que Scanner.iterar
+        codigos, tipos, inicios, longitudes = CODIGO_TIPO, self.tipos, self.inicios, self.longitudes
+        lineas, cols = self.lineas, self.cols
+        for tipo, ini, fin, linea, col in registros:
+            tipos.append(codigos[tipo])
+            inicios.append(ini)
+            longitudes.append(fin - ini)
+            lineas.append(linea)
+            cols.append(col)
+        if lineas:
+            self.agregar("EOF", len(self.texto), len(self.texto), lineas[-1], cols[-1] + 1)
+        else:
+            self.agregar("EOF", len(self.texto), len(self.texto), 1, 1)
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.tipos)
+        return Token(self.tipo(i), self.lexema(i), self.lineas[i], self.cols[i])
+
+    def __iter__(self):
+        for i in range(len(self.tipos)):
+            yield self[i]
+
+    def tipo(self, i):
+        return TIPOS_TOKEN[self.tipos[i]]
+
+    def lexema(self, i):
+        ini = self.inicios[i]
+        return self.texto[ini:ini + self.longitudes[i]]
+
+    def linea(self, i):
+        return self.lineas[i]
+
+    def col(self, i):
+        return self.cols[i]
+
+class FlujoTokens:
+    # Fuente perezosa de tokens con un buffer de anticipacion pequeño.
+    # Solo guarda los tokens que se han mirado por adelantado (ver(k)), de modo
+    # que la memoria no depende del tamaño del archivo.
+    def __init__(self, fuente):
+        self._it = iter(fuente)
+        self._buf = deque()
+        self._agotado = False
+        self.consumidos = 0
+        self.anterior = None  # ultimo token consumido
+
+    def ver(self, k=0):
+        buf = self._buf
+        while len(buf) <= k and not self._agotado:
+            tok = next(self._it, None)
+            if tok is None:
+                self._agotado = True
+                if not buf:
+                    buf.append(Token("EOF", "", 1, 1))
+            else:
+                buf.append(tok)
+                if tok.tipo == "EOF":
+                    self._agotado = True
+        if k < len(buf):
+            return buf[k]
+        return buf[-1]
+
+    def avanzar(self):
+        # igual que con una lista: en el ultimo token (EOF) ya no se avanza
+        self.ver(1)
+        if len(self._buf) > 1:
+            self.anterior = self._buf.popleft()
+            self.consumidos += 1
+        return self._buf[0]
 
 class ErrorLexico(Exception):
     def __init__(self, linea, col):
@@ -0,0 +1,269 @@
+import sys
+from functools import lru_cache
+
+from gramatica import (LENGUAJE, ESPERADOS, NOMBRES_TERMINAL, ErrorGramatica, es_accion, es_anticipacion,
+                       es_predicado, es_terminal, terminal)
+from lexer import TIPOS_TOKEN, TokenArray, codigo
+from parser import K_EOF, MAX_ERRORES, NOMBRE_ESPERADO, AbortarSintaxis, AnalizadorSintactico
+
+# Motor LL(1) dirigido por tabla, generado a partir de la gramatica de gramatica.py. Una
+# pila explicita de simbolos enteros reemplaza a las llamadas recursivas, asi que el
+# anidamiento de bloques solo esta limitado por la memoria. Acepta el mismo lenguaje que
+# AnalizadorSintactico y produce los mismos diagnosticos, tambien con recuperar=True;
+# no construye el arbol ni consume en flujo.
+#
+# La tabla es densa: una fila por no terminal con una celda por codigo de token. Cada
+# celda ya trae la expansion completa hasta el terminal que se consume: como el token
+# actual no cambia hasta emparejar, la cadena A → B ... → 't' ... se resuelve al construir
+# la tabla, y cada token cuesta una sola vuelta del bucle en vez de una por no terminal.
+# Celda: (simbolos a apilar, si consume el token, acciones previas) o None (error).
+
+# simbolos de la pila: [0, N) no terminales (los primeros sin predicado), [N, N + T)
+# terminales por codigo de token y desde N + T acciones y predicados
+ACCIONES = ("nueva_linea", "indentar", "dedentar", "abrir_sentencia", "cerrar_sentencia")
+PREDICADOS = ("fin_de_linea", "fin_de_bloque")
+A_NUEVA_LINEA, A_INDENTAR, A_DEDENTAR, A_ABRIR, A_CERRAR = range(len(ACCIONES))
+P_FIN_DE_LINEA, P_FIN_DE_BLOQUE = range(len(PREDICADOS))
+
+# con recuperar=True cada sentencia se envuelve en @abrir_sentencia ... @cerrar_sentencia:
+# tras un error se desapila hasta el cierre de la sentencia mas interna, como la
+# excepcion que atrapa sentencia_con_recuperacion en el parser recursivo
+NO_TERMINAL_RECUPERACION = "sentencia"
+
+
+class TablaLL1:
+    def __init__(self, gramatica, recuperar=False):
+        self.gramatica = gramatica
+        guardados = [nt for nt, ps in gramatica.reglas.items() if any(p.predicado for p in ps)]
+        nombres = [nt for nt in gramatica.reglas if nt not in guardados] + guardados
+        self.nombres = nombres
+        self.indice = {nt: k for k, nt in enumerate(nombres)}
+        self.n_simples = len(nombres) - len(guardados)
+        self.n_no_terminales = len(nombres)
+        self.base_acciones = self.n_no_terminales + len(TIPOS_TOKEN)
+        self.recuperar = recuperar
+        self.cerrar = self.base_acciones + A_CERRAR
+        self.inicial = self.indice[gramatica.inicial]
+
+        # terminal esperado -> nombre que se muestra; no terminal -> esperados del error
+        self.mostrar = [NOMBRES_TERMINAL.get(t, NOMBRE_ESPERADO[codigo(t)]) for t in TIPOS_TOKEN]
+        self.esperados = [list(ESPERADOS[nt]) if nt in ESPERADOS else self._esperados_por_defecto(nt)
+                          for nt in nombres]
+        self.celdas = [[self._celda(nt, self._alternativa(nt, cod), cod) for cod in range(len(TIPOS_TOKEN))]
+                       for nt in nombres]
+        # alternativa con predicado de los no terminales guardados: (predicado, celdas)
+        self.guardas = [None] * self.n_no_terminales
+        for nt in guardados:
+            p = next(p for p in gramatica.reglas[nt] if p.predicado)
+            if p.predicado not in PREDICADOS:
+                raise ErrorGramatica(f"predicado desconocido: {p.predicado}")
+            self.guardas[self.indice[nt]] = (PREDICADOS.index(p.predicado),
+                                             [self._celda(nt, p.numero, cod) for cod in range(len(TIPOS_TOKEN))])
+
+    def _alternativa(self, nt, cod):
+        # como el parser recursivo, que entra sin mirar el token, un no terminal con una
+        # sola alternativa la elige siempre y el error aparece mas adentro; salvo que
+        # tenga su propio mensaje en ESPERADOS
+        numero = self.gramatica.tabla[nt][cod]
+        producciones = self.gramatica.reglas[nt]
+        if numero == -1 and len(producciones) == 1 and nt not in ESPERADOS:
+            return producciones[0].numero
+        return numero
+
+    def _esperados_por_defecto(self, nt):
+        terminales = set()
+        for p in self.gramatica.reglas[nt]:
+            terminales |= self.gramatica.prediccion[p.numero]
+        return sorted(NOMBRES_TERMINAL.get(t, t) for t in terminales)
+
+    def _cuerpo(self, produccion):
+        simbolos = [s for s in produccion.simbolos if not es_predicado(s) and not es_anticipacion(s)]
+        if self.recuperar and produccion.cabeza == NO_TERMINAL_RECUPERACION:
+            simbolos = ["@abrir_sentencia"] + simbolos + ["@cerrar_sentencia"]
+        return simbolos
+
+    def _celda(self, nt, numero, cod):
+        # expande la produccion con el token 'cod' hasta consumirlo, hasta un no terminal
+        # con predicado o hasta un error; las acciones del camino quedan como previas
+        if numero == -1:
+            return None
+        g = self.gramatica
+        pendientes = self._cuerpo(g.producciones[numero])
+        acciones = []
+        consume = False
+        expandidos = {nt}
+        while pendientes:
+            s = pendientes[0]
+            if es_accion(s):
+                acciones.append(self._accion(s))
+                del pendientes[0]
+            elif es_terminal(s):
+                if codigo(terminal(s)) == cod:
+                    consume = True
+                    del pendientes[0]
+                break
+            elif self.indice[s] >= self.n_simples or self._alternativa(s, cod) == -1:
+                break
+            else:
+                if s in expandidos:
+                    raise ErrorGramatica(f"recursion por la izquierda en {s}")
+                expandidos.add(s)
+                pendientes[0:1] = self._cuerpo(g.producciones[self._alternativa(s, cod)])
+        return tuple(self._codificar(s) for s in reversed(pendientes)), consume, tuple(acciones)
+
+    def _accion(self, s):
+        if s[1:] not in ACCIONES:
+            raise ErrorGramatica(f"accion desconocida: {s}")
+        return ACCIONES.index(s[1:])
+
+    def _codificar(self, s):
+        if es_accion(s):
+            return self.base_acciones + self._accion(s)
+        if es_terminal(s):
+            return self.n_no_terminales + codigo(terminal(s))
+        return self.indice[s]
+
+
+@lru_cache(maxsize=None)
+def tabla_ll1(recuperar=False):
+    # una por proceso y por modo
+    return TablaLL1(LENGUAJE, recuperar)
+
+
+class AnalizadorLL1(AnalizadorSintactico):
+    def __init__(self, tokens, salida=sys.stdout, mostrar_conjuntos=False, recuperar=False,
+                 max_errores=MAX_ERRORES, simbolos=None, semantica=False):
+        # tokens: una lista o un TokenArray terminados en EOF (como Scanner.tokens)
+        if not isinstance(tokens, (list, TokenArray)):
+            raise TypeError("el motor LL(1) necesita la lista de tokens (no analiza en flujo)")
+        if simbolos is not None:
+            raise ValueError("el motor LL(1) no recolecta simbolos")
+        if semantica:
+            raise ValueError("el motor LL(1) no hace chequeos semanticos")
+        super().__init__(tokens, salida, mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+                         max_errores=max_errores)
+        self.tabla = tabla_ll1(recuperar)
+        if not tokens:
+            self.toks = [self.act]
+        if isinstance(self.toks, TokenArray):
+            self.codigos = self.toks.tipos
+            self._linea = self.toks.lineas.__getitem__
+            self._col = self.toks.cols.__getitem__
+        else:
+            self.codigos = [t.cod for t in self.toks]
+            toks = self.toks
+            self._linea = lambda k: toks[k].linea
+            self._col = lambda k: toks[k].col
+
+    def programa(self):
+        t = self.tabla
+        celdas, guardas, esperados, mostrar = t.celdas, t.guardas, t.esperados, t.mostrar
+        n_simples, n_nt, base_acciones, cerrar = t.n_simples, t.n_no_terminales, t.base_acciones, t.cerrar
+        cods = self.codigos
+        linea_de, col_de, pila_indent = self._linea, self._col, self.pila_indent
+        pila = [t.inicial]
+        pop, extend = pila.pop, pila.extend
+        self._inicios = []
+        i = self.i
+        c = cods[i]
+        while True:
+            try:
+                while pila:
+                    x = pop()
+                    if x < n_simples:
+                        e = celdas[x][c]
+                    elif x >= n_nt:
+                        if x < base_acciones:
+                            if x - n_nt == c:
+                                i += 1
+                                c = cods[i]
+                                continue
+                            self._fallar(i, [mostrar[x - n_nt]])
+                        self._accion(x - base_acciones, i)
+                        continue
+                    else:
+                        predicado, celdas_guarda = guardas[x]
+                        e = celdas_guarda[c] if self._predicado(predicado, i, c) else celdas[x][c]
+                    if e is None:
+                        self._fallar(i, esperados[x])
+                    apilar, consume, acciones = e
+                    extend(apilar)
+                    if acciones:
+                        for a in acciones:
+                            if a == A_NUEVA_LINEA:
+                                # el caso comun (sin dedentar) sin llamar a _accion
+                                linea = linea_de(i)
+                                if linea == self.ult_linea_sent:
+                                    continue
+                                if col_de(i) >= pila_indent[-1]:
+                                    self.ult_linea_sent = linea
+                                    continue
+                            self._accion(a, i)
+                    if consume:
+                        i += 1
+                        c = cods[i]
+                break
+            except AbortarSintaxis:
+                if not self.recuperar or self.errores >= self.max_errores:
+                    raise
+                # como sentencia_con_recuperacion: se abandona la sentencia mas interna.
+                # Los cierres apilados por la ultima celda cuya apertura no llego a
+                # ejecutarse (fallo una accion anterior) se descartan con ella.
+                if not self._inicios:
+                    raise
+                huerfanos = pila.count(cerrar) - len(self._inicios)
+                while huerfanos >= 0:
+                    if pop() == cerrar:
+                        huerfanos -= 1
+                self.sincronizar(self._inicios.pop())
+                i = self.i
+                c = cods[i]
+        self.i = i
+        self.act = self.toks[i]
+
+    def _fallar(self, i, esperados):
+        self.i = i
+        self.act = self.toks[i]
+        self.reportar_error(self.act, esperados=esperados)
+
+    def _fallar_indentacion(self, i):
+        self.i = i
+        self.act = self.toks[i]
+        self.reportar_error(self.act, falla_indent=True)
+
+    # -------------------- sangria --------------------
+    # las mismas reglas que consumir_contexto_nueva_linea, requerir_indentacion_si_necesaria
+    # y el bucle de bloque() del parser recursivo
+    def _predicado(self, predicado, i, c):
+        if c == K_EOF:
+            return True
+        if predicado == P_FIN_DE_BLOQUE:
+            return self._col(i) != self.pila_indent[-1]
+        return self._linea(i) != self.ult_linea_sent
+
+    def _accion(self, accion, i):
+        pila = self.pila_indent
+        if accion == A_NUEVA_LINEA:
+            linea = self._linea(i)
+            if linea != self.ult_linea_sent:
+                col = self._col(i)
+                while col < pila[-1]:
+                    pila.pop()
+                    if not pila:
+                        self._fallar_indentacion(i)
+                self.ult_linea_sent = linea
+        elif accion == A_INDENTAR:
+            linea = self._linea(i)
+            col = self._col(i)
+            if linea == self.ult_linea_sent or col <= pila[-1]:
+                self._fallar_indentacion(i)
+            pila.append(col)
+            self.ult_linea_sent = linea
+        elif accion == A_DEDENTAR:
+            # al cerrar un bloque su columna es siempre el tope de la pila
+            if pila:
+                pila.pop()
+        elif accion == A_ABRIR:
+            self._inicios.append(i)
+        else:
+            self._inicios.pop()
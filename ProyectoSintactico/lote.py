@@ -0,0 +1,129 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from diagnosticos import DestinoMemoria
+from parser import MAX_ERRORES, MOTOR_DESCENDENTE, analizar_con_cache, analizar_texto
+
+
+# -------------------- expansion de entradas --------------------
+def expandir_entradas(entradas, extension=".py"):
+    # directorios (recursivo), patrones glob o rutas sueltas -> lista de archivos sin repetir
+    vistos = set()
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = []
+            for raiz, dirs, archivos in os.walk(entrada):
+                dirs.sort()
+                candidatos.extend(os.path.join(raiz, a) for a in sorted(archivos) if a.endswith(extension))
+        elif glob.has_magic(entrada):
+            candidatos = sorted(c for c in glob.glob(entrada, recursive=True) if os.path.isfile(c))
+        else:
+            candidatos = [entrada]
+        for c in candidatos:
+            if c not in vistos:
+                vistos.add(c)
+                rutas.append(c)
+    return rutas
+
+
+def ruta_resultado(ruta, dir_salida):
+    # conserva la estructura relativa de la entrada dentro de dir_salida
+    rel = os.path.relpath(ruta)
+    if rel.startswith(os.pardir):
+        rel = os.path.abspath(ruta).lstrip(os.sep).replace(":", "")
+    return os.path.join(dir_salida, rel + ".txt")
+
+
+# -------------------- trabajo por archivo --------------------
+_caches = {}
+
+def cache_de_proceso(dir_cache, tam_maximo=None):
+    # una CacheResultados por proceso del pool (la huella se calcula una sola vez)
+    if dir_cache not in _caches:
+        from cache import CacheResultados, TAM_MAXIMO_CACHE
+        _caches[dir_cache] = CacheResultados(dir_cache, tam_maximo or TAM_MAXIMO_CACHE)
+    return _caches[dir_cache]
+
+
+def analizar_ruta(ruta, dir_salida=None, mostrar_conjuntos=False, dir_cache=None, tam_cache=None,
+                  recuperar=False, max_errores=MAX_ERRORES, prevalidar=False, motor=MOTOR_DESCENDENTE,
+                  simbolos=False, semantica=False):
+    # se ejecuta en un proceso del pool; devuelve un dict serializable.
+    # simbolos=True agrega "simbolos" (simbolos.SimbolosArchivo.a_dict) y "huella" (la del
+    # contenido, en hexadecimal) para un simbolos.IndiceSimbolos; no pasa por la cache,
+    # que solo guarda diagnosticos
+    acierto = None
+    recolectados = None
+    destino = DestinoMemoria()
+    try:
+        if simbolos:
+            from simbolos import OPCIONES_INDICE, SimbolosArchivo, huella_contenido
+
+            with open(ruta, "rb") as f:
+                datos = f.read()
+            huella = huella_contenido(datos)
+            texto = datos.decode("utf-8")
+            # los simbolos se recolectan siempre con OPCIONES_INDICE, como en simbolos.py
+            recolectados = SimbolosArchivo()
+            exito = analizar_texto(texto, destino, mostrar_conjuntos=mostrar_conjuntos, prevalidar=prevalidar,
+                                   motor=motor, simbolos=recolectados, semantica=semantica, **OPCIONES_INDICE)
+            if {"recuperar": recuperar, "max_errores": max_errores} != OPCIONES_INDICE and \
+                    any(d.tipo in ("sintactico", "indentacion") for d in destino.registros):
+                # sin errores sintacticos el resultado no depende de la recuperacion; con
+                # alguno, los diagnosticos salen de otra pasada con las opciones pedidas
+                destino = DestinoMemoria()
+                exito = analizar_texto(texto, destino, mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+                                       max_errores=max_errores, prevalidar=prevalidar, motor=motor,
+                                       semantica=semantica)
+        elif dir_cache:
+            cache = cache_de_proceso(dir_cache, tam_cache)
+            antes = cache.aciertos
+            exito = analizar_con_cache(ruta, cache, destino, mostrar_conjuntos=mostrar_conjuntos,
+                                       recuperar=recuperar, max_errores=max_errores, prevalidar=prevalidar,
+                                       motor=motor, semantica=semantica)
+            acierto = cache.aciertos > antes
+        else:
+            with open(ruta, "r", encoding="utf-8") as f:
+                texto = f.read()
+            exito = analizar_texto(texto, destino, mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+                                   max_errores=max_errores, prevalidar=prevalidar, motor=motor,
+                                   semantica=semantica)
+    except (OSError, UnicodeDecodeError) as e:
+        return {"archivo": ruta, "exito": False, "salida": f">>> No se pudo leer el archivo: {e}"}
+    except RecursionError:
+        return {"archivo": ruta, "exito": False, "salida": ">>> Anidamiento demasiado profundo"}
+    # 'diagnosticos': los errores como registros (ver diagnosticos.Diagnostico.a_dict)
+    resultado = {"archivo": ruta, "exito": exito, "salida": destino.texto(),
+                 "diagnosticos": [d.a_dict() for d in destino.errores()]}
+    if acierto is not None:
+        resultado["cache"] = acierto
+    if recolectados is not None:
+        resultado["simbolos"] = recolectados.a_dict()
+        resultado["huella"] = huella.hex()
+    if dir_salida:
+        archivo_salida = ruta_resultado(ruta, dir_salida)
+        os.makedirs(os.path.dirname(archivo_salida), exist_ok=True)
+        with open(archivo_salida, "w", encoding="utf-8") as out:
+            out.write(resultado["salida"])
+        resultado["ruta_salida"] = archivo_salida
+    return resultado
+
+
+def analizar_lote(rutas, trabajadores=None, tam_bloque=None, dir_salida=None, mostrar_conjuntos=False,
+                  dir_cache=None, tam_cache=None, recuperar=False, max_errores=MAX_ERRORES, prevalidar=False,
+                  motor=MOTOR_DESCENDENTE, simbolos=False, semantica=False):
+    # generador de resultados en el mismo orden que 'rutas'
+    trabajo = partial(analizar_ruta, dir_salida=dir_salida, mostrar_conjuntos=mostrar_conjuntos,
+                      dir_cache=dir_cache, tam_cache=tam_cache, recuperar=recuperar, max_errores=max_errores,
+                      prevalidar=prevalidar, motor=motor, simbolos=simbolos, semantica=semantica)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    if trabajadores == 1 or len(rutas) <= 1:
+        yield from map(trabajo, rutas)
+        return
+    if not tam_bloque:
+        tam_bloque = max(1, len(rutas) // (trabajadores * 4))
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        yield from pool.map(trabajo, rutas, chunksize=tam_bloque)
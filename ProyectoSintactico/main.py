@@ -1,20 +1,325 @@
+import argparse
+import json
 import sys
-from parser import analizar_archivo
+import time
+from arbol import volcar
+from diagnosticos import DestinoArchivo
+from parser import MOTOR_DESCENDENTE, MOTORES, analizar_archivo
+
+
+def construir_argumentos():
+    ap = argparse.ArgumentParser(
+        prog="main.py",
+        description="Analizador sintactico para un subconjunto de Python.",
+    )
+    ap.add_argument("entradas", nargs="+", metavar="entrada",
+                    help="archivo a analizar (o directorios/patrones con --lote)")
+    ap.add_argument("--flujo", action="store_true",
+                    help="analizar mientras se escanea (se detiene en el primer error)")
+    ap.add_argument("--fragmentos", action="store_true",
+                    help="leer la entrada por fragmentos (memoria acotada para archivos muy grandes)")
+    ap.add_argument("--paralelo", action="store_true",
+                    help="repartir un archivo grande en trozos que se escanean y analizan en varios procesos")
+    ap.add_argument("--prevalidar", action="store_true",
+                    help="buscar errores lexicos sin crear tokens; si no hay, detenerse en el primer error "
+                         "sintactico sin escanear el resto")
+    ap.add_argument("--recuperar", action="store_true",
+                    help="informar todos los errores sintacticos en una pasada en vez de detenerse en el primero")
+    ap.add_argument("--max-errores", type=int, default=50,
+                    help="con --recuperar, detenerse despues de esta cantidad de errores (por defecto 50)")
+    ap.add_argument("--semantica", action="store_true",
+                    help="en la misma pasada, informar nombres no definidos y llamadas con otra cantidad de "
+                         "argumentos que la funcion (solo si no hay errores sintacticos)")
+    ap.add_argument("--motor", choices=MOTORES, default=MOTOR_DESCENDENTE,
+                    help="descendente recursivo o LL(1) dirigido por tabla (mismo resultado; ll1 no "
+                         "admite --flujo ni --fragmentos)")
+    ap.add_argument("--ast", action="store_true",
+                    help="mostrar el arbol sintactico si el analisis termina sin errores")
+    ap.add_argument("--instantanea", default=None, metavar="ARCHIVO",
+                    help="guardar los tokens (y el arbol, si no hay errores) en una instantanea binaria")
+    ap.add_argument("--conjuntos", action="store_true",
+                    help="agregar al resultado los conjuntos PRIMEROS/SIGUIENTES/PREDICCION")
+    perfil = ap.add_argument_group("perfil")
+    perfil.add_argument("--perfil", default=None, metavar="ARCHIVO",
+                        help="medir escaner, reglas del parser y E/S y guardar el reporte JSON en ARCHIVO")
+    perfil.add_argument("--perfil-pilas", default=None, metavar="ARCHIVO",
+                        help="guardar las pilas de reglas en formato plegado (flamegraph.pl, speedscope)")
+    cache = ap.add_argument_group("cache de resultados")
+    cache.add_argument("--cache", default=None, metavar="DIR",
+                       help="reutilizar resultados de archivos ya analizados (por contenido) guardados en DIR")
+    cache.add_argument("--cache-max-mb", type=float, default=64,
+                       help="tamano maximo de la cache; se expulsan las entradas menos usadas (por defecto 64)")
+    cache.add_argument("--limpiar-cache", action="store_true",
+                       help="vaciar la cache antes de analizar")
+    lote = ap.add_argument_group("modo lote")
+    lote.add_argument("--lote", action="store_true",
+                      help="analizar varios archivos, directorios o patrones glob en paralelo")
+    lote.add_argument("--trabajadores", type=int, default=None,
+                      help="procesos del pool, tambien con --paralelo (por defecto, uno por CPU)")
+    lote.add_argument("--bloque", type=int, default=None,
+                      help="archivos que recibe cada proceso por envio")
+    lote.add_argument("--salida-dir", default=None,
+                      help="escribir un resultado <archivo>.txt por entrada en este directorio")
+    lote.add_argument("--jsonl", default=None,
+                      help="escribir un reporte agregado en formato JSONL")
+    lote.add_argument("--indice", default=None, metavar="DIR",
+                      help="actualizar el indice de simbolos en DIR con los archivos que cambiaron "
+                           "(tambien con --vigilar; consultar con simbolos.py)")
+    vigilancia = ap.add_argument_group("modo vigilancia")
+    vigilancia.add_argument("--vigilar", "--watch", action="store_true",
+                            help="analizar las entradas (como --lote) y volver a analizar cada archivo cuyo "
+                                 "contenido cambie, hasta Ctrl+C")
+    vigilancia.add_argument("--espera", type=float, default=None, metavar="SEGUNDOS",
+                            help="silencio que cierra una rafaga de cambios antes de analizar (por defecto 0.3)")
+    vigilancia.add_argument("--sondeo", action="store_true",
+                            help="detectar cambios revisando mtime y tamano aunque haya inotify")
+    return ap
+
+
+def tam_cache(args):
+    return int(args.cache_max_mb * 1024 * 1024)
+
+
+def preparar_cache(args):
+    if not args.cache:
+        return None
+    from cache import CacheResultados
+
+    try:
+        cache = CacheResultados(args.cache, tam_cache(args))
+    except ValueError as e:
+        print(f"--cache: {e}")
+        sys.exit(1)
+    if args.limpiar_cache:
+        cache.invalidar()
+    return cache
+
+
+def preparar_perfil(args):
+    if not (args.perfil or args.perfil_pilas):
+        return None
+    from perfil import Perfilador
+
+    return Perfilador()
+
+
+def guardar_perfil(args, perfil):
+    print("\n--- Perfil ---")
+    print(perfil.resumen())
+    if args.perfil:
+        with open(args.perfil, "w", encoding="utf-8") as f:
+            perfil.escribir_json(f)
+        print(f"Reporte de perfil guardado en '{args.perfil}'")
+    if args.perfil_pilas:
+        with open(args.perfil_pilas, "w", encoding="utf-8") as f:
+            perfil.escribir_pilas(f)
+        print(f"Pilas guardadas en '{args.perfil_pilas}'")
+
+
+def preparar_indice(args):
+    if not args.indice:
+        return None
+    if args.motor != MOTOR_DESCENDENTE:
+        print(f"--indice no se puede combinar con --motor {args.motor}")
+        sys.exit(1)
+    from simbolos import IndiceSimbolos
+
+    return IndiceSimbolos(args.indice)
+
+
+def indexar_resultado(indice, r):
+    # saca los simbolos del resultado (no van al reporte) y actualiza el indice
+    if r.get("eliminado"):
+        indice.eliminar(r["archivo"])
+    elif "simbolos" in r:
+        from simbolos import SimbolosArchivo
+
+        indice.actualizar(r["archivo"], bytes.fromhex(r.pop("huella")), SimbolosArchivo.desde_dict(r.pop("simbolos")))
+
+
+def mostrar_resultado(r, reporte=None, mostrar=True):
+    # una linea por archivo (la primera del resultado) y/o un JSON por linea en 'reporte'
+    if reporte:
+        reporte.write(json.dumps(r, ensure_ascii=False) + "\n")
+        reporte.flush()
+    if not mostrar:
+        return
+    if r.get("eliminado"):
+        print(f"{r['archivo']}: eliminado", flush=True)
+    else:
+        primera = r["salida"].strip().splitlines()[0] if r["salida"].strip() else ""
+        print(f"{r['archivo']}: {primera}", flush=True)
+
+
+def ejecutar_lote(args):
+    from lote import analizar_lote, expandir_entradas
+
+    rutas = expandir_entradas(args.entradas)
+    if not rutas:
+        print("No se encontraron archivos para analizar.")
+        return 1
+
+    # se crea (y se limpia si se pidio) antes de repartir el trabajo
+    preparar_cache(args)
+    indice = preparar_indice(args)
+    reporte = open(args.jsonl, "w", encoding="utf-8") if args.jsonl else None
+    correctos = aciertos = 0
+    t0 = time.perf_counter()
+    try:
+        for r in analizar_lote(rutas, args.trabajadores, args.bloque, args.salida_dir,
+                                   mostrar_conjuntos=args.conjuntos, dir_cache=args.cache,
+                                   tam_cache=tam_cache(args), recuperar=args.recuperar,
+                                   max_errores=args.max_errores, prevalidar=args.prevalidar,
+                                   motor=args.motor, simbolos=indice is not None, semantica=args.semantica):
+            correctos += r["exito"]
+            aciertos += r.get("cache", False)
+            if indice:
+                indexar_resultado(indice, r)
+            mostrar_resultado(r, reporte, mostrar=not (reporte or args.salida_dir))
+    finally:
+        if reporte:
+            reporte.close()
+        if indice:
+            indice.podar()
+            indice.guardar()
+    dt = time.perf_counter() - t0
+
+    print("\n--- Resumen del lote ---")
+    print(f"{len(rutas)} archivos, {correctos} sin errores, {len(rutas) - correctos} con errores")
+    print(f"{dt:.2f} s ({len(rutas) / dt if dt > 0 else 0:.1f} archivos/s)")
+    if args.cache:
+        print(f"cache: {aciertos} aciertos, {len(rutas) - aciertos} fallos")
+    if indice:
+        print(f"indice de simbolos en '{args.indice}' ({len(indice.huellas)} archivos)")
+    return 0
+
+
+def ejecutar_vigilancia(args):
+    from vigilancia import ESPERA_RAFAGA, Vigilante
+
+    preparar_cache(args)
+    indice = preparar_indice(args)
+    vigilante = Vigilante(args.entradas, args.trabajadores, espera=args.espera or ESPERA_RAFAGA,
+                          sondeo=args.sondeo, dir_salida=args.salida_dir, mostrar_conjuntos=args.conjuntos,
+                          dir_cache=args.cache, tam_cache=tam_cache(args), recuperar=args.recuperar,
+                          max_errores=args.max_errores, prevalidar=args.prevalidar, motor=args.motor,
+                          simbolos=indice is not None, semantica=args.semantica)
+    reporte = open(args.jsonl, "a", encoding="utf-8") if args.jsonl else None
+    mostrar = not (reporte or args.salida_dir)
+
+    def reportar(r, mostrar=True):
+        if indice:
+            indexar_resultado(indice, r)
+        mostrar_resultado(r, reporte, mostrar)
+
+    try:
+        resultados = vigilante.iniciar()
+        for r in resultados:
+            reportar(r, mostrar)
+        if indice:
+            indice.podar()
+            indice.guardar()
+        correctos = sum(r["exito"] for r in resultados)
+        print(f"--- {len(resultados)} archivos, {correctos} sin errores; vigilando cambios "
+              f"({vigilante.observador.nombre}, Ctrl+C para terminar) ---", flush=True)
+        # el catalogo del indice se escribe una vez por rafaga, no por archivo
+        vigilante.vigilar(reportar, fin_rafaga=indice.guardar if indice else None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        vigilante.cerrar()
+        if reporte:
+            reporte.close()
+        if indice:
+            indice.guardar()
+    return 0
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <archivo_entrada.py>")
+    args = construir_argumentos().parse_args()
+
+    if args.semantica and args.motor != MOTOR_DESCENDENTE:
+        print(f"--semantica no se puede combinar con --motor {args.motor}")
         sys.exit(1)
 
-    ruta_entrada = sys.argv[1]
-    ruta_salida = "salida.txt"  
+    if args.vigilar:
+        sys.exit(ejecutar_vigilancia(args))
+
+    if args.lote:
+        sys.exit(ejecutar_lote(args))
+
+    if len(args.entradas) != 1:
+        print("Uso: python main.py <archivo_entrada.py> [--flujo] [--conjuntos]  (varios archivos: --lote)")
+        sys.exit(1)
+
+    ruta_entrada = args.entradas[0]
+    ruta_salida = "salida.txt"
 
     print(f"Analizando '{ruta_entrada}'... El resultado se guardara en '{ruta_salida}'")
 
 
-    analizar_archivo(ruta_entrada, ruta_salida)
+    # el resultado se escribe una sola vez en salida.txt y se muestra desde el destino
+    destino = DestinoArchivo(ruta_salida)
+    cache = perfil = None
+    if args.motor != MOTOR_DESCENDENTE and (args.flujo or args.fragmentos or args.paralelo):
+        print(f"--motor {args.motor} no se puede combinar con --flujo, --fragmentos ni --paralelo")
+        sys.exit(1)
+    if (args.ast or args.instantanea) and (args.flujo or args.fragmentos or args.paralelo):
+        # se guardan los tokens y el arbol de la misma pasada, y estos modos no los conservan
+        print("--ast e --instantanea no se pueden combinar con --flujo, --fragmentos ni --paralelo")
+        sys.exit(1)
+    if args.ast and args.motor != MOTOR_DESCENDENTE:
+        print(f"--ast no se puede combinar con --motor {args.motor}")
+        sys.exit(1)
+    conservado = {}
+    if args.paralelo:
+        if args.flujo or args.fragmentos or args.cache or args.perfil or args.perfil_pilas or args.semantica:
+            # los trozos se analizan por separado: un nombre puede estar definido en otro
+            print("--paralelo no se puede combinar con --flujo, --fragmentos, --cache, --perfil ni --semantica")
+            sys.exit(1)
+        from paralelo import analizar_en_paralelo
+
+        with open(ruta_entrada, "r", encoding="utf-8") as f:
+            texto = f.read()
+        analizar_en_paralelo(texto, destino, trabajadores=args.trabajadores, mostrar_conjuntos=args.conjuntos,
+                             recuperar=args.recuperar, max_errores=args.max_errores, prevalidar=args.prevalidar)
+    else:
+        al_terminar = None
+        if args.ast or args.instantanea:
+            # los tokens (en columnas, como los guarda la instantanea) y el arbol de esta
+            # misma pasada; la cache no los tiene, asi que no se usa
+            def al_terminar(tokens, arbol):
+                conservado["tokens"], conservado["arbol"] = tokens, arbol
+        else:
+            cache = preparar_cache(args)
+        perfil = preparar_perfil(args)
+        analizar_archivo(ruta_entrada, ruta_salida, en_flujo=args.flujo, mostrar_conjuntos=args.conjuntos,
+                         cache=cache, fragmentado=args.fragmentos, recuperar=args.recuperar,
+                         max_errores=args.max_errores, perfil=perfil, destino=destino,
+                         prevalidar=args.prevalidar, motor=args.motor, semantica=args.semantica,
+                         compacto=bool(args.instantanea), al_terminar=al_terminar,
+                         construir_ast=(args.ast or bool(args.instantanea)) and args.motor == MOTOR_DESCENDENTE)
+    if cache:
+        e = cache.estadisticas()
+        print(f"cache: {e['aciertos']} aciertos, {e['fallos']} fallos")
+    if perfil:
+        guardar_perfil(args, perfil)
+
+    print("\n--- Resultado del analisis ---")
+    print(destino.texto())
+
+    arbol = conservado.get("arbol")
+    if args.ast and arbol is not None:
+        print("--- Arbol sintactico ---")
+        print(volcar(arbol))
+
+    if args.instantanea:
+        if "tokens" not in conservado:
+            print("No se guardo la instantanea: la entrada tiene errores lexicos.")
+        else:
+            from instantanea import guardar_instantanea
 
-    
-    with open(ruta_salida, "r", encoding="utf-8") as f:
-        print("\n--- Resultado del analisis ---")
-        print(f.read())
+            tokens = conservado["tokens"]
+            guardar_instantanea(args.instantanea, tokens, arbol, tokens.texto)
+            contenido = "tokens y arbol" if arbol is not None else "solo tokens"
+            print(f"Instantanea guardada en '{args.instantanea}' ({contenido})")
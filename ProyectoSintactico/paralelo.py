@@ -0,0 +1,186 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from diagnosticos import MENSAJE_EXITO, Diagnostico, DestinoMemoria, destino_para
+from lexer import ErrorLexico, Scanner, Token
+from parser import K_EOF, MAX_ERRORES, AbortarSintaxis, AnalizadorSintactico, analizar_texto
+from conjuntos import reporte_conjuntos
+from prevalidacion import primer_error_lexico
+
+# Analisis de un solo archivo grande en varios procesos. Un prescaneo barato elige
+# cortes en lineas que empiezan en la columna 1 con una letra (no 'elif'/'else' ni un
+# operador que pueda continuar la linea anterior) y cada trozo se escanea y se analiza
+# en un proceso del pool. El prescaneo puede equivocarse (un corte dentro de una
+# cadena de varias lineas o de una expresion entre parentesis); por eso cada proceso
+# escanea tambien el primer token del trozo siguiente y comprueba que su analisis
+# llega justo a ese token con la pila de sangria en [1], el mismo estado con el que
+# empieza el trozo siguiente. Si no (un 'corte' o un 'desborde'), el trozo se une con
+# el siguiente y se vuelve a analizar. Asi los diagnosticos y sus posiciones son
+# exactamente los del analisis secuencial: un error lexico en cualquier trozo tiene
+# prioridad, y sin recuperar vale el primer error sintactico en orden de fuente.
+
+TAM_MINIMO_TROZO = 256 * 1024
+TROZOS_POR_TRABAJADOR = 4
+
+PATRON_CORTE = re.compile(r"\n(?=[A-Za-z_])(?!(?:elif|else|and|or|in|is)\b)")
+
+# estado de un trozo
+COMPLETO = "completo"  # termina justo antes del trozo siguiente; el analisis sigue alli
+DETENIDO = "detenido"  # el analisis se detuvo en este trozo (primer error o limite de errores)
+LEXICO = "lexico"      # error lexico dentro del trozo
+CORTE = "corte"        # un token (una cadena) cruza el final del trozo
+DESBORDE = "desborde"  # la ultima sentencia sigue en el trozo siguiente
+
+
+def buscar_cortes(texto, cantidad):
+    # hasta cantidad-1 cortes repartidos por tamaño; devuelve [0, c1, ..., len(texto)]
+    n = len(texto)
+    cortes = [0]
+    for k in range(1, cantidad):
+        m = PATRON_CORTE.search(texto, max(k * n // cantidad, cortes[-1]))
+        if m is None:
+            break
+        c = m.end()
+        if c > cortes[-1]:
+            cortes.append(c)
+    cortes.append(n)
+    return cortes
+
+
+def analizar_trozo(trozo, largo, linea, modo_escaner="tabla", recuperar=False, max_errores=MAX_ERRORES):
+    # se ejecuta en un proceso del pool. trozo: el texto desde un corte hasta el fin de
+    # la linea donde empieza el trozo siguiente, que empieza en 'largo' (None en el
+    # ultimo trozo). Devuelve (estado, diagnosticos como dicts)
+    sc = Scanner(trozo, modo=modo_escaner)
+    sc.buf.linea = linea
+    tokens = []
+    siguiente = None
+    try:
+        for tipo, ini, fin, lin, col in sc._recorrer():
+            if largo is not None and fin > largo:
+                if ini < largo:
+                    return CORTE, []
+                siguiente = Token(tipo, trozo[ini:fin], lin, col)
+                break
+            tokens.append(Token(tipo, trozo[ini:fin], lin, col))
+    except ErrorLexico as le:
+        # una comilla sin cerrar puede ser una cadena que sigue en el trozo siguiente
+        if largo is not None and trozo[sc.buf.i] in "\"'":
+            return CORTE, []
+        return LEXICO, [Diagnostico.desde_error_lexico(le).a_dict()]
+    if largo is not None and siguiente is None:
+        return CORTE, []
+    if siguiente is not None:
+        tokens.append(siguiente)
+        tokens.append(Token("EOF", "", siguiente.linea, siguiente.col + 1))
+    elif tokens:
+        tokens.append(Token("EOF", "", tokens[-1].linea, tokens[-1].col + 1))
+    else:
+        tokens.append(Token("EOF", "", 1, 1))
+
+    memoria = DestinoMemoria()
+    p = AnalizadorSintactico(tokens, salida=memoria, recuperar=recuperar, max_errores=max_errores)
+    detenido = False
+    try:
+        while p.act is not siguiente and p.act.cod != K_EOF:
+            p.sentencia()
+    except AbortarSintaxis:
+        detenido = True
+    registros = [d.a_dict() for d in memoria.registros]
+    if siguiente is None:
+        return (DETENIDO if detenido else COMPLETO), registros
+    # el EOF agregado no es un token real: si el analisis lo alcanzo, la ultima
+    # sentencia sigue despues del corte
+    if p.i > len(tokens) - 2:
+        return DESBORDE, []
+    if detenido:
+        return DETENIDO, registros
+    if p.pila_indent != [1] or p.ult_error == (siguiente.linea, siguiente.col):
+        return DESBORDE, []
+    return COMPLETO, registros
+
+
+def _trozo(texto, cortes, lineas, k):
+    # argumentos de analizar_trozo para el trozo k
+    ini, fin = cortes[k], cortes[k + 1]
+    if fin >= len(texto):
+        return texto[ini:], None, lineas[k]
+    fin_linea = texto.find("\n", fin)
+    return texto[ini:fin_linea if fin_linea >= 0 else len(texto)], fin - ini, lineas[k]
+
+
+def analizar_en_paralelo(texto, salida, trabajadores=None, modo_escaner="tabla", mostrar_conjuntos=False,
+                         recuperar=False, max_errores=MAX_ERRORES, tam_minimo=TAM_MINIMO_TROZO, ejecutor=None,
+                         prevalidar=False):
+    # como analizar_texto (sin en_flujo), repartiendo el texto en trozos; devuelve True
+    # si no hubo errores. ejecutor: un ProcessPoolExecutor para reutilizar entre llamadas
+    destino = destino_para(salida)
+    if prevalidar:
+        # un error lexico se informa sin repartir nada
+        error = primer_error_lexico(texto)
+        if error is not None:
+            destino.agregar(Diagnostico.desde_error_lexico(error))
+            destino.vaciar()
+            return False
+    trabajadores = trabajadores or getattr(ejecutor, "_max_workers", None) or os.cpu_count() or 1
+    cantidad = min(trabajadores * TROZOS_POR_TRABAJADOR, len(texto) // max(1, tam_minimo))
+    cortes = buscar_cortes(texto, cantidad) if cantidad > 1 else [0, len(texto)]
+    if len(cortes) <= 2:
+        return analizar_texto(texto, destino, modo_escaner=modo_escaner, mostrar_conjuntos=mostrar_conjuntos,
+                              recuperar=recuperar, max_errores=max_errores, prevalidar=prevalidar)
+
+    lineas = [1]
+    for k in range(1, len(cortes) - 1):
+        lineas.append(lineas[-1] + texto.count("\n", cortes[k - 1], cortes[k]))
+    trabajo = partial(analizar_trozo, modo_escaner=modo_escaner, recuperar=recuperar, max_errores=max_errores)
+    argumentos = [_trozo(texto, cortes, lineas, k) for k in range(len(cortes) - 1)]
+    if ejecutor is not None:
+        resultados = list(ejecutor.map(trabajo, *zip(*argumentos)))
+    else:
+        with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+            resultados = list(pool.map(trabajo, *zip(*argumentos)))
+    del argumentos
+
+    # uniones: un trozo con un corte (o que se desborda, mientras el analisis siga)
+    # se une con el siguiente y se analiza de nuevo en este proceso
+    k = 0
+    detenido = False
+    while k < len(resultados):
+        estado, registros = resultados[k]
+        if estado == CORTE or (estado == DESBORDE and not detenido):
+            del cortes[k + 1], lineas[k + 1], resultados[k + 1]
+            resultados[k] = trabajo(*_trozo(texto, cortes, lineas, k))
+            continue
+        if estado == LEXICO:
+            # el escaneo secuencial se habria detenido en este error
+            for d in registros:
+                destino.agregar(Diagnostico.desde_dict(d))
+            destino.vaciar()
+            return False
+        if estado == DETENIDO:
+            detenido = True
+        k += 1
+
+    errores = 0
+    for estado, registros in resultados:
+        for d in registros:
+            if d["tipo"] == "limite":
+                continue
+            destino.agregar(Diagnostico.desde_dict(d))
+            errores += 1
+            if recuperar and errores >= max_errores:
+                destino.agregar(Diagnostico(
+                    "limite", mensaje=f">>> Se alcanzo el limite de {max_errores} errores; el analisis se detuvo."))
+                break
+        else:
+            if estado != DETENIDO:
+                continue
+        break
+    if not errores:
+        destino.agregar(Diagnostico("exito", mensaje=MENSAJE_EXITO))
+    if mostrar_conjuntos:
+        destino.agregar(Diagnostico("conjuntos", mensaje=reporte_conjuntos()))
+    destino.vaciar()
+    return not errores
@@ -1,82 +1,250 @@
 import sys
 from lexer import (
     Scanner,
+    ScannerFragmentado,
+    TAM_FRAGMENTO,
     ErrorLexico,
+    FlujoTokens,
     Token,
+    TokenArray,
+    TIPOS_TOKEN,
+    OPERADORES,
+    codigo,
 )
+from arbol import Nodo
+from diagnosticos import MENSAJE_EXITO, Diagnostico, DestinoArchivo, DestinoMemoria, destino_para
+from conjuntos import PRIMEROS, SIGUIENTES, PREDICCION, reporte_conjuntos
+from gramatica import ESPERADOS
+from prevalidacion import primer_error_lexico
 
 class AbortarSintaxis(Exception):
     pass
 
 
+# -------------------- codigos de token usados por el parser --------------------
+K_EOF, K_ID, K_ENTERO, K_DECIMAL, K_CADENA = (codigo(t) for t in ("EOF", "id", "tk_entero", "tk_decimal", "tk_cadena"))
+K_DEF, K_IF, K_ELIF, K_ELSE, K_WHILE, K_FOR, K_IN, K_IS = (codigo(t) for t in ("def", "if", "elif", "else", "while", "for", "in", "is"))
+K_PASS, K_BREAK, K_CONTINUE, K_RETURN, K_PRINT = (codigo(t) for t in ("pass", "break", "continue", "return", "print"))
+K_OR, K_AND, K_NOT, K_LAMBDA = (codigo(t) for t in ("or", "and", "not", "lambda"))
+K_TRUE, K_FALSE, K_NONE = (codigo(t) for t in ("True", "False", "None"))
+K_PAR_IZQ, K_PAR_DER, K_COR_IZQ, K_COR_DER = (codigo(t) for t in ("(", ")", "[", "]"))
+K_DOS_PUNTOS, K_COMA, K_PUNTO, K_ASIG = (codigo(t) for t in (":", ",", ".", "="))
+K_SUMA, K_RESTA = codigo("+"), codigo("-")
+
+OPS_COMPARACION = frozenset(codigo(t) for t in ("==", "!=", "<", ">", "<=", ">=", "in", "is"))
+OPS_SUMA = frozenset((K_SUMA, K_RESTA))
+OPS_PRODUCTO = frozenset(codigo(t) for t in ("*", "/", "%"))
+CIERRE_ARGUMENTOS = frozenset((K_PAR_DER, K_COMA))
+# con semantica: un nombre seguido de uno de estos, dentro de parentesis o corchetes
+# (o suelto), puede ser el destino de una asignacion
+SIGUEN_A_DESTINO = frozenset((K_COMA, K_PAR_DER, K_COR_DER, K_ASIG))
+
+# decisiones predictivas tomadas de los conjuntos que conjuntos.py calcula a partir de
+# la gramatica de gramatica.py
+def codigos(terminales):
+    return frozenset(codigo(t) for t in terminales)
+
+PRED_DEF = codigos(PREDICCION["instruccion → definicion_funcion"])
+PRED_IF = codigos(PREDICCION["instruccion → sentencia_if"])
+PRED_WHILE = codigos(PREDICCION["instruccion → sentencia_while"])
+PRED_FOR = codigos(PREDICCION["instruccion → sentencia_for"])
+SIMPLES_SIN_ARGUMENTO = codigos(PREDICCION["sentencia_simple → 'pass'"] | PREDICCION["sentencia_simple → 'break'"]
+                                | PREDICCION["sentencia_simple → 'continue'"])
+# PRIMEROS(atomo) sin los que abren una estructura: se consumen con un solo avanzar()
+ATOMOS_SIMPLES = codigos(PRIMEROS["atomo"] - {"(", "[", "lambda"})
+
+# modo de recuperacion: tokens donde puede retomarse el analisis tras un error
+SINCRONIZACION = codigos(SIGUIENTES["sentencia"] | SIGUIENTES["bloque"])
+MAX_ERRORES = 50
+
+# motores de analisis: el descendente recursivo de este modulo o el LL(1) dirigido por
+# tabla de ll1.py (mismos diagnosticos; sin arbol ni analisis en flujo)
+MOTOR_DESCENDENTE = "descendente"
+MOTOR_LL1 = "ll1"
+MOTORES = (MOTOR_DESCENDENTE, MOTOR_LL1)
+
+# motor de expresiones: precedencia de los operadores binarios y de los prefijos.
+# Un operando que sigue a un operador de precedencia p admite los prefijos de
+# precedencia >= p + 1; despues de un prefijo de precedencia q, los de precedencia >= q.
+PRECEDENCIA_BINARIA = {K_OR: 1, K_AND: 2}
+PRECEDENCIA_BINARIA.update(dict.fromkeys(OPS_COMPARACION, 4))
+PRECEDENCIA_BINARIA.update(dict.fromkeys(OPS_SUMA, 5))
+PRECEDENCIA_BINARIA.update(dict.fromkeys(OPS_PRODUCTO, 6))
+PREC_FACTOR = 7
+PREC_POTENCIA = 8
+PRECEDENCIA_PREFIJA = {K_NOT: 3, K_SUMA: PREC_FACTOR, K_RESTA: PREC_FACTOR}
+NODO_ATOMO = {K_ID: "nombre", K_ENTERO: "numero", K_DECIMAL: "numero", K_CADENA: "cadena",
+              K_TRUE: "constante", K_FALSE: "constante", K_NONE: "constante"}
+ESPERADOS_ATOMO = list(ESPERADOS["atomo"])
+
+# continuaciones del motor de expresiones
+(C_FIN, C_PARENTESIS, C_LISTA, C_SUBINDICE, C_LLAMADA, C_LAMBDA,
+ C_ARG_PRIMERO, C_ARG_SIG, C_COMP, C_COMP_CIERRE) = range(10)
+
+# nombre con el que se muestra un codigo esperado en los mensajes de error
+NOMBRE_ESPERADO = {codigo(t): t for t in TIPOS_TOKEN}
+NOMBRE_ESPERADO.update({codigo(op): op for op in OPERADORES})
+
+
 class AnalizadorSintactico:
-    def __init__(self, tokens, salida=sys.stdout):
-        self.toks = tokens
+    def __init__(self, tokens, salida=sys.stdout, mostrar_conjuntos=False, recuperar=False,
+                 max_errores=MAX_ERRORES, construir_ast=False, simbolos=None, semantica=False):
+        # tokens puede ser una lista, un TokenArray o cualquier iterable/generador de tokens
+        # (p.ej. Scanner.iterar()); en ese caso se consume en flujo.
+        if isinstance(tokens, (list, TokenArray)):
+            self.flujo = None
+            self.toks = tokens
+            self.act = self.toks[0] if self.toks else Token("EOF", "", 1, 1)
+        else:
+            self.flujo = tokens if isinstance(tokens, FlujoTokens) else FlujoTokens(tokens)
+            self.toks = None
+            self.act = self.flujo.ver()
         self.i = 0
-        self.act = self.toks[0] if self.toks else Token("EOF", "", 1, 1)
-        self.salida = salida
+        # salida: un destino de diagnosticos.py, un objeto con write o None (consola);
+        # los mensajes se acumulan como Diagnostico y se escriben al terminar analizar()
+        self.destino = destino_para(salida)
+        self.mostrar_conjuntos = mostrar_conjuntos
         self.pila_indent = [1]
         self.ult_linea_sent = self.act.linea
+        # recuperar=True informa todos los errores en una pasada (hasta max_errores)
+        self.recuperar = recuperar
+        self.max_errores = max_errores
+        self.errores = 0
+        self.ult_error = None
+        if recuperar:
+            self.sentencia = self.sentencia_con_recuperacion
+        # construir_ast=True: las reglas devuelven nodos y analizar() deja el arbol en self.arbol;
+        # por defecto solo se valida y no se crea ningun nodo
+        self.construir = construir_ast
+        self.arbol = None
+        # simbolos: un simbolos.SimbolosArchivo que recibe las definiciones, sus parametros
+        # y las llamadas a medida que se reconocen (ver simbolos.py); None no agrega nada
+        self.simbolos = simbolos
+        # semantica=True: en la misma pasada se resuelven los nombres y se revisa la cantidad
+        # de argumentos de las llamadas (ver semantica.py); los errores se informan solo si
+        # no hay errores sintacticos
+        self.semantica = None
+        if semantica:
+            from semantica import AnalisisSemantico
+
+            self.semantica = AnalisisSemantico()
 
     # -------------------- utilidades --------------------
     def reportar_error(self, token, esperados=None, falla_indent=False):
         if falla_indent:
-            msg = f"<{token.linea},{token.col}>Error sintactico: falla de indentacion"
+            diagnostico = Diagnostico("indentacion", token.linea, token.col)
         else:
             encontrado = "EOF" if token.tipo == "EOF" else (token.lexema if token.lexema != "" else token.tipo)
-            exp = []
-            if esperados:
-                exp = [f"\"{e}\"" for e in esperados]
-            msg = f"<{token.linea},{token.col}> Error sintactico: se encontro: \"{encontrado}\"; se esperaba: {', '.join(exp)}."
-        self._emitir(msg)
+            diagnostico = Diagnostico("sintactico", token.linea, token.col, encontrado, esperados or ())
+        if self.recuperar:
+            # un error en cascada sobre el mismo token no se vuelve a informar
+            if self.ult_error == (token.linea, token.col):
+                raise AbortarSintaxis()
+            self.ult_error = (token.linea, token.col)
+        self.errores += 1
+        self.destino.agregar(diagnostico)
+        if self.recuperar and self.errores >= self.max_errores:
+            self.destino.agregar(Diagnostico(
+                "limite", mensaje=f">>> Se alcanzo el limite de {self.max_errores} errores; el analisis se detuvo."))
         raise AbortarSintaxis()
 
-    def _emitir(self, texto):
-        if hasattr(self.salida, "write"):
-            self.salida.write(texto + "\n")
-        else:
-            print(texto)
-
     def avanzar(self):
+        if self.flujo is not None:
+            if self.act.cod != K_EOF:
+                self.act = self.flujo.avanzar()
+                self.i = self.flujo.consumidos
+            return
         if self.i < len(self.toks) - 1:
             self.i += 1
             self.act = self.toks[self.i]
 
-    def emparejar(self, tipos, mostrar=None):
-        if isinstance(tipos, str):
-            tipos = [tipos]
-        if self.act.tipo in tipos or self.act.lexema in tipos:
-            tok = self.act
+    def emparejar(self, esperado, mostrar=None):
+        # esperado es un codigo de token (K_*)
+        tok = self.act
+        if tok.cod == esperado:
             self.avanzar()
             return tok
-        else:
-            esperados = mostrar if mostrar else tipos
-            self.reportar_error(self.act, esperados=esperados)
+        self.reportar_error(tok, esperados=mostrar if mostrar else [NOMBRE_ESPERADO[esperado]])
+
+    def token_anterior(self):
+        if self.flujo is not None:
+            return self.flujo.anterior
+        return self.toks[self.i - 1] if self.i > 0 else None
+
+    # -------------------- recuperacion de errores --------------------
+    def sentencia_con_recuperacion(self):
+        # reemplaza a sentencia() cuando recuperar=True
+        inicio = self.i
+        try:
+            return AnalizadorSintactico.sentencia(self)
+        except AbortarSintaxis:
+            if self.errores >= self.max_errores:
+                raise
+            self.sincronizar(inicio)
+            return None
+
+    def sincronizar(self, inicio):
+        # modo panico: descarta tokens hasta el primero de una linea que pueda seguir
+        # a una sentencia (SINCRONIZACION) o hasta EOF. Siempre queda al menos un token
+        # despues del inicio de la sentencia que fallo, asi que el analisis avanza.
+        if not self.pila_indent:
+            self.pila_indent.append(1)
+        while self.act.cod != K_EOF:
+            if self.i > inicio and self.act.cod in SINCRONIZACION:
+                anterior = self.token_anterior()
+                if anterior is None or anterior.linea < self.act.linea:
+                    return
+            self.avanzar()
 
     def en_limite_de_linea(self):
         return self.act.linea > self.ult_linea_sent
 
     # -------------------- punto de entrada --------------------
     def analizar(self):
+        # devuelve True si el analisis termino sin errores; al final vacia el destino
+        try:
+            return self._analizar()
+        finally:
+            self.destino.vaciar()
+
+    def _analizar(self):
         try:
             self.programa()
-            self._emitir("El analisis sintactico ha finalizado exitosamente.")
+            if self.errores:
+                # solo en modo de recuperacion: los errores ya se informaron
+                raise AbortarSintaxis()
+            semanticos = self.semantica.terminar() if self.semantica is not None else ()
+            for d in semanticos:
+                self.destino.agregar(d)
+            if not semanticos:
+                # el mensaje de exito solo si no hubo ningun error, tampoco semantico
+                self.destino.agregar(Diagnostico("exito", mensaje=MENSAJE_EXITO))
         except AbortarSintaxis:
             # igual imprimimos los conjuntos teóricos para referencia
-            self.imprimir_conjuntos_teoricos()
-            return
+            if self.mostrar_conjuntos:
+                self.imprimir_conjuntos_teoricos()
+            return False
         except ErrorLexico as le:
-            self._emitir(str(le))
-            self.imprimir_conjuntos_teoricos()
-            return
+            # solo ocurre al consumir en flujo: se reporta igual que un
+            # error lexico detectado antes del analisis
+            self.destino.agregar(Diagnostico.desde_error_lexico(le))
+            return False
 
         # si todo ok, también imprimimos conjuntos
-        self.imprimir_conjuntos_teoricos()
+        if self.mostrar_conjuntos:
+            self.imprimir_conjuntos_teoricos()
+        return not semanticos
 
     # -------------------- gramática --------------------
+    # con construir_ast=True cada regla devuelve su Nodo (ver arbol.py); si no, None
     def programa(self):
-        while self.act.tipo != "EOF":
-            self.sentencia()
+        sentencias = [] if self.construir else None
+        while self.act.cod != K_EOF:
+            nodo = self.sentencia()
+            if nodo is not None:
+                sentencias.append(nodo)
+        if sentencias is not None:
+            self.arbol = Nodo("programa", hijos=sentencias, linea=1, col=1)
 
     # gestión indentación
     def requerir_indentacion_si_necesaria(self):
@@ -104,430 +272,777 @@ class AnalizadorSintactico:
     def sentencia(self):
         self.consumir_contexto_nueva_linea()
 
-        if self.act.lexema == "def":
-            self.definicion_funcion()
-            return
-        if self.act.lexema == "if":
-            self.sentencia_if()
-            return
-        if self.act.lexema == "while":
-            self.sentencia_while()
-            return
-        if self.act.lexema == "for":
-            self.sentencia_for()
-            return
-        self.sentencia_simple()
+        compuesta = self.SENTENCIAS_COMPUESTAS.get(self.act.cod)
+        if compuesta is not None:
+            return compuesta(self)
+        return self.sentencia_simple()
 
     # sentencias simples (incluye print)
     def sentencia_simple(self):
-        if self.act.lexema in ("pass", "break", "continue"):
+        tok = self.act
+        cod = tok.cod
+        if cod in SIMPLES_SIN_ARGUMENTO:
             self.avanzar()
-            return
+            if self.construir:
+                return Nodo(tok.tipo, linea=tok.linea, col=tok.col)
+            return None
 
-        if self.act.lexema == "return":
+        if cod == K_RETURN:
             self.avanzar()
-            if self.act.tipo != "EOF" and self.act.linea == self.ult_linea_sent:
-                self.expresion()
-            return
+            valor = None
+            if self.act.cod != K_EOF and self.act.linea == self.ult_linea_sent:
+                valor = self.expresion()
+            if self.construir:
+                return Nodo("return", hijos=[valor] if valor is not None else [], linea=tok.linea, col=tok.col)
+            return None
 
-        if self.act.lexema == "print":
+        if cod == K_PRINT:
             self.avanzar()
-            self.emparejar("(", mostrar=["("])
-            if self.act.lexema != ")":
-                self.lista_argumentos()
-            self.emparejar(")", mostrar=[")"])
-            return
+            self.emparejar(K_PAR_IZQ, mostrar=["("])
+            argumentos = None
+            if self.act.cod != K_PAR_DER:
+                argumentos = self.lista_argumentos()
+            self.emparejar(K_PAR_DER, mostrar=[")"])
+            if self.construir:
+                return Nodo("print", hijos=argumentos or [], linea=tok.linea, col=tok.col)
+            return None
 
-        self.sentencia_expresion()
+        return self.sentencia_expresion()
 
     def sentencia_expresion(self):
-        self.lista_expresiones()
-        while self.act.lexema == "=":
-            self.emparejar("=")
-            self.lista_expresiones()
+        tok = self.act
+        semantica = self.semantica
+        if semantica is not None:
+            # usos guardados antes de esta sentencia: los que siguen pueden ser destinos
+            marca = len(semantica.ambito.usos)
+        partes = self.lista_expresiones()
+        if self.act.cod != K_ASIG:
+            if self.construir:
+                return Nodo("expresion", hijos=[partes], linea=tok.linea, col=tok.col)
+            return None
+        partes = [partes] if self.construir else None
+        while self.act.cod == K_ASIG:
+            if semantica is not None:
+                if semantica.ambito.destinos:
+                    semantica.asignar(marca)
+                marca = len(semantica.ambito.usos)
+            self.emparejar(K_ASIG)
+            lado = self.lista_expresiones()
+            if partes is not None:
+                partes.append(lado)
+        if partes is not None:
+            return Nodo("asignacion", hijos=partes, linea=tok.linea, col=tok.col)
+        return None
 
     # sentencias compuestas
     def definicion_funcion(self):
-        self.emparejar("def")
-        self.emparejar("id", mostrar=["identificador"])
-        self.emparejar("tk_par_izq", mostrar=["("])
-        if self.act.tipo != "tk_par_der":
-            self.parametros()
-        self.emparejar("tk_par_der", mostrar=[")"])
-        self.emparejar("tk_dos_puntos", mostrar=[":"])
+        tok = self.emparejar(K_DEF)
+        nombre = self.emparejar(K_ID, mostrar=["identificador"])
+        if self.simbolos is not None:
+            self.simbolos.definicion(nombre)
+        semantica = self.semantica
+        if semantica is not None:
+            semantica.abrir()
+        inicio = self.emparejar(K_PAR_IZQ, mostrar=["("])
+        parametros = None
+        if self.act.cod != K_PAR_DER:
+            parametros = self.parametros()
+        self.emparejar(K_PAR_DER, mostrar=[")"])
+        if semantica is not None:
+            semantica.funcion(nombre)
+        self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
         self.requerir_indentacion_si_necesaria()
-        self.bloque()
+        cuerpo = self.bloque()
+        if semantica is not None:
+            semantica.cerrar()
+        if self.construir:
+            if parametros is None:
+                parametros = Nodo("parametros", linea=inicio.linea, col=inicio.col)
+            return Nodo("funcion", nombre.lexema, [parametros, cuerpo], tok.linea, tok.col)
+        return None
 
     def sentencia_if(self):
-        self.emparejar("if")
-        self.expresion()
-        self.emparejar("tk_dos_puntos", mostrar=[":"])
+        c = self.construir
+        ramas = [] if c else None
+        tok = self.emparejar(K_IF)
+        condicion = self.expresion()
+        self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
         self.requerir_indentacion_si_necesaria()
-        self.bloque()
-        while self.act.lexema == "elif":
-            self.emparejar("elif")
-            self.expresion()
-            self.emparejar("tk_dos_puntos", mostrar=[":"])
+        cuerpo = self.bloque()
+        if c:
+            ramas.append(Nodo("rama", hijos=[condicion, cuerpo], linea=tok.linea, col=tok.col))
+        while self.act.cod == K_ELIF:
+            rama = self.emparejar(K_ELIF)
+            condicion = self.expresion()
+            self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
             self.requerir_indentacion_si_necesaria()
-            self.bloque()
-        if self.act.lexema == "else":
-            self.emparejar("else")
-            self.emparejar("tk_dos_puntos", mostrar=[":"])
+            cuerpo = self.bloque()
+            if c:
+                ramas.append(Nodo("rama", hijos=[condicion, cuerpo], linea=rama.linea, col=rama.col))
+        if self.act.cod == K_ELSE:
+            self.emparejar(K_ELSE)
+            self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
             self.requerir_indentacion_si_necesaria()
-            self.bloque()
+            cuerpo = self.bloque()
+            if c:
+                ramas.append(cuerpo)
+        if c:
+            return Nodo("if", hijos=ramas, linea=tok.linea, col=tok.col)
+        return None
 
     def sentencia_while(self):
-        self.emparejar("while")
-        self.expresion()
-        self.emparejar("tk_dos_puntos", mostrar=[":"])
+        tok = self.emparejar(K_WHILE)
+        condicion = self.expresion()
+        self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
         self.requerir_indentacion_si_necesaria()
-        self.bloque()
+        cuerpo = self.bloque()
+        if self.construir:
+            return Nodo("while", hijos=[condicion, cuerpo], linea=tok.linea, col=tok.col)
+        return None
 
     def sentencia_for(self):
-        self.emparejar("for")
-        self.emparejar("id", mostrar=["identificador"])
-        self.emparejar("in")
-        self.expresion()
-        self.emparejar("tk_dos_puntos", mostrar=[":"])
+        tok = self.emparejar(K_FOR)
+        variable = self.emparejar(K_ID, mostrar=["identificador"])
+        if self.semantica is not None:
+            self.semantica.enlazar(variable)
+        self.emparejar(K_IN)
+        iterable = self.expresion()
+        self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
         self.requerir_indentacion_si_necesaria()
-        self.bloque()
+        cuerpo = self.bloque()
+        if self.construir:
+            return Nodo("for", variable.lexema, [iterable, cuerpo], tok.linea, tok.col)
+        return None
+
+    # tabla de salto de sentencia(): codigo del primer token -> regla compuesta
+    SENTENCIAS_COMPUESTAS = {
+        **dict.fromkeys(PRED_DEF, definicion_funcion),
+        **dict.fromkeys(PRED_IF, sentencia_if),
+        **dict.fromkeys(PRED_WHILE, sentencia_while),
+        **dict.fromkeys(PRED_FOR, sentencia_for),
+    }
 
     def bloque(self):
         linea_base = self.act.linea
         col_base = self.pila_indent[-1]
-        while self.act.tipo != "EOF" and self.act.col == col_base and self.act.linea >= linea_base:
-            self.sentencia()
-            if self.act.tipo == "EOF" or self.act.col < col_base:
+        nodo = Nodo("bloque", linea=linea_base, col=col_base) if self.construir else None
+        while self.act.cod != K_EOF and self.act.col == col_base and self.act.linea >= linea_base:
+            sentencia = self.sentencia()
+            if sentencia is not None:
+                nodo.hijos.append(sentencia)
+            if self.act.cod == K_EOF or self.act.col < col_base:
                 break
         if self.pila_indent and self.pila_indent[-1] == col_base:
             self.pila_indent.pop()
+        return nodo
 
     # --- parametros y argumentos ---
     def parametros(self):
-        self.parametro()
-        while self.act.lexema == ",":
-            self.emparejar(",")
-            if self.act.tipo == "tk_par_der":
+        tok = self.act
+        nodos = [] if self.construir else None
+        p = self.parametro()
+        if nodos is not None:
+            nodos.append(p)
+        while self.act.cod == K_COMA:
+            self.emparejar(K_COMA)
+            if self.act.cod == K_PAR_DER:
                 break
-            self.parametro()
+            p = self.parametro()
+            if nodos is not None:
+                nodos.append(p)
+        if nodos is not None:
+            return Nodo("parametros", hijos=nodos, linea=tok.linea, col=tok.col)
+        return None
 
     def parametro(self):
-        self.emparejar("id", mostrar=["identificador"])
-        if self.act.lexema == ":":
-            self.emparejar(":")
-            self.tipo_anotado()
+        nombre = self.emparejar(K_ID, mostrar=["identificador"])
+        if self.simbolos is not None:
+            self.simbolos.parametro(nombre)
+        if self.semantica is not None:
+            self.semantica.parametro(nombre)
+        tipo = None
+        if self.act.cod == K_DOS_PUNTOS:
+            self.emparejar(K_DOS_PUNTOS)
+            tipo = self.tipo_anotado()
+        if self.construir:
+            return Nodo("parametro", nombre.lexema, [tipo] if tipo is not None else [], nombre.linea, nombre.col)
+        return None
 
     def tipo_anotado(self):
-        if self.act.lexema == "[":
-            self.emparejar("[")
-            self.emparejar("id", mostrar=["tipo/identificador"])
-            if self.act.lexema == ",":
+        if self.act.cod == K_COR_IZQ:
+            tok = self.emparejar(K_COR_IZQ)
+            nombre = self.emparejar(K_ID, mostrar=["tipo/identificador"])
+            if self.act.cod == K_COMA:
                 self.reportar_error(self.act, esperados=["]"])
-            self.emparejar("]", mostrar=["]"])
+            self.emparejar(K_COR_DER, mostrar=["]"])
+            tipo = "tipo_lista"
         else:
-            self.emparejar("id", mostrar=["tipo/identificador"])
+            tok = nombre = self.emparejar(K_ID, mostrar=["tipo/identificador"])
+            tipo = "tipo"
+        if self.simbolos is not None:
+            self.simbolos.anotacion(nombre, tipo == "tipo_lista")
+        if self.construir:
+            return Nodo(tipo, nombre.lexema, linea=tok.linea, col=tok.col)
+        return None
 
     # expresiones
     def lista_expresiones(self):
-        self.expresion()
-        while self.act.lexema == ",":
-            self.emparejar(",")
-            self.expresion()
-        return True
+        tok = self.act
+        primera = self.expresion()
+        if self.act.cod != K_COMA:
+            return primera
+        elementos = [primera] if self.construir else None
+        while self.act.cod == K_COMA:
+            self.emparejar(K_COMA)
+            e = self.expresion()
+            if elementos is not None:
+                elementos.append(e)
+        if elementos is not None:
+            return Nodo("tupla", hijos=elementos, linea=tok.linea, col=tok.col)
+        return None
 
     def expresion(self):
-        return self.expr_or()
-
-    def expr_or(self):
-        self.expr_and()
-        while self.act.lexema == "or":
-            self.emparejar("or")
-            self.expr_and()
-
-    def expr_and(self):
-        self.expr_not()
-        while self.act.lexema == "and":
-            self.emparejar("and")
-            self.expr_not()
-
-    def expr_not(self):
-        if self.act.lexema == "not":
-            self.emparejar("not")
-            self.expr_not()
-        else:
-            self.comparacion()
+        valores = self.motor_expresiones([C_FIN])
+        return valores[0] if valores is not None else None
 
-    def comparacion(self):
-        self.expr_arit()
-        while self.act.lexema in ("==", "!=", "<", ">", "<=", ">=", "in", "is"):
-            self.avanzar()
-            self.expr_arit()
-
-    def expr_arit(self):
-        self.termino()
-        while self.act.lexema in ("+", "-"):
-            self.avanzar()
-            self.termino()
+    def lista_argumentos(self):
+        # expresion ('for' ...)? (',' expresion ('for' ...)?)* ','? ; no consume el ')'
+        # con construir_ast devuelve la lista de argumentos
+        return self.motor_expresiones([C_FIN, C_ARG_PRIMERO])
 
-    def termino(self):
-        self.factor()
-        while self.act.lexema in ("*", "/", "%"):
-            self.avanzar()
-            self.factor()
+    def motor_expresiones(self, pila):
+        # Reconoce expresion → operando (op_binario operando)* sin recursion. La tabla de
+        # precedencias decide que prefijos admite cada operando ('not' no puede seguir a un
+        # operador de comparacion ni aritmetico). Cada construccion anidada ('(', '[', una
+        # llamada, un subindice, lambda, un generador) apila la continuacion (C_*) que se
+        # ejecuta cuando termina la expresion interior, asi que el anidamiento solo esta
+        # limitado por la memoria. Los errores son los mismos que los de la gramatica recursiva.
+        # Con construir_ast los operandos se acumulan en 'valores' y los operadores pendientes
+        # en 'ops' (None separa las expresiones anidadas); 'marcas' guarda donde empiezan los
+        # elementos de una lista, los argumentos de una llamada o un generador.
+        # Con simbolos o semantica, 'llamadas' lleva [token del nombre llamado o None,
+        # argumentos, si es un nombre suelto] de cada llamada abierta (la lista de argumentos
+        # de print no se informa); 'ultimo_nombre' es el ultimo nombre usado como atomo.
+        prefijos = PRECEDENCIA_PREFIJA
+        binarios = PRECEDENCIA_BINARIA
+        construir = self.construir
+        if construir:
+            valores, ops, marcas = [], [None], []
+        simbolos = self.simbolos
+        semantica = self.semantica
+        llamadas = None
+        if simbolos is not None or semantica is not None:
+            llamadas = [[None, 1, False]] if pila[-1] == C_ARG_PRIMERO else []
+            ultimo_nombre = None
+        minimo = 0
+        operando = True
+        while True:
+            if operando:
+                # operadores prefijos y atomo
+                tok = self.act
+                cod = tok.cod
+                p = prefijos.get(cod)
+                while p is not None and p >= minimo:
+                    if construir:
+                        ops.append((p, tok, True))
+                    minimo = p
+                    self.avanzar()
+                    tok = self.act
+                    cod = tok.cod
+                    p = prefijos.get(cod)
+                if cod in ATOMOS_SIMPLES:
+                    self.avanzar()
+                    if construir:
+                        valores.append(Nodo(NODO_ATOMO[cod], tok.lexema, (), tok.linea, tok.col))
+                    if semantica is not None and cod == K_ID:
+                        ultimo_nombre = tok
+                        destino = minimo == 0 and self.act.cod in SIGUEN_A_DESTINO and (
+                            len(pila) == 1 or all(c == C_FIN or c == C_PARENTESIS or c == C_LISTA
+                                                  for c in pila))
+                        # un nombre ya enlazado en el ambito actual se guarda solo si puede ser
+                        # un destino: reasignarlo cambia su aridad
+                        if destino or tok.lexema not in semantica.ambito.nombres:
+                            semantica.uso(tok, destino)
+                elif cod == K_PAR_IZQ:
+                    self.avanzar()
+                    if self.act.cod != K_PAR_DER:
+                        pila.append(C_PARENTESIS)
+                        if construir:
+                            ops.append(None)
+                        minimo = 0
+                        continue
+                    self.avanzar()
+                    if construir:
+                        valores.append(Nodo("tupla", None, None, tok.linea, tok.col))
+                elif cod == K_COR_IZQ:
+                    self.avanzar()
+                    if self.act.cod != K_COR_DER:
+                        pila.append(C_LISTA)
+                        if construir:
+                            marcas.append((len(valores), tok.linea, tok.col))
+                            ops.append(None)
+                        minimo = 0
+                        continue
+                    self.avanzar()
+                    if construir:
+                        valores.append(Nodo("lista", None, None, tok.linea, tok.col))
+                elif cod == K_LAMBDA:
+                    self.avanzar()
+                    if semantica is not None:
+                        semantica.abrir()
+                    parametros = None
+                    if self.act.cod != K_DOS_PUNTOS:
+                        parametros = self.parametros_lambda()
+                    dos_puntos = self.emparejar(K_DOS_PUNTOS, mostrar=[":"])
+                    pila.append(C_LAMBDA)
+                    if construir:
+                        if parametros is None:
+                            parametros = Nodo("parametros", None, None, dos_puntos.linea, dos_puntos.col)
+                        valores.append(Nodo("lambda", None, [parametros], tok.linea, tok.col))
+                        ops.append(None)
+                    minimo = 0
+                    continue
+                else:
+                    self.reportar_error(self.act, esperados=ESPERADOS_ATOMO)
+                operando = False
 
-    def factor(self):
-        if self.act.lexema in ("+", "-"):
-            self.avanzar()
-            self.factor()
-            return
-        self.potencia()
+            # operando completo: llamadas, subindices y atributos
+            tok = self.act
+            cod = tok.cod
+            if cod == K_PAR_IZQ:
+                if llamadas is not None:
+                    # solo se indexan las llamadas a un nombre: f(...) u obj.f(...); la
+                    # semantica revisa solo las de un nombre suelto, f(...)
+                    llamado = self.token_anterior()
+                    if llamado.cod != K_ID:
+                        llamado = None
+                    suelto = (llamado is not None and ultimo_nombre is not None
+                              and llamado.linea == ultimo_nombre.linea and llamado.col == ultimo_nombre.col)
+                self.avanzar()
+                if self.act.cod != K_PAR_DER:
+                    pila.append(C_LLAMADA)
+                    pila.append(C_ARG_PRIMERO)
+                    if construir:
+                        marcas.append((len(valores), tok.linea, tok.col))
+                        ops.append(None)
+                    if llamadas is not None:
+                        llamadas.append([llamado, 1, suelto])
+                    minimo = 0
+                    operando = True
+                    continue
+                self.avanzar()
+                if construir:
+                    base = valores[-1]
+                    valores[-1] = Nodo("llamada", None, [base], base.linea, base.col)
+                if llamadas is not None and llamado is not None:
+                    if simbolos is not None:
+                        simbolos.llamada(llamado, 0)
+                    if suelto and semantica is not None:
+                        semantica.llamada(llamado, 0)
+                continue
+            if cod == K_COR_IZQ:
+                self.avanzar()
+                pila.append(C_SUBINDICE)
+                if construir:
+                    ops.append(None)
+                minimo = 0
+                operando = True
+                continue
+            if cod == K_PUNTO:
+                self.avanzar()
+                nombre = self.emparejar(K_ID, mostrar=["identificador"])
+                if construir:
+                    base = valores[-1]
+                    valores[-1] = Nodo("atributo", nombre.lexema, [base], base.linea, base.col)
+                continue
+            # potencia '**' (asociativa a la derecha); el lexer no produce '**'
+            # como un solo token, se conserva por fidelidad con la gramatica
+            if tok.lexema == "**":
+                self.avanzar()
+                if construir:
+                    self._reducir(valores, ops, PREC_POTENCIA + 1)
+                    ops.append((PREC_POTENCIA, tok, False))
+                minimo = PREC_FACTOR
+                operando = True
+                continue
+            p = binarios.get(cod)
+            if p is not None:
+                self.avanzar()
+                if construir:
+                    self._reducir(valores, ops, p)
+                    ops.append((p, tok, False))
+                minimo = p + 1
+                operando = True
+                continue
 
-    def potencia(self):
-        
-        self.atomo()
+            # termino la expresion interior: continuacion pendiente
+            if construir:
+                self._reducir(valores, ops, 0)
+                ops.pop()
+            while True:
+                c = pila.pop()
+                if c == C_FIN:
+                    return valores if construir else None
+                cod = self.act.cod
+                if c == C_PARENTESIS:
+                    self.emparejar(K_PAR_DER, mostrar=[")"])
+                elif c == C_LLAMADA:
+                    self.emparejar(K_PAR_DER, mostrar=[")"])
+                    if llamadas is not None:
+                        llamado, argumentos, suelto = llamadas.pop()
+                        if llamado is not None:
+                            if simbolos is not None:
+                                simbolos.llamada(llamado, argumentos)
+                            if suelto and semantica is not None:
+                                semantica.llamada(llamado, argumentos)
+                    if construir:
+                        inicio = marcas.pop()[0]
+                        argumentos = valores[inicio:]
+                        del valores[inicio:]
+                        base = valores[-1]
+                        valores[-1] = Nodo("llamada", None, [base] + argumentos, base.linea, base.col)
+                elif c == C_SUBINDICE:
+                    self.emparejar(K_COR_DER, mostrar=["]"])
+                    if construir:
+                        indice = valores.pop()
+                        base = valores[-1]
+                        valores[-1] = Nodo("subindice", None, [base, indice], base.linea, base.col)
+                elif c == C_LISTA:
+                    if cod == K_COMA:
+                        self.avanzar()
+                        if self.act.cod == K_COR_DER:
+                            self.avanzar()
+                        else:
+                            pila.append(C_LISTA)
+                            if construir:
+                                ops.append(None)
+                            operando = True
+                            break
+                    else:
+                        self.emparejar(K_COR_DER, mostrar=["]"])
+                    if construir:
+                        inicio, linea, col = marcas.pop()
+                        elementos = valores[inicio:]
+                        del valores[inicio:]
+                        valores.append(Nodo("lista", None, elementos, linea, col))
+                elif c == C_ARG_PRIMERO or c == C_ARG_SIG:
+                    if cod == K_FOR:
+                        # generador: tras el primer argumento no se revisa el cierre
+                        pila.append(C_COMP if c == C_ARG_PRIMERO else C_COMP_CIERRE)
+                        if construir:
+                            elemento = valores[-1]
+                            marcas.append((len(valores) - 1, elemento.linea, elemento.col))
+                        self._clausula_for(valores if construir else None)
+                        if construir:
+                            ops.append(None)
+                        operando = True
+                    else:
+                        if cod == K_COMA:
+                            self.avanzar()
+                            if self.act.cod != K_PAR_DER:
+                                pila.append(C_ARG_SIG)
+                                if construir:
+                                    ops.append(None)
+                                if llamadas is not None:
+                                    llamadas[-1][1] += 1
+                                operando = True
+                                break
+                        if self.act.cod not in CIERRE_ARGUMENTOS:
+                            self.reportar_error(self.act, esperados=[")", ","])
+                        # fin de la lista de argumentos
+                        continue
+                elif c == C_COMP or c == C_COMP_CIERRE:
+                    if cod == K_IF:
+                        self.avanzar()
+                        pila.append(c)
+                        operando = True
+                    elif cod == K_FOR:
+                        pila.append(c)
+                        self._clausula_for(valores if construir else None)
+                        operando = True
+                    else:
+                        if c == C_COMP_CIERRE and cod not in CIERRE_ARGUMENTOS:
+                            self.reportar_error(self.act, esperados=[")", ","])
+                        if construir:
+                            self._cerrar_generador(valores, marcas.pop())
+                        continue
+                    if construir:
+                        ops.append(None)
+                else:
+                    # C_LAMBDA: el cuerpo completa el operando
+                    if semantica is not None:
+                        semantica.cerrar()
+                    if construir:
+                        cuerpo = valores.pop()
+                        valores[-1].hijos.append(cuerpo)
+                break
+            minimo = 0
 
-        
-        while True:
-            if self.act.lexema == "(":
-                self.emparejar("(")
-                if self.act.lexema != ")":
-                    self.lista_argumentos()
-                self.emparejar(")", mostrar=[")"])
-            elif self.act.lexema == "[":
-                self.emparejar("[")
-                self.expresion()
-                self.emparejar("]", mostrar=["]"])
-            elif self.act.lexema == ".":
-                self.emparejar(".")
-                self.emparejar("id", mostrar=["identificador"])
+    @staticmethod
+    def _reducir(valores, ops, prec):
+        # aplica los operadores pendientes de precedencia >= prec de la expresion actual
+        while ops[-1] is not None and ops[-1][0] >= prec:
+            _, tok, prefijo = ops.pop()
+            derecha = valores.pop()
+            if prefijo:
+                valores.append(Nodo("unaria", tok.lexema, [derecha], tok.linea, tok.col))
             else:
-                break
+                izquierda = valores[-1]
+                valores[-1] = Nodo("binaria", tok.lexema, [izquierda, derecha], tok.linea, tok.col)
 
-        # 3) potencia '**' (asociativa a la derecha)
-        if self.act.lexema == "**":
-            self.emparejar("**")
-            self.factor()
+    def _clausula_for(self, valores):
+        # 'for' id 'in' (la expresion la sigue el motor); con construir_ast agrega
+        # a 'valores' el comp_for que recibira el iterable y las condiciones
+        tok = self.emparejar(K_FOR)
+        variable = self.emparejar(K_ID, mostrar=["identificador"])
+        if self.semantica is not None:
+            self.semantica.enlazar(variable)
+        self.emparejar(K_IN)
+        if valores is not None:
+            valores.append(Nodo("comp_for", variable.lexema, None, tok.linea, tok.col))
 
-    def atomo(self):
-        tok = self.act
-        if tok.tipo in {"id", "tk_entero", "tk_decimal", "tk_cadena"} or tok.lexema in {"True", "False", "None"}:
-            self.avanzar()
-            return
-        if tok.lexema == "(":
-            self.emparejar("(")
-            if self.act.lexema == ")":
-                self.emparejar(")")
-                return
-            self.expresion()
-            self.emparejar(")", mostrar=[")"])
-            return
-        if tok.lexema == "[":
-            self.emparejar("[")
-            if self.act.lexema != "]":
-                self.expresion()
-                while self.act.lexema == ",":
-                    self.emparejar(",")
-                    if self.act.lexema == "]":
-                        break
-                    self.expresion()
-            self.emparejar("]", mostrar=["]"])
-            return
-        if tok.lexema == "lambda":
-            self.expresion_lambda()
-            return
-        self.reportar_error(tok, esperados=["id", "num", "cadena", "(", "[", "lambda", "True", "False", "None"])
+    @staticmethod
+    def _cerrar_generador(valores, marca):
+        # valores[inicio:] = elemento, comp_for, iterable, condiciones..., comp_for, ...
+        inicio, linea, col = marca
+        partes = valores[inicio:]
+        del valores[inicio:]
+        generador = Nodo("generador", None, [partes[0]], linea, col)
+        for n in partes[1:]:
+            if n.tipo == "comp_for" and not n.hijos:
+                generador.hijos.append(n)
+            else:
+                generador.hijos[-1].hijos.append(n)
+        valores.append(generador)
 
-    def lista_argumentos(self):
-        # expr inicial
-        self.expresion()
+    def parametros_lambda(self):
+        semantica = self.semantica
+        tok = self.emparejar(K_ID, mostrar=["identificador"])
+        if semantica is not None:
+            semantica.parametro(tok)
+        nodos = [Nodo("parametro", tok.lexema, None, tok.linea, tok.col)] if self.construir else None
+        while self.act.cod == K_COMA:
+            self.emparejar(K_COMA)
+            nombre = self.emparejar(K_ID, mostrar=["identificador"])
+            if semantica is not None:
+                semantica.parametro(nombre)
+            if nodos is not None:
+                nodos.append(Nodo("parametro", nombre.lexema, None, nombre.linea, nombre.col))
+        if nodos is not None:
+            return Nodo("parametros", None, nodos, tok.linea, tok.col)
+        return None
 
-        # generador en argumento: expr 'for' id 'in' expr ('if' expr)* ( 'for' ... )*
-        if self.act.lexema == "for":
-            self.comp_for()
-            return
+    def imprimir_conjuntos_teoricos(self):
+        # los conjuntos viven en conjuntos.py; el texto se formatea una sola vez
+        self.destino.agregar(Diagnostico("conjuntos", mensaje=reporte_conjuntos()))
 
-        # lista clásica de argumentos
-        while self.act.lexema == ",":
-            self.emparejar(",")
-            if self.act.lexema == ")":
-                break
-            self.expresion()
-            if self.act.lexema == "for":
-                self.comp_for()
-                break
 
-        if self.act.lexema not in (")", ","):
-            self.reportar_error(self.act, esperados=[")", ","])
 
-    def comp_for(self):
-        # ('for' id 'in' expresion ('if' expresion)*)+
-        while True:
-            self.emparejar("for")
-            self.emparejar("id", mostrar=["identificador"])
-            self.emparejar("in")
-            self.expresion()
-            while self.act.lexema == "if":
-                self.emparejar("if")
-                self.expresion()
-            if self.act.lexema != "for":
-                break
+# -------------------- función de integración --------------------
+def clase_analizador(motor):
+    if motor == MOTOR_DESCENDENTE:
+        return AnalizadorSintactico
+    if motor == MOTOR_LL1:
+        from ll1 import AnalizadorLL1
 
-    def expresion_lambda(self):
-        self.emparejar("lambda")
-        if self.act.lexema != ":":
-            self.parametros_lambda()
-        self.emparejar(":", mostrar=[":"])
-        self.expresion()
+        return AnalizadorLL1
+    raise ValueError(f"motor desconocido: {motor!r} (opciones: {', '.join(MOTORES)})")
 
-    def parametros_lambda(self):
-        self.emparejar("id", mostrar=["identificador"])
-        while self.act.lexema == ",":
-            self.emparejar(",")
-            self.emparejar("id", mostrar=["identificador"])
 
-    
-    def imprimir_conjuntos_teoricos(self):
-        # Conjuntos FIRST y FOLLOW aproximados y coherentes con las funciones/decisiones del parser.
-        # Terminales representados por lexemas o por tipos de token cuando aplica.
-        FIRST = {
-            "programa": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                         "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                         "True", "False", "None", "+", "-"},
-            "sentencia": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                          "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                          "True", "False", "None", "+", "-"},
-            "sentencia_simple": {"pass", "break", "continue", "return", "print",
-                                 "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                                 "True", "False", "None", "+", "-"},
-            "sentencia_expresion": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                                    "True", "False", "None", "+", "-"},
-            "definicion_funcion": {"def"},
-            "sentencia_if": {"if"},
-            "sentencia_while": {"while"},
-            "sentencia_for": {"for"},
-            "bloque": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                       "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                       "True", "False", "None", "+", "-"},
-            "parametros": {"id"},
-            "parametro": {"id"},
-            "tipo_anotado": {"id", "["},
-            "lista_expresiones": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                                  "True", "False", "None", "+", "-"},
-            "expresion": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                          "True", "False", "None", "+", "-", "not"},
-            "comparacion": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                            "True", "False", "None", "+", "-"},
-            "expr_arit": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                          "True", "False", "None", "+", "-"},
-            "termino": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                        "True", "False", "None", "+", "-"},
-            "factor": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                       "True", "False", "None", "+", "-"},
-            "potencia": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                         "True", "False", "None"},
-            "atomo": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                      "True", "False", "None"},
-            "lista_argumentos": {"id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                                 "True", "False", "None", "+", "-", "not"},
-            "comp_for": {"for"},
-            "expresion_lambda": {"lambda"},
-            "parametros_lambda": {"id"},
-        }
-
-        # FOLLOW (aprox) útil para entender cierres y separadores
-        FOLLOW = {
-            "programa": {"EOF"},
-            "sentencia": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                          "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                          "True", "False", "None", "+", "-", "EOF"},
-            "sentencia_simple": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                                 "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[",
-                                 "lambda", "True", "False", "None", "+", "-", "EOF"},
-            "sentencia_expresion": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                                    "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[",
-                                    "lambda", "True", "False", "None", "+", "-", "EOF"},
-            "definicion_funcion": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                                   "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[",
-                                   "lambda", "True", "False", "None", "+", "-", "EOF"},
-            "sentencia_if": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                             "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[",
-                             "lambda", "True", "False", "None", "+", "-", "EOF"},
-            "sentencia_while": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                                "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[",
-                                "lambda", "True", "False", "None", "+", "-", "EOF"},
-            "sentencia_for": {"def", "if", "while", "for", "pass", "break", "continue", "return",
-                              "print", "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[",
-                              "lambda", "True", "False", "None", "+", "-", "EOF"},
-            "bloque": {"def", "if", "while", "for", "else", "elif", "EOF"},
-            "parametros": {")"},
-            "parametro": {")", ","},
-            "tipo_anotado": {")", ",", "]"},
-            "lista_expresiones": {")", ",", ":", "]"},
-            "expresion": {")", ",", ":", "]", "==", "!=", "<", ">", "<=", ">=", "in", "is",
-                          "+", "-", "*", "/", "%", "**"},
-            "potencia": {")", ",", ":", "]", "==", "!=", "<", ">", "<=", ">=", "in", "is",
-                         "+", "-", "*", "/", "%", "**"},
-            "atomo": {"(", "[", ".", ")", ",", ":", "]", "==", "!=", "<", ">", "<=", ">=",
-                      "in", "is", "+", "-", "*", "/", "%", "**"},
-            "lista_argumentos": {")"},
-            "comp_for": {")", ","},
-            "expresion_lambda": {")", ",", ":", "]"},
-            "parametros_lambda": {":", ","},
-        }
-
-        # Conjuntos de PREDICCIÓN por producción (los disparadores que usa tu parser)
-        PRED = {
-            "sentencia → definicion_funcion": {"def"},
-            "sentencia → sentencia_if": {"if"},
-            "sentencia → sentencia_while": {"while"},
-            "sentencia → sentencia_for": {"for"},
-            "sentencia → sentencia_simple": {"pass", "break", "continue", "return", "print",
-                                             "id", "tk_entero", "tk_decimal", "tk_cadena",
-                                             "(", "[", "lambda", "True", "False", "None", "+", "-"},
-            "sentencia_simple → 'return' expresion?": {"return"},
-            "sentencia_simple → 'print' '(' arglist? ')'": {"print"},
-            "sentencia_simple → 'pass'|'break'|'continue'": {"pass", "break", "continue"},
-            "sentencia_simple → sentencia_expresion": {"id", "tk_entero", "tk_decimal", "tk_cadena",
-                                                       "(", "[", "lambda", "True", "False", "None", "+", "-"},
-            "definicion_funcion → 'def' id '(' parametros? ')' ':' bloque": {"def"},
-            "sentencia_if → 'if' expresion ':' bloque ...": {"if"},
-            "sentencia_while → 'while' expresion ':' bloque": {"while"},
-            "sentencia_for → 'for' id 'in' expresion ':' bloque": {"for"},
-            "atomo → id|num|cadena|'('exp')'|'['lista']'|'lambda'": {"id", "tk_entero", "tk_decimal", "tk_cadena",
-                                                                     "(", "[", "lambda", "True", "False", "None"},
-            "lista_argumentos → expresion (',' expresion)* | expresion comp_for": {
-                "id", "tk_entero", "tk_decimal", "tk_cadena", "(", "[", "lambda",
-                "True", "False", "None", "+", "-", "not"
-            },
-            "comp_for → 'for' id 'in' expresion ('if' expresion)* ( 'for' ... )*": {"for"},
-        }
-
-        self._emitir("\nCONJUNTOS ")
-        self._emitir("PRIMEROS:")
-        for nt in sorted(FIRST.keys()):
-            self._emitir(f"  PRIMEROS({nt}) = {{{', '.join(sorted(FIRST[nt]))}}}")
-
-        self._emitir("\nSIGUIENTES:")
-        for nt in sorted(FOLLOW.keys()):
-            self._emitir(f"  SIGUIENTES({nt}) = {{{', '.join(sorted(FOLLOW[nt]))}}}")
-
-        self._emitir("\nPREDICCION")
-        for prod in sorted(PRED.keys()):
-            self._emitir(f"  PRED({prod}) = {{{', '.join(sorted(PRED[prod]))}}}")
-        
+def construir_arbol(texto, salida=None, modo_escaner="tabla"):
+    # arbol sintactico (arbol.Nodo 'programa') de 'texto', o None si hay errores;
+    # los mensajes de error van a 'salida' si se da
+    destino = destino_para(salida) if salida is not None else DestinoMemoria()
+    try:
+        sc = Scanner(texto, modo=modo_escaner)
+        sc.analizar()
+    except ErrorLexico as le:
+        destino.agregar(Diagnostico.desde_error_lexico(le))
+        destino.vaciar()
+        return None
+    p = AnalizadorSintactico(sc.tokens, salida=destino, construir_ast=True)
+    return p.arbol if p.analizar() else None
 
 
-# -------------------- función de integración --------------------
-def analizar_archivo(ruta_entrada, ruta_salida):
-    with open(ruta_entrada, "r", encoding="utf-8") as f:
-        texto = f.read()
+def analizar_texto(texto, salida, modo_escaner="tabla", en_flujo=False, compacto=False,
+                   mostrar_conjuntos=False, recuperar=False, max_errores=MAX_ERRORES, perfil=None,
+                   prevalidar=False, motor=MOTOR_DESCENDENTE, simbolos=None, semantica=False,
+                   construir_ast=False, al_terminar=None):
+    # deja el resultado del analisis de 'texto' en 'salida' (un destino de diagnosticos.py
+    # o un objeto con write) y lo vacia; devuelve True si no hubo errores.
+    # perfil: perfil.Perfilador o None. motor: ver MOTORES. simbolos: un
+    # simbolos.SimbolosArchivo que se llena durante el analisis (ver AnalizadorSintactico).
+    # semantica=True agrega los chequeos de semantica.py en la misma pasada.
+    # al_terminar(tokens, arbol) recibe los tokens de esta pasada y, con construir_ast, el
+    # arbol (None si hubo errores sintacticos), para no volver a escanear ni analizar; no
+    # se llama si hubo un error lexico
+    clase = clase_analizador(motor)
+    if en_flujo and motor != MOTOR_DESCENDENTE:
+        raise ValueError(f"el motor '{motor}' no analiza en flujo")
+    if en_flujo and al_terminar is not None:
+        raise ValueError("al_terminar necesita todos los tokens: no se puede analizar en flujo")
+    if construir_ast and motor != MOTOR_DESCENDENTE:
+        raise ValueError(f"el motor '{motor}' no construye el arbol")
+    if simbolos is not None and motor != MOTOR_DESCENDENTE:
+        raise ValueError(f"el motor '{motor}' no recolecta simbolos")
+    if semantica and motor != MOTOR_DESCENDENTE:
+        raise ValueError(f"el motor '{motor}' no hace chequeos semanticos")
+    destino = destino_para(salida)
+    if prevalidar and not en_flujo:
+        # un error lexico se informa sin crear tokens; si no hay ninguno, analizar en
+        # flujo da el mismo resultado y se detiene en el primer error sintactico sin
+        # escanear el resto (ver prevalidacion.py)
+        error = primer_error_lexico(texto)
+        if error is not None:
+            destino.agregar(Diagnostico.desde_error_lexico(error))
+            destino.vaciar()
+            return False
+        # el motor LL(1) y al_terminar necesitan todos los tokens: solo se evita el
+        # escaneo doble
+        en_flujo = motor == MOTOR_DESCENDENTE and al_terminar is None
+    if en_flujo:
+        # el parser consume los tokens mientras se escanean: se detiene en el
+        # primer error sin escanear el resto del archivo
+        sc = Scanner(texto, modo=modo_escaner)
+        if perfil is not None:
+            perfil.instrumentar_escaner(sc)
+        try:
+            p = AnalizadorSintactico(sc.iterar(), salida=destino, mostrar_conjuntos=mostrar_conjuntos,
+                                     recuperar=recuperar, max_errores=max_errores, simbolos=simbolos,
+                                     semantica=semantica, construir_ast=construir_ast)
+        except ErrorLexico as le:
+            destino.agregar(Diagnostico.desde_error_lexico(le))
+            destino.vaciar()
+            return False
+        if perfil is not None:
+            perfil.instrumentar_parser(p)
+        return p.analizar()
     try:
-        sc = Scanner(texto)
+        sc = Scanner(texto, modo=modo_escaner, compacto=compacto)
+        if perfil is not None:
+            perfil.instrumentar_escaner(sc)
         sc.analizar()
     except ErrorLexico as le:
-        with open(ruta_salida, "w", encoding="utf-8") as out:
-            out.write(str(le))
-        return
-    with open(ruta_salida, "w", encoding="utf-8") as out:
-        p = AnalizadorSintactico(sc.tokens, salida=out)
-        p.analizar()
+        destino.agregar(Diagnostico.desde_error_lexico(le))
+        destino.vaciar()
+        return False
+    opciones = {"construir_ast": True} if construir_ast else {}
+    p = clase(sc.tokens, salida=destino, mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+              max_errores=max_errores, simbolos=simbolos, semantica=semantica, **opciones)
+    if perfil is not None:
+        perfil.instrumentar_parser(p)
+    exito = p.analizar()
+    if al_terminar is not None:
+        al_terminar(sc.tokens, p.arbol if construir_ast and not p.errores else None)
+    return exito
+
+
+def analizar_archivo(ruta_entrada, ruta_salida, modo_escaner="tabla", en_flujo=False, compacto=False,
+                     mostrar_conjuntos=False, cache=None, fragmentado=False, recuperar=False,
+                     max_errores=MAX_ERRORES, perfil=None, destino=None, prevalidar=False,
+                     motor=MOTOR_DESCENDENTE, semantica=False, construir_ast=False, al_terminar=None):
+    # el resultado se escribe de una sola vez en ruta_salida, o en 'destino' si se da
+    # (ruta_salida puede ser None). fragmentado=True lee la entrada por fragmentos
+    # (ver analizar_por_fragmentos); con un perfil.Perfilador se mide tambien la E/S.
+    # prevalidar, construir_ast y al_terminar: ver analizar_texto (prevalidar no tiene
+    # efecto con fragmentado). Con al_terminar no se usa la cache: no guarda tokens ni arbol
+    if fragmentado and motor != MOTOR_DESCENDENTE:
+        raise ValueError(f"el motor '{motor}' no lee por fragmentos")
+    if fragmentado and al_terminar is not None:
+        raise ValueError("al_terminar necesita todos los tokens: no se puede leer por fragmentos")
+    if destino is None:
+        destino = DestinoArchivo(ruta_salida)
+    if perfil is not None:
+        perfil.instrumentar_destino(destino)
+    if cache is not None and al_terminar is None:
+        return analizar_con_cache(ruta_entrada, cache, destino, en_flujo=en_flujo,
+                                  mostrar_conjuntos=mostrar_conjuntos, fragmentado=fragmentado,
+                                  recuperar=recuperar, max_errores=max_errores, perfil=perfil,
+                                  prevalidar=prevalidar, motor=motor, semantica=semantica)
+    if fragmentado:
+        return analizar_por_fragmentos(ruta_entrada, destino, modo_escaner=modo_escaner, en_flujo=en_flujo,
+                                       mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+                                       max_errores=max_errores, perfil=perfil, semantica=semantica)
+    with open(ruta_entrada, "r", encoding="utf-8") as f:
+        texto = f.read() if perfil is None else perfil.entrada(f).read()
+    return analizar_texto(texto, destino, modo_escaner=modo_escaner, en_flujo=en_flujo, compacto=compacto,
+                          mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar, max_errores=max_errores,
+                          perfil=perfil, prevalidar=prevalidar, motor=motor, semantica=semantica,
+                          construir_ast=construir_ast, al_terminar=al_terminar)
+
+
+def _pasar(registros, destino):
+    for d in registros:
+        destino.agregar(d)
+    destino.vaciar()
+
+
+def analizar_por_fragmentos(ruta_entrada, salida, modo_escaner="tabla", en_flujo=False, mostrar_conjuntos=False,
+                            recuperar=False, max_errores=MAX_ERRORES, tam_fragmento=TAM_FRAGMENTO, perfil=None,
+                            semantica=False):
+    # como analizar_texto, sin cargar el archivo entero: el parser consume en flujo los
+    # tokens de ScannerFragmentado, asi que la memoria depende del tamaño del fragmento
+    # y no del archivo. Sin en_flujo el resultado es el mismo que el del modo normal:
+    # tras un error sintactico se termina de escanear (sin guardar tokens) porque un
+    # error lexico posterior tiene prioridad.
+    destino = destino_para(salida)
+    memoria = DestinoMemoria()
+    with open(ruta_entrada, "r", encoding="utf-8") as f:
+        sc = ScannerFragmentado(f if perfil is None else perfil.entrada(f), modo=modo_escaner,
+                                tam_fragmento=tam_fragmento)
+        if perfil is not None:
+            perfil.instrumentar_escaner(sc)
+        tokens = sc.iterar()
+        try:
+            p = AnalizadorSintactico(tokens, salida=memoria, mostrar_conjuntos=mostrar_conjuntos,
+                                     recuperar=recuperar, max_errores=max_errores, semantica=semantica)
+        except ErrorLexico as le:
+            _pasar([Diagnostico.desde_error_lexico(le)], destino)
+            return False
+        if perfil is not None:
+            perfil.instrumentar_parser(p)
+        exito = p.analizar()
+        if not exito and not en_flujo:
+            try:
+                for _ in tokens:
+                    pass
+            except ErrorLexico as le:
+                _pasar([Diagnostico.desde_error_lexico(le)], destino)
+                return False
+    _pasar(memoria.registros, destino)
+    return exito
+
+
+def analizar_con_cache(ruta_entrada, cache, salida, en_flujo=False, mostrar_conjuntos=False, fragmentado=False,
+                       recuperar=False, max_errores=MAX_ERRORES, perfil=None, prevalidar=False,
+                       motor=MOTOR_DESCENDENTE, semantica=False):
+    # como analizar_texto; si el contenido ya se analizo con la misma gramatica no se
+    # escanea ni se analiza de nuevo (ver cache.CacheResultados). La cache guarda los
+    # diagnosticos como registros, no el texto.
+    # el modo del escaner, el almacenamiento compacto, la lectura por fragmentos,
+    # la prevalidacion y el motor no cambian la salida
+    if (fragmentado or en_flujo) and motor != MOTOR_DESCENDENTE:
+        raise ValueError(f"el motor '{motor}' no analiza en flujo ni por fragmentos")
+    destino = destino_para(salida)
+    clave = cache.clave_archivo(ruta_entrada, en_flujo=en_flujo, mostrar_conjuntos=mostrar_conjuntos,
+                                recuperar=recuperar, max_errores=max_errores if recuperar else None,
+                                semantica=semantica)
+    guardado = cache.obtener(clave)
+    if guardado is not None:
+        exito, registros = guardado
+        _pasar([Diagnostico.desde_dict(d) for d in registros], destino)
+        return exito
+    memoria = DestinoMemoria()
+    if fragmentado:
+        exito = analizar_por_fragmentos(ruta_entrada, memoria, en_flujo=en_flujo,
+                                        mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+                                        max_errores=max_errores, perfil=perfil, semantica=semantica)
+    else:
+        with open(ruta_entrada, "r", encoding="utf-8") as f:
+            texto = f.read() if perfil is None else perfil.entrada(f).read()
+        exito = analizar_texto(texto, memoria, en_flujo=en_flujo, mostrar_conjuntos=mostrar_conjuntos,
+                               recuperar=recuperar, max_errores=max_errores, perfil=perfil,
+                               prevalidar=prevalidar, motor=motor, semantica=semantica)
+    cache.guardar(clave, exito, [d.a_dict() for d in memoria.registros])
+    _pasar(memoria.registros, destino)
+    return exito
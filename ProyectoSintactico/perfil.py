@@ -0,0 +1,182 @@
+import json
+import time
+from collections import Counter
+
+from lexer import ErrorLexico, OPERADORES, Scanner
+
+# Instrumentacion opcional del escaner, del parser y de la E/S de analizar_archivo.
+# Perfilador.instrumentar_* reemplaza metodos en la instancia (como hace recuperar=True
+# con sentencia), asi que un escaner o un parser sin instrumentar no paga nada.
+#
+# Cada funcion medida apila un marco; al salir se acumulan llamadas, tiempo total
+# (sin contar dos veces las llamadas recursivas) y tiempo propio, y el tiempo propio
+# se suma tambien a la pila completa de nombres para el formato de flame graph.
+
+# mismo orden que Scanner.automatas y que las alternativas del patron maestro:
+# un token reconocido por el automata k fue antes rechazado por los anteriores
+AUTOMATAS = ("AFDCadena", "AFDOperador", "AFDIdentificador", "AFDEntero")
+AUTOMATA_TIPO = dict.fromkeys(OPERADORES.values(), 1)
+AUTOMATA_TIPO.update({"tk_cadena": 0, "tk_entero": 3})
+
+REGLAS = (
+    "programa", "sentencia", "sentencia_simple", "sentencia_expresion", "bloque", "parametros",
+    "parametro", "tipo_anotado", "lista_expresiones", "expresion", "lista_argumentos",
+    "motor_expresiones", "parametros_lambda", "requerir_indentacion_si_necesaria",
+    "intentar_dedentar", "consumir_contexto_nueva_linea", "sincronizar",
+)
+ETAPAS = ("lectura", "escaner", "parser", "escritura")
+
+
+class _Medido:
+    # envoltorio de un archivo con read medido; el resto se delega
+    def __init__(self, archivo, **metodos):
+        self._archivo = archivo
+        self.__dict__.update(metodos)
+
+    def __getattr__(self, nombre):
+        return getattr(self._archivo, nombre)
+
+
+class Perfilador:
+    def __init__(self):
+        self.estadisticas = {}  # nombre -> [llamadas, segundos, segundos propios]
+        self.pilas = Counter()  # (nombre, ...) -> segundos propios
+        self.automatas = [[0, 0, 0] for _ in AUTOMATAS]  # intentos, aciertos, caracteres
+        self.modo_escaner = None
+        self._pila = []
+        self._activos = Counter()
+
+    # -------------------- medicion --------------------
+    def medir(self, nombre, funcion):
+        # devuelve 'funcion' envuelta: cada llamada se cuenta bajo 'nombre'
+        pila, activos, reloj = self._pila, self._activos, time.perf_counter
+
+        def medida(*args, **kwargs):
+            marco = [nombre, reloj(), 0.0]
+            pila.append(marco)
+            activos[nombre] += 1
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                total = reloj() - marco[1]
+                pila.pop()
+                activos[nombre] -= 1
+                self._acumular(nombre, total, total - marco[2])
+                if pila:
+                    pila[-1][2] += total
+
+        return medida
+
+    def _acumular(self, nombre, total, propio):
+        e = self.estadisticas.get(nombre)
+        if e is None:
+            e = self.estadisticas[nombre] = [0, 0.0, 0.0]
+        e[0] += 1
+        if not self._activos[nombre]:
+            e[1] += total
+        e[2] += propio
+        self.pilas[tuple(m[0] for m in self._pila) + (nombre,)] += propio
+
+    def entrada(self, archivo):
+        return _Medido(archivo, read=self.medir("lectura", archivo.read))
+
+    def instrumentar_destino(self, destino):
+        # destino de diagnosticos.py: se escribe al vaciarlo
+        destino.vaciar = self.medir("escritura", destino.vaciar)
+
+    # -------------------- instrumentacion --------------------
+    def instrumentar_escaner(self, sc):
+        # Scanner o ScannerFragmentado; los aciertos por automata se deducen del tipo
+        # de cada token, asi que valen para los dos modos. En modo 'afd' ademas se
+        # mide cada automata (en modo 'tabla' es una sola expresion regular).
+        self.modo_escaner = sc.modo
+        recorrer = sc._recorrer
+        automatas = self.automatas
+        fragmentado = not isinstance(sc, Scanner)
+
+        def recorrer_contando():
+            try:
+                for reg in recorrer():
+                    if fragmentado:
+                        tipo, n = reg.tipo, len(reg.lexema)
+                    else:
+                        tipo, n = reg[0], reg[2] - reg[1]
+                    k = AUTOMATA_TIPO.get(tipo, 2)
+                    for j in range(k):
+                        automatas[j][0] += 1
+                    c = automatas[k]
+                    c[0] += 1
+                    c[1] += 1
+                    c[2] += n
+                    yield reg
+            except ErrorLexico:
+                for c in automatas:
+                    c[0] += 1
+                raise
+
+        sc._recorrer = recorrer_contando
+        if not fragmentado:
+            sc.analizar = self.medir("escaner", sc.analizar)
+            if sc.modo == "afd":
+                # los automatas son compartidos: se miden copias propias de este escaner
+                sc.automatas = [type(afd)() for afd in sc.automatas]
+                for afd in sc.automatas:
+                    afd.aceptar = self.medir(type(afd).__name__, afd.aceptar)
+
+    def instrumentar_parser(self, p):
+        for nombre in REGLAS:
+            setattr(p, nombre, self.medir(nombre, getattr(p, nombre)))
+        # las sentencias compuestas se despachan por tabla, sin pasar por la instancia
+        p.SENTENCIAS_COMPUESTAS = {cod: self.medir(f.__name__, f)
+                                   for cod, f in type(p).SENTENCIAS_COMPUESTAS.items()}
+        p.analizar = self.medir("parser", p.analizar)
+
+    # -------------------- reportes --------------------
+    def _fila(self, nombre):
+        llamadas, total, propio = self.estadisticas.get(nombre, (0, 0.0, 0.0))
+        return {"llamadas": llamadas, "segundos": total, "segundos_propios": propio}
+
+    def reporte(self):
+        automatas = {}
+        for nombre, (intentos, aciertos, caracteres) in zip(AUTOMATAS, self.automatas):
+            automatas[nombre] = {"intentos": intentos, "aciertos": aciertos,
+                                 "tasa_aciertos": aciertos / intentos if intentos else 0.0,
+                                 "caracteres": caracteres}
+            if self.modo_escaner == "afd":
+                automatas[nombre]["segundos"] = self._fila(nombre)["segundos"]
+        reglas = {}
+        for nombre in sorted(self.estadisticas, key=lambda n: -self.estadisticas[n][1]):
+            if nombre not in ETAPAS and nombre not in AUTOMATAS:
+                reglas[nombre] = self._fila(nombre)
+        return {
+            "etapas": {nombre: self._fila(nombre) for nombre in ETAPAS if nombre in self.estadisticas},
+            "escaner": {"modo": self.modo_escaner, "automatas": automatas},
+            "parser": {"reglas": reglas},
+        }
+
+    def escribir_json(self, archivo):
+        json.dump(self.reporte(), archivo, indent=2, ensure_ascii=False)
+        archivo.write("\n")
+
+    def escribir_pilas(self, archivo):
+        # formato "plegado" (una pila por linea, separada por ';', y microsegundos),
+        # el que leen flamegraph.pl, inferno y speedscope
+        for pila, segundos in sorted(self.pilas.items()):
+            micro = round(segundos * 1e6)
+            if micro > 0:
+                archivo.write(f"{';'.join(pila)} {micro}\n")
+
+    def resumen(self, limite=10):
+        r = self.reporte()
+        lineas = []
+        for nombre, e in r["etapas"].items():
+            lineas.append(f"{nombre:<12} {e['segundos'] * 1000:>10.2f} ms")
+        lineas.append(f"{'automata':<18} {'intentos':>10} {'aciertos':>10} {'tasa':>7}")
+        for nombre, a in r["escaner"]["automatas"].items():
+            tiempo = f" {a['segundos'] * 1000:>10.2f} ms" if "segundos" in a else ""
+            lineas.append(f"{nombre:<18} {a['intentos']:>10} {a['aciertos']:>10} {a['tasa_aciertos']:>7.1%}{tiempo}")
+        lineas.append(f"{'regla':<34} {'llamadas':>10} {'total ms':>10} {'propio ms':>10}")
+        for nombre, e in list(r["parser"]["reglas"].items())[:limite]:
+            lineas.append(f"{nombre:<34} {e['llamadas']:>10} {e['segundos'] * 1000:>10.2f} "
+                          f"{e['segundos_propios'] * 1000:>10.2f}")
+        return "\n".join(lineas)
@@ -0,0 +1,34 @@
+import re
+
+from lexer import ErrorLexico, Scanner
+
+# Prevalidacion rapida, sin construir tokens: todo el trabajo lo hace una expresion regular.
+#
+# primer_error_lexico da el mismo ErrorLexico (misma posicion) que Scanner.analizar,
+# o None. Basta con reconocer tramos de caracteres que siempre forman tokens validos,
+# cadenas cerradas, comentarios y '!='; lo primero que no encaja es un error salvo
+# un digito unicode (el escaner lo acepta como entero).
+#
+# Los corchetes no se revisan aqui: la posicion de un desequilibrio la decide el parser
+# segun lo que sigue, y el analisis en flujo que viene despues se detiene en el primer
+# error sintactico.
+
+PATRON_VALIDO = re.compile(
+    r"(?:[\sA-Za-z0-9_=<>\-:,.(){}\[\]+*/%]+"
+    r"|!="
+    r"|#[^\n]*"
+    r"|\"[^\"\\]*(?:\\.[^\"\\]*)*\""
+    r"|'[^'\\]*(?:\\.[^'\\]*)*')*",
+    re.S,
+)
+
+
+def primer_error_lexico(texto):
+    n = len(texto)
+    pos = PATRON_VALIDO.match(texto).end()
+    while pos < n and texto[pos].isdigit():
+        pos = PATRON_VALIDO.match(texto, pos + 1).end()
+    if pos >= n:
+        return None
+    linea, col = Scanner._posicion(texto, 1, 1, 0, pos, "\t" in texto)
+    return ErrorLexico(linea, col)
@@ -0,0 +1,145 @@
+import builtins
+
+from diagnosticos import Diagnostico
+
+# Chequeos semanticos en la misma pasada del parser (AnalizadorSintactico(semantica=True)):
+# nombres no definidos y llamadas a una funcion conocida con otra cantidad de argumentos.
+#
+# Hay un ambito por modulo, por def y por lambda. Un 'for' (sentencia o clausula de un
+# generador) enlaza su variable en el ambito donde esta, como en Python, asi que la
+# variable sigue visible despues del ciclo. Como en Python, un nombre enlazado en
+# cualquier parte de una funcion es local a toda la funcion y lo que no es local se
+# busca en los ambitos que la contienen cuando estos terminan: una funcion puede usar un
+# nombre o llamar a otra funcion definidos mas abajo. En el modulo tampoco importa el
+# orden. Solo se informa lo que no esta enlazado en ningun ambito de la cadena ni es un
+# nombre predefinido de Python.
+#
+# Un uso ya enlazado en su ambito se resuelve en el momento y no se guarda; solo quedan
+# pendientes los que todavia no se pueden resolver, que suben al ambito padre al cerrar.
+# Las llamadas se revisan recien cuando su ambito cierra (las del modulo, en terminar),
+# porque la aridad de un nombre cambia si mas adelante se vuelve a enlazar: con
+# 'def f(a)' y despues 'f = g', f(1, 2) no es un error, en cualquier orden.
+
+NOMBRES_PREDEFINIDOS = frozenset(dir(builtins))
+# aridad de un nombre enlazado por algo que no es un def, o por varios def con
+# distinta cantidad de parametros: sus llamadas no se revisan
+SIN_ARIDAD = -1
+
+
+class Ambito:
+    __slots__ = ("padre", "nombres", "usos", "llamadas", "destinos", "parametros")
+
+    def __init__(self, padre):
+        self.padre = padre
+        self.nombres = {}     # nombre -> aridad (cantidad de parametros del def) o SIN_ARIDAD
+        self.usos = []        # tokens de nombres sin resolver (None: resulto ser un destino)
+        self.llamadas = []    # (token del nombre llamado, argumentos) sin revisar
+        self.destinos = []    # indices en usos de los posibles destinos de una asignacion
+        self.parametros = 0
+
+
+class AnalisisSemantico:
+    def __init__(self):
+        self.ambito = Ambito(None)
+        self.errores = []
+
+    # -------------------- enlaces --------------------
+    def enlazar(self, tok, aridad=SIN_ARIDAD):
+        nombres = self.ambito.nombres
+        actual = nombres.get(tok.lexema)
+        nombres[tok.lexema] = aridad if actual is None or actual == aridad else SIN_ARIDAD
+
+    def parametro(self, tok):
+        self.enlazar(tok)
+        self.ambito.parametros += 1
+
+    def funcion(self, tok):
+        # el nombre de un def, despues de sus parametros: se enlaza en el ambito que contiene
+        # al de la funcion (que ya esta abierto)
+        ambito = self.ambito
+        self.ambito = ambito.padre
+        self.enlazar(tok, ambito.parametros)
+        self.ambito = ambito
+
+    def abrir(self):
+        self.ambito = Ambito(self.ambito)
+
+    def cerrar(self):
+        ambito = self.ambito
+        if ambito.padre is None:
+            # solo tras un error sintactico; el resultado no se usa
+            return
+        self.ambito = padre = ambito.padre
+        nombres = ambito.nombres
+        for tok in ambito.usos:
+            if tok is not None and tok.lexema not in nombres:
+                self._pendiente(padre, tok)
+        for tok, argumentos in ambito.llamadas:
+            aridad = nombres.get(tok.lexema)
+            if aridad is None:
+                padre.llamadas.append((tok, argumentos))
+            else:
+                self._revisar(tok, argumentos, aridad)
+
+    # -------------------- usos --------------------
+    def uso(self, tok, destino_posible):
+        # el parser solo llama con nombres que no estan enlazados en el ambito actual o
+        # que pueden ser el destino de una asignacion
+        ambito = self.ambito
+        if destino_posible:
+            ambito.destinos.append(len(ambito.usos))
+        ambito.usos.append(tok)
+
+    def asignar(self, marca):
+        # llego un '=': los destinos posibles guardados desde 'marca' (la cantidad de usos
+        # antes de la lista de expresiones) son nombres enlazados; los anteriores eran de
+        # sentencias que no fueron asignaciones
+        ambito = self.ambito
+        usos = ambito.usos
+        for k in ambito.destinos:
+            if k >= marca:
+                tok = usos[k]
+                usos[k] = None
+                self.enlazar(tok)
+        ambito.destinos.clear()
+
+    def llamada(self, tok, argumentos):
+        # SIN_ARIDAD ya no cambia: esas llamadas no hace falta guardarlas
+        if self.ambito.nombres.get(tok.lexema) != SIN_ARIDAD:
+            self.ambito.llamadas.append((tok, argumentos))
+
+    @staticmethod
+    def _pendiente(ambito, tok):
+        if tok.lexema not in ambito.nombres:
+            ambito.usos.append(tok)
+
+    def _revisar(self, tok, argumentos, aridad):
+        if aridad != SIN_ARIDAD and argumentos != aridad:
+            self.errores.append(Diagnostico(
+                "semantico", tok.linea, tok.col, tok.lexema,
+                mensaje=f"la funcion \"{tok.lexema}\" recibe {aridad} {'argumento' if aridad == 1 else 'argumentos'} "
+                        f"y se llamo con {argumentos}"))
+
+    # -------------------- fin del modulo --------------------
+    def terminar(self):
+        # diagnosticos en orden de posicion; solo tiene sentido si no hubo errores sintacticos
+        ambito = self.ambito
+        while ambito.padre is not None:
+            # no deberia pasar sin errores sintacticos
+            self.cerrar()
+            ambito = self.ambito
+        nombres = ambito.nombres
+        for tok in ambito.usos:
+            if tok is not None and tok.lexema not in nombres and tok.lexema not in NOMBRES_PREDEFINIDOS:
+                self.errores.append(Diagnostico(
+                    "semantico", tok.linea, tok.col, tok.lexema,
+                    mensaje=f"el nombre \"{tok.lexema}\" no esta definido"))
+        ambito.usos.clear()
+        # las llamadas a nombres predefinidos o no definidos (ya informados) no se revisan
+        for tok, argumentos in ambito.llamadas:
+            aridad = nombres.get(tok.lexema)
+            if aridad is not None:
+                self._revisar(tok, argumentos, aridad)
+        ambito.llamadas.clear()
+        self.errores.sort(key=lambda d: (d.linea, d.col))
+        return self.errores
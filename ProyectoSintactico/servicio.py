@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from diagnosticos import Diagnostico, DestinoMemoria, formatear
+from lexer import ErrorLexico, Scanner
+from parser import MAX_ERRORES, AnalizadorSintactico, analizar_texto
+
+# API en proceso para servicios que reciben el codigo en memoria (p.ej. un corrector web):
+# texto o bytes de entrada, Resultado estructurado de salida, sin archivos temporales.
+# analizar_fuente no comparte estado mutable (cada llamada crea su escaner, su parser y su
+# destino; las tablas de modulo son de solo lectura), asi que se puede llamar desde
+# varios hilos a la vez. ServicioAsincrono es el frente para asyncio.
+
+
+class Resultado:
+    __slots__ = ("exito", "diagnosticos", "arbol", "segundos")
+
+    def __init__(self, exito, diagnosticos, arbol=None, segundos=0.0):
+        self.exito = exito
+        self.diagnosticos = tuple(diagnosticos)
+        self.arbol = arbol  # solo con construir_ast=True y sin errores
+        self.segundos = segundos
+
+    def __repr__(self):
+        return f"Resultado({self.exito},{len(self.diagnosticos)} diagnosticos,{self.segundos:.4f}s)"
+
+    def texto(self):
+        # el mismo texto que analizar_texto/analizar_archivo
+        return formatear(self.diagnosticos)
+
+    def errores(self):
+        return [d for d in self.diagnosticos if d.tipo in ("sintactico", "indentacion", "lexico", "semantico")]
+
+    def a_dict(self):
+        return {"exito": self.exito, "diagnosticos": [d.a_dict() for d in self.diagnosticos],
+                "segundos": self.segundos}
+
+
+def analizar_fuente(fuente, modo_escaner="tabla", en_flujo=False, mostrar_conjuntos=False, recuperar=False,
+                    max_errores=MAX_ERRORES, construir_ast=False, prevalidar=False):
+    # fuente: str o bytes (UTF-8). Nunca lanza por errores de la entrada: los informa
+    # como diagnosticos de tipo "entrada"
+    t0 = time.perf_counter()
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        try:
+            texto = bytes(fuente).decode("utf-8")
+        except UnicodeDecodeError as e:
+            aviso = Diagnostico("entrada", mensaje=f">>> La entrada no es UTF-8 valido: {e}")
+            return Resultado(False, [aviso], segundos=time.perf_counter() - t0)
+    else:
+        texto = fuente
+    destino = DestinoMemoria()
+    arbol = None
+    try:
+        if construir_ast:
+            exito, arbol = _analizar_con_arbol(texto, destino, modo_escaner, mostrar_conjuntos,
+                                               recuperar, max_errores)
+        else:
+            exito = analizar_texto(texto, destino, modo_escaner=modo_escaner, en_flujo=en_flujo,
+                                   mostrar_conjuntos=mostrar_conjuntos, recuperar=recuperar,
+                                   max_errores=max_errores, prevalidar=prevalidar)
+    except RecursionError:
+        destino = DestinoMemoria()
+        destino.agregar(Diagnostico("entrada", mensaje=">>> Anidamiento demasiado profundo"))
+        exito = False
+    return Resultado(exito, destino.registros, arbol, time.perf_counter() - t0)
+
+
+def _analizar_con_arbol(texto, destino, modo_escaner, mostrar_conjuntos, recuperar, max_errores):
+    try:
+        sc = Scanner(texto, modo=modo_escaner)
+        sc.analizar()
+    except ErrorLexico as le:
+        destino.agregar(Diagnostico.desde_error_lexico(le))
+        return False, None
+    p = AnalizadorSintactico(sc.tokens, salida=destino, mostrar_conjuntos=mostrar_conjuntos,
+                             recuperar=recuperar, max_errores=max_errores, construir_ast=True)
+    exito = p.analizar()
+    return exito, p.arbol if exito else None
+
+
+class ServicioOcupado(Exception):
+    pass
+
+
+class ServicioAsincrono:
+    # Frente asyncio: el analisis corre en un ejecutor acotado y no bloquea el bucle.
+    # Con hilos no hay paralelismo real (GIL) pero el bucle sigue atendiendo; con
+    # procesos=True se usan varios nucleos. Contrapresion: a lo sumo max_pendientes
+    # analisis en curso o en cola. analizar() espera un lugar; intentar() lanza
+    # ServicioOcupado si no lo hay (p.ej. para responder 503). El lugar se libera
+    # cuando termina el trabajo, aunque quien lo pidio haya sido cancelado.
+    def __init__(self, trabajadores=None, max_pendientes=None, procesos=False, **opciones):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes or 4 * self.trabajadores
+        self.opciones = opciones  # por defecto para analizar_fuente
+        clase = ProcessPoolExecutor if procesos else ThreadPoolExecutor
+        self.ejecutor = clase(max_workers=self.trabajadores)
+        self._lugares = asyncio.Semaphore(self.max_pendientes)
+        self.pendientes = 0
+
+    async def analizar(self, fuente, **opciones):
+        await self._lugares.acquire()
+        self.pendientes += 1
+        return await self._ejecutar(fuente, opciones)
+
+    async def intentar(self, fuente, **opciones):
+        if self._lugares.locked():
+            raise ServicioOcupado(f"hay {self.max_pendientes} analisis pendientes")
+        return await self.analizar(fuente, **opciones)
+
+    async def _ejecutar(self, fuente, opciones):
+        try:
+            trabajo = partial(analizar_fuente, fuente, **{**self.opciones, **opciones})
+            futuro = asyncio.get_running_loop().run_in_executor(self.ejecutor, trabajo)
+        except BaseException:
+            self._liberar()
+            raise
+        futuro.add_done_callback(self._liberar)
+        return await asyncio.shield(futuro)
+
+    def _liberar(self, _=None):
+        self.pendientes -= 1
+        self._lugares.release()
+
+    def cerrar(self):
+        self.ejecutor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.cerrar)
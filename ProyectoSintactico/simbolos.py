@@ -0,0 +1,398 @@
+import argparse
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+from binario import ORDEN_BYTES, LectorColumnas, TablaCadenas, escribir_columnas
+from diagnosticos import DestinoMemoria
+from parser import MAX_ERRORES, analizar_texto
+
+# Indice de simbolos de un proyecto: definiciones de funciones (con sus parametros y
+# anotaciones) y llamadas a un nombre, con posiciones. Lo llena el parser mientras
+# analiza (AnalizadorSintactico(simbolos=SimbolosArchivo())), sin otra pasada.
+#
+# En disco es un directorio:
+#   segmentos/<sha1 de la ruta>.psim   los simbolos de un archivo
+#   catalogo.psix                      rutas, huellas del contenido y, por cada nombre,
+#                                      los archivos que lo definen o lo llaman
+# Ambos formatos son los de binario.py, como instantanea.py: cabecera, tablas de cadenas
+# y columnas de enteros en el orden de bytes de la maquina.
+# Los nombres del catalogo estan ordenados (por sus bytes utf-8) y se buscan por
+# biseccion sin decodificar el resto. Reindexar un archivo reescribe su segmento y el
+# catalogo (guardar()), nunca los segmentos de los demas.
+
+MAGICO_SEGMENTO = b"PSIM"
+MAGICO_CATALOGO = b"PSIX"
+# cambiar a mano si cambia lo que el parser informa o el formato
+VERSION_INDICE = 1
+# magico, version, orden de bytes, huella del fuente, cadenas, bytes de cadenas, enteros
+CABECERA_SEGMENTO = struct.Struct("<4sHBx16sQQQ")
+# magico, version, orden de bytes, archivos, bytes de rutas, nombres, bytes de nombres, entradas
+CABECERA_CATALOGO = struct.Struct("<4sHBxQQQQQ")
+TAM_HUELLA = 16
+SIN_TIPO = -1
+
+
+def huella_contenido(datos):
+    return hashlib.blake2b(datos, digest_size=TAM_HUELLA).digest()
+
+
+# -------------------- recoleccion durante el analisis --------------------
+class SimbolosArchivo:
+    # lo que el parser informa de un archivo. Definiciones: [nombre, linea, col, parametros]
+    # con parametros [nombre, tipo o None, es_lista, linea, col]; llamadas:
+    # (nombre, linea, col, argumentos). Listas y tuplas simples, asi viajan en los
+    # resultados del modo lote (JSON o pickle) sin convertir.
+    __slots__ = ("definiciones", "llamadas")
+
+    def __init__(self, definiciones=None, llamadas=None):
+        self.definiciones = definiciones if definiciones is not None else []
+        self.llamadas = llamadas if llamadas is not None else []
+
+    def definicion(self, tok):
+        self.definiciones.append([tok.lexema, tok.linea, tok.col, []])
+
+    def parametro(self, tok):
+        self.definiciones[-1][3].append([tok.lexema, None, False, tok.linea, tok.col])
+
+    def anotacion(self, tok, es_lista):
+        parametro = self.definiciones[-1][3][-1]
+        parametro[1] = tok.lexema
+        parametro[2] = es_lista
+
+    def llamada(self, tok, argumentos):
+        self.llamadas.append((tok.lexema, tok.linea, tok.col, argumentos))
+
+    def nombres(self):
+        return {d[0] for d in self.definiciones} | {ll[0] for ll in self.llamadas}
+
+    def a_dict(self):
+        return {"definiciones": self.definiciones, "llamadas": self.llamadas}
+
+    @classmethod
+    def desde_dict(cls, d):
+        return cls(d["definiciones"], d["llamadas"])
+
+
+# opciones del analisis que llena el indice, sea desde simbolos.py --indexar o desde
+# main.py --lote --indice: con recuperacion se indexa tambien lo que sigue a un error
+# sintactico, y un mismo archivo da siempre el mismo contenido
+OPCIONES_INDICE = {"recuperar": True, "max_errores": MAX_ERRORES}
+
+
+def simbolos_de_texto(texto):
+    # (exito, SimbolosArchivo). Con un error lexico no hay tokens y no hay simbolos.
+    simbolos = SimbolosArchivo()
+    exito = analizar_texto(texto, DestinoMemoria(), simbolos=simbolos, **OPCIONES_INDICE)
+    return exito, simbolos
+
+
+# -------------------- resultados de una busqueda --------------------
+class Definicion:
+    __slots__ = ("ruta", "nombre", "linea", "col", "parametros")
+
+    def __init__(self, ruta, nombre, linea, col, parametros):
+        self.ruta = ruta
+        self.nombre = nombre
+        self.linea = linea
+        self.col = col
+        self.parametros = parametros  # [(nombre, tipo o None, es_lista, linea, col)]
+
+    def firma(self):
+        partes = []
+        for nombre, tipo, es_lista, _, _ in self.parametros:
+            if tipo is None:
+                partes.append(nombre)
+            else:
+                partes.append(f"{nombre}: [{tipo}]" if es_lista else f"{nombre}: {tipo}")
+        return f"{self.nombre}({', '.join(partes)})"
+
+    def __repr__(self):
+        return f"Definicion({self.firma()} en {self.ruta}:{self.linea}:{self.col})"
+
+
+class Llamada:
+    __slots__ = ("ruta", "nombre", "linea", "col", "argumentos")
+
+    def __init__(self, ruta, nombre, linea, col, argumentos):
+        self.ruta = ruta
+        self.nombre = nombre
+        self.linea = linea
+        self.col = col
+        self.argumentos = argumentos
+
+    def __repr__(self):
+        return f"Llamada({self.nombre}, {self.argumentos} argumentos en {self.ruta}:{self.linea}:{self.col})"
+
+
+# -------------------- formato binario --------------------
+def _leer_cabecera(datos, cabecera, magico, ruta):
+    if len(datos) < cabecera.size:
+        raise ValueError(f"indice invalido: {ruta}")
+    campos = cabecera.unpack_from(datos)
+    # de otra version o escrito con el otro orden de bytes: no se usa
+    if campos[0] != magico or campos[1] != VERSION_INDICE or campos[2] != ORDEN_BYTES:
+        raise ValueError(f"indice de otra version o invalido: {ruta}")
+    return campos[3:]
+
+
+def guardar_segmento(ruta, huella, simbolos):
+    # enteros: definiciones, llamadas, y por definicion nombre, linea, col, parametros
+    # (cada uno nombre, tipo, es_lista, linea, col); por llamada nombre, linea, col, argumentos
+    cadenas = TablaCadenas()
+    enteros = array("i", [len(simbolos.definiciones), len(simbolos.llamadas)])
+    for nombre, linea, col, parametros in simbolos.definiciones:
+        enteros.extend((cadenas.indice(nombre), linea, col, len(parametros)))
+        for p_nombre, tipo, es_lista, p_linea, p_col in parametros:
+            enteros.extend((cadenas.indice(p_nombre), SIN_TIPO if tipo is None else cadenas.indice(tipo),
+                            int(es_lista), p_linea, p_col))
+    for nombre, linea, col, argumentos in simbolos.llamadas:
+        enteros.extend((cadenas.indice(nombre), linea, col, argumentos))
+    cabecera = CABECERA_SEGMENTO.pack(MAGICO_SEGMENTO, VERSION_INDICE, ORDEN_BYTES, huella,
+                                      len(cadenas.indices), len(cadenas.datos), len(enteros))
+    escribir_columnas(ruta, cabecera, [cadenas.desplazamientos, cadenas.datos, enteros])
+
+
+def leer_segmento(ruta):
+    # (huella, SimbolosArchivo)
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    huella, n_cadenas, n_bytes, n_enteros = _leer_cabecera(datos, CABECERA_SEGMENTO, MAGICO_SEGMENTO, ruta)
+    lector = LectorColumnas(memoryview(datos), CABECERA_SEGMENTO.size, f"indice truncado: {ruta}")
+    d = lector.columna("q", n_cadenas + 1)
+    texto = lector.columna("B", n_bytes)
+    cadenas = [str(texto[d[k]:d[k + 1]], "utf-8") for k in range(n_cadenas)]
+    enteros = lector.columna("i", n_enteros).tolist()
+    n_definiciones, n_llamadas = enteros[0], enteros[1]
+    k = 2
+    definiciones = []
+    for _ in range(n_definiciones):
+        nombre, linea, col, n_parametros = enteros[k:k + 4]
+        k += 4
+        parametros = []
+        for _ in range(n_parametros):
+            p_nombre, tipo, es_lista, p_linea, p_col = enteros[k:k + 5]
+            k += 5
+            parametros.append([cadenas[p_nombre], None if tipo == SIN_TIPO else cadenas[tipo],
+                               bool(es_lista), p_linea, p_col])
+        definiciones.append([cadenas[nombre], linea, col, parametros])
+    llamadas = []
+    for _ in range(n_llamadas):
+        nombre, linea, col, argumentos = enteros[k:k + 4]
+        k += 4
+        llamadas.append((cadenas[nombre], linea, col, argumentos))
+    return huella, SimbolosArchivo(definiciones, llamadas)
+
+
+# -------------------- indice --------------------
+class IndiceSimbolos:
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.dir_segmentos = os.path.join(directorio, "segmentos")
+        self.ruta_catalogo = os.path.join(directorio, "catalogo.psix")
+        os.makedirs(self.dir_segmentos, exist_ok=True)
+        self.huellas = {}        # ruta absoluta -> huella del contenido indexado
+        self._rutas = []         # rutas del catalogo en disco, por numero
+        self._nombres = None     # (desplazamientos, bytes) de los nombres ordenados
+        self._entradas = None    # (desplazamientos, numeros de ruta) por nombre
+        self._archivos_de = None  # nombre -> set de rutas; solo despues de un cambio
+        self.modificado = False
+        self._leer_catalogo()
+
+    def _leer_catalogo(self):
+        try:
+            with open(self.ruta_catalogo, "rb") as f:
+                datos = f.read()
+            n_rutas, n_bytes_rutas, n_nombres, n_bytes_nombres, n_entradas = _leer_cabecera(
+                datos, CABECERA_CATALOGO, MAGICO_CATALOGO, self.ruta_catalogo)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            # catalogo de otra version: se empieza de nuevo, como la cache con otra huella
+            return
+        lector = LectorColumnas(memoryview(datos), CABECERA_CATALOGO.size,
+                                f"indice truncado: {self.ruta_catalogo}")
+        d = lector.columna("q", n_rutas + 1)
+        texto = lector.columna("B", n_bytes_rutas)
+        huellas = lector.columna("B", n_rutas * TAM_HUELLA)
+        self._rutas = [str(texto[d[k]:d[k + 1]], "utf-8") for k in range(n_rutas)]
+        self.huellas = {ruta: bytes(huellas[k * TAM_HUELLA:(k + 1) * TAM_HUELLA])
+                        for k, ruta in enumerate(self._rutas)}
+        self._nombres = (lector.columna("q", n_nombres + 1), lector.columna("B", n_bytes_nombres))
+        self._entradas = (lector.columna("q", n_nombres + 1), lector.columna("I", n_entradas))
+
+    def ruta_segmento(self, ruta):
+        clave = hashlib.sha1(os.path.abspath(ruta).encode("utf-8")).hexdigest()
+        return os.path.join(self.dir_segmentos, clave + ".psim")
+
+    # -------------------- busqueda --------------------
+    def archivos_con(self, nombre):
+        # rutas que definen o llaman a 'nombre'
+        if self._archivos_de is not None:
+            return sorted(self._archivos_de.get(nombre, ()))
+        if self._nombres is None:
+            return []
+        desplazamientos, texto = self._nombres
+        buscado = nombre.encode("utf-8")
+        ini, fin = 0, len(desplazamientos) - 1
+        while ini < fin:
+            medio = (ini + fin) // 2
+            if bytes(texto[desplazamientos[medio]:desplazamientos[medio + 1]]) < buscado:
+                ini = medio + 1
+            else:
+                fin = medio
+        if ini == len(desplazamientos) - 1 or \
+                bytes(texto[desplazamientos[ini]:desplazamientos[ini + 1]]) != buscado:
+            return []
+        posiciones, numeros = self._entradas
+        return [self._rutas[k] for k in numeros[posiciones[ini]:posiciones[ini + 1]]]
+
+    def buscar(self, nombre):
+        # (definiciones, llamadas) de 'nombre' en todo el proyecto, por archivo y posicion
+        definiciones, llamadas = [], []
+        for ruta in self.archivos_con(nombre):
+            try:
+                _, simbolos = leer_segmento(self.ruta_segmento(ruta))
+            except (OSError, ValueError):
+                continue
+            definiciones.extend(Definicion(ruta, n, linea, col, [tuple(p) for p in parametros])
+                                for n, linea, col, parametros in simbolos.definiciones if n == nombre)
+            llamadas.extend(Llamada(ruta, n, linea, col, argumentos)
+                            for n, linea, col, argumentos in simbolos.llamadas if n == nombre)
+        return definiciones, llamadas
+
+    # -------------------- actualizacion por archivo --------------------
+    def vigente(self, ruta, huella):
+        return self.huellas.get(os.path.abspath(ruta)) == huella
+
+    def actualizar(self, ruta, huella, simbolos):
+        # reemplaza los simbolos de 'ruta'; no hace nada si el contenido es el mismo
+        ruta = os.path.abspath(ruta)
+        if self.huellas.get(ruta) == huella:
+            return False
+        self._quitar(ruta)
+        guardar_segmento(self.ruta_segmento(ruta), huella, simbolos)
+        for nombre in simbolos.nombres():
+            self._archivos_de.setdefault(nombre, set()).add(ruta)
+        self.huellas[ruta] = huella
+        return True
+
+    def eliminar(self, ruta):
+        ruta = os.path.abspath(ruta)
+        if ruta not in self.huellas:
+            return False
+        self._quitar(ruta)
+        del self.huellas[ruta]
+        try:
+            os.remove(self.ruta_segmento(ruta))
+        except OSError:
+            pass
+        return True
+
+    def podar(self):
+        # saca del indice los archivos que ya no existen; devuelve cuantos
+        borrados = [ruta for ruta in self.huellas if not os.path.exists(ruta)]
+        for ruta in borrados:
+            self.eliminar(ruta)
+        return len(borrados)
+
+    def indexar_archivo(self, ruta):
+        # lee, analiza e indexa 'ruta' si cambio desde la ultima vez; devuelve si lo indexo
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        huella = huella_contenido(datos)
+        if self.vigente(ruta, huella):
+            return False
+        _, simbolos = simbolos_de_texto(datos.decode("utf-8"))
+        return self.actualizar(ruta, huella, simbolos)
+
+    def _quitar(self, ruta):
+        self._editar()
+        self.modificado = True
+        if ruta not in self.huellas:
+            return
+        try:
+            _, viejos = leer_segmento(self.ruta_segmento(ruta))
+            nombres = viejos.nombres()
+        except (OSError, ValueError):
+            nombres = list(self._archivos_de)
+        for nombre in nombres:
+            rutas = self._archivos_de.get(nombre)
+            if rutas is not None:
+                rutas.discard(ruta)
+                if not rutas:
+                    del self._archivos_de[nombre]
+
+    def _editar(self):
+        # el primer cambio decodifica el catalogo entero a un dict nombre -> rutas
+        if self._archivos_de is not None:
+            return
+        self._archivos_de = {}
+        if self._nombres is None:
+            return
+        desplazamientos, texto = self._nombres
+        posiciones, numeros = self._entradas
+        for k in range(len(desplazamientos) - 1):
+            nombre = str(texto[desplazamientos[k]:desplazamientos[k + 1]], "utf-8")
+            self._archivos_de[nombre] = {self._rutas[n] for n in numeros[posiciones[k]:posiciones[k + 1]]}
+
+    def guardar(self):
+        # escribe el catalogo si hubo cambios
+        if not self.modificado:
+            return
+        rutas = sorted(self.huellas)
+        numero = {ruta: k for k, ruta in enumerate(rutas)}
+        tabla_rutas = TablaCadenas(rutas)
+        huellas = b"".join(self.huellas[ruta] for ruta in rutas)
+        nombres = sorted(self._archivos_de, key=lambda n: n.encode("utf-8"))
+        tabla_nombres = TablaCadenas(nombres)
+        posiciones, numeros = array("q", [0]), array("I")
+        for nombre in nombres:
+            numeros.extend(sorted(numero[r] for r in self._archivos_de[nombre]))
+            posiciones.append(len(numeros))
+        cabecera = CABECERA_CATALOGO.pack(MAGICO_CATALOGO, VERSION_INDICE, ORDEN_BYTES, len(rutas),
+                                          len(tabla_rutas.datos), len(nombres), len(tabla_nombres.datos),
+                                          len(numeros))
+        escribir_columnas(self.ruta_catalogo, cabecera,
+                          [tabla_rutas.desplazamientos, tabla_rutas.datos, huellas,
+                           tabla_nombres.desplazamientos, tabla_nombres.datos, posiciones, numeros])
+        self.modificado = False
+
+
+def principal(argv=None):
+    ap = argparse.ArgumentParser(prog="simbolos.py",
+                                 description="Consultar (o crear) el indice de simbolos de un proyecto.")
+    ap.add_argument("indice", help="directorio del indice")
+    ap.add_argument("nombres", nargs="*", metavar="nombre", help="nombres a buscar")
+    ap.add_argument("--indexar", nargs="+", default=None, metavar="entrada",
+                    help="indexar antes estos archivos, directorios o patrones (solo los que cambiaron)")
+    args = ap.parse_args(argv)
+
+    indice = IndiceSimbolos(args.indice)
+    if args.indexar:
+        from lote import expandir_entradas
+
+        rutas = expandir_entradas(args.indexar)
+        cambiados = 0
+        for ruta in rutas:
+            try:
+                cambiados += indice.indexar_archivo(ruta)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"{ruta}: no se pudo indexar: {e}", file=sys.stderr)
+        indice.podar()
+        indice.guardar()
+        print(f"{len(rutas)} archivos, {cambiados} indexados de nuevo")
+    for nombre in args.nombres:
+        definiciones, llamadas = indice.buscar(nombre)
+        print(f"{nombre}: {len(definiciones)} definiciones, {len(llamadas)} llamadas")
+        for d in definiciones:
+            print(f"  def {d.firma()}  {os.path.relpath(d.ruta)}:{d.linea}:{d.col}")
+        for ll in llamadas:
+            print(f"  llamada con {ll.argumentos} argumentos  {os.path.relpath(ll.ruta)}:{ll.linea}:{ll.col}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from diagnosticos import DestinoMemoria
+from incremental import SesionIncremental
+from parser import analizar_texto
+
+# Ejecutar desde la carpeta ProyectoSintactico: python -m unittest discover tests
+
+TEXTO = """def f(a, b):
+    x = a + b
+    if x > 1:
+        return x
+    return 0
+y = f(1, 2)
+print(y)
+"""
+FRAGMENTOS = ("x", " ", "\n", "    ", ":", "(", ")", "'", "= 1", ",", "\n\n",
+              "if a:\n        pass\n", "def g():\n    pass\n")
+
+
+def completo(texto):
+    destino = DestinoMemoria()
+    analizar_texto(texto, destino)
+    return destino.texto()
+
+
+class PruebasSesionIncremental(unittest.TestCase):
+    def test_editar_a_traves_del_fin_de_linea(self):
+        # desde el final de la linea 2 hasta la columna 1 de la linea 3: une las dos lineas
+        s = SesionIncremental(TEXTO)
+        fin_linea_2 = len(TEXTO.split("\n")[1]) + 1
+        resultado = s.editar(2, fin_linea_2, 3, 1, " ")
+        esperado = TEXTO.replace("a + b\n    if", "a + b     if", 1)
+        self.assertEqual(s.texto, esperado)
+        self.assertEqual(resultado, completo(esperado))
+        # y separarlas de nuevo
+        resultado = s.editar(2, fin_linea_2, 2, fin_linea_2 + 1, "\n")
+        self.assertEqual(s.texto, TEXTO)
+        self.assertEqual(resultado, completo(TEXTO))
+
+    def test_columna_despues_del_salto_de_linea(self):
+        s = SesionIncremental(TEXTO)
+        fin_linea_2 = len(TEXTO.split("\n")[1]) + 1
+        with self.assertRaises(ValueError):
+            s.editar(2, 1, 2, fin_linea_2 + 1, "")
+        with self.assertRaises(ValueError):
+            s.editar(2, 0, 2, 1, "")
+        self.assertEqual(s.texto, TEXTO)
+        self.assertEqual(s.resultado(), completo(TEXTO))
+
+    def test_ediciones_al_azar_igual_que_el_analisis_completo(self):
+        r = random.Random(0)
+        s = SesionIncremental(TEXTO)
+        for _ in range(300):
+            lineas = s.lineas
+            l1 = r.randint(1, len(lineas))
+            l2 = min(len(lineas), l1 + r.choice((0, 0, 1, 2)))
+            largo_1 = len(lineas[l1 - 1].rstrip("\n")) + 1
+            largo_2 = len(lineas[l2 - 1].rstrip("\n")) + 1
+            c1 = r.randint(1, largo_1)
+            c2 = r.randint(1, largo_2) if l2 > l1 else r.randint(c1, largo_1)
+            reemplazo = "".join(r.choice(FRAGMENTOS) for _ in range(r.choice((0, 1, 2))))
+            resultado = s.editar(l1, c1, l2, c2, reemplazo)
+            self.assertEqual(resultado, completo(s.texto))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from diagnosticos import DestinoMemoria
+from parser import analizar_texto
+
+# Ejecutar desde la carpeta ProyectoSintactico: python -m unittest discover tests
+
+
+def semanticos(texto):
+    destino = DestinoMemoria()
+    analizar_texto(texto, destino, semantica=True)
+    return [(d.linea, d.encontrado) for d in destino.errores() if d.tipo == "semantico"]
+
+
+class PruebasSemantica(unittest.TestCase):
+    def test_reasignar_una_funcion_despues_del_def(self):
+        texto = "def g(a, b):\n    return a\ndef f(a):\n    return a\nf = g\nf(1, 2)\n"
+        self.assertEqual(semanticos(texto), [])
+
+    def test_reasignar_una_funcion_antes_del_def(self):
+        texto = "def g(a, b):\n    return a\nf = g\ndef f(a):\n    return a\nf(1, 2)\n"
+        self.assertEqual(semanticos(texto), [])
+
+    def test_llamada_antes_de_reasignar(self):
+        # la llamada esta antes de 'f = g', pero f no tiene una sola aridad en el modulo
+        texto = "def g(a, b):\n    return a\ndef f(a):\n    return a\nf(1, 2)\nf = g\n"
+        self.assertEqual(semanticos(texto), [])
+
+    def test_reasignar_dentro_de_una_funcion(self):
+        texto = ("def g(a, b):\n    return a\n"
+                 "def h():\n    def f(a):\n        return a\n    f(1, 2)\n    f = g\n")
+        self.assertEqual(semanticos(texto), [])
+
+    def test_aridad_distinta_se_informa(self):
+        texto = "def f(a):\n    return a\nf(1, 2)\ndef h():\n    return f()\n"
+        self.assertEqual(semanticos(texto), [(3, "f"), (5, "f")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,359 @@
+import fnmatch
+import glob
+import hashlib
+import os
+import select
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from lote import analizar_ruta
+
+# Modo vigilancia (main.py --vigilar): analiza las entradas una vez y despues vuelve a
+# analizar solo los archivos cuyo contenido cambio. Los cambios llegan por inotify si el
+# sistema lo tiene (Linux, via ctypes) o por sondeo de mtime y tamaño. Una rafaga de
+# guardados se junta hasta que pasan ESPERA_RAFAGA segundos sin eventos; despues se
+# compara la firma (mtime, tamaño) y, si cambio, la huella del contenido, y solo los
+# archivos con otra huella se analizan (en un pool chico si son varios).
+#
+# Las entradas son las de --lote: directorios (recursivos, archivos con 'extension'),
+# patrones glob y rutas sueltas. Las rutas se normalizan con os.path.normpath.
+
+ESPERA_RAFAGA = 0.3
+# una rafaga que no se calma se analiza igual pasado este tiempo
+ESPERA_MAXIMA = 3.0
+# sondeo: el intervalo se duplica mientras no hay cambios, sin bajar de 'costo * FACTOR_SONDEO'
+# (una pasada sobre decenas de miles de archivos no ocupa mas del 1% de la CPU)
+INTERVALO_MINIMO = 0.5
+INTERVALO_MAXIMO = 5.0
+FACTOR_SONDEO = 100
+# inotify: cada cuanto se revisa si hay que detenerse; sin eventos el proceso duerme
+INTERVALO_INACTIVO = 1.0
+TRABAJADORES_VIGILANCIA = 4
+
+# eventos de inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+MASCARA_INOTIFY = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENTO_INOTIFY = struct.Struct("iIII")
+
+# lo que devuelve un observador cuando perdio eventos: hay que revisar todo
+TODOS = None
+
+
+def huella_archivo(ruta):
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.digest()
+
+
+def firma(st):
+    return st.st_mtime_ns, st.st_size
+
+
+# -------------------- entradas --------------------
+def _coincide(ruta, patron):
+    # el patron glob por segmentos ('*' no cruza directorios); con '**', fnmatch de la ruta entera
+    if "**" in patron:
+        return fnmatch.fnmatch(ruta, patron)
+    partes = ruta.split(os.sep)
+    patrones = patron.split(os.sep)
+    return len(partes) == len(patrones) and all(fnmatch.fnmatch(a, p) for a, p in zip(partes, patrones))
+
+
+def _raiz_patron(patron):
+    partes = []
+    for parte in patron.split(os.sep):
+        if glob.has_magic(parte):
+            break
+        partes.append(parte)
+    return os.sep.join(partes) or os.curdir
+
+
+class Entradas:
+    def __init__(self, entradas, extension=".py"):
+        # raices: (directorio, filtro de archivos) que se recorren recursivamente
+        self.raices = []
+        self.sueltos = set()
+        for entrada in entradas:
+            if os.path.isdir(entrada):
+                self.raices.append((os.path.normpath(entrada), lambda ruta: ruta.endswith(extension)))
+            elif glob.has_magic(entrada):
+                patron = os.path.normpath(entrada)
+                self.raices.append((os.path.normpath(_raiz_patron(patron)), partial(_coincide, patron=patron)))
+            else:
+                self.sueltos.add(os.path.normpath(entrada))
+
+    def acepta(self, ruta):
+        if ruta in self.sueltos:
+            return True
+        return any(_dentro(ruta, raiz) and filtro(ruta) for raiz, filtro in self.raices)
+
+    def escanear(self):
+        # ruta -> firma de todos los archivos vigilados que existen
+        firmas = {}
+        for raiz, filtro in self.raices:
+            _recorrer(raiz, filtro, firmas)
+        for ruta in self.sueltos:
+            try:
+                firmas[ruta] = firma(os.stat(ruta))
+            except OSError:
+                pass
+        return firmas
+
+
+def _dentro(ruta, raiz):
+    return raiz == os.curdir and not os.path.isabs(ruta) or ruta.startswith(raiz + os.sep)
+
+
+def _unir(directorio, nombre):
+    return nombre if directorio == os.curdir else os.path.join(directorio, nombre)
+
+
+def _recorrer(raiz, filtro, firmas):
+    pendientes = [raiz]
+    while pendientes:
+        directorio = pendientes.pop()
+        try:
+            it = os.scandir(directorio)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                ruta = _unir(directorio, e.name)
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        pendientes.append(ruta)
+                    elif filtro(ruta) and e.is_file():
+                        firmas[ruta] = firma(e.stat())
+                except OSError:
+                    pass
+
+
+def _directorios(raiz):
+    pendientes = [raiz]
+    while pendientes:
+        directorio = pendientes.pop()
+        yield directorio
+        try:
+            with os.scandir(directorio) as it:
+                pendientes.extend(_unir(directorio, e.name) for e in it if e.is_dir(follow_symlinks=False))
+        except OSError:
+            pass
+
+
+# -------------------- observadores --------------------
+# esperar(timeout) devuelve el conjunto de rutas que pueden haber cambiado (vacio si no
+# paso nada) o TODOS
+
+class ObservadorSondeo:
+    nombre = "sondeo"
+
+    def __init__(self, entradas, detenido):
+        self.entradas = entradas
+        self.detenido = detenido
+        self.firmas = entradas.escanear()
+        self.intervalo = INTERVALO_MINIMO
+
+    def esperar(self, timeout=None):
+        if self.detenido.wait(self.intervalo if timeout is None else timeout):
+            return set()
+        t0 = time.perf_counter()
+        firmas = self.entradas.escanear()
+        costo = time.perf_counter() - t0
+        cambios = {r for r, f in firmas.items() if self.firmas.get(r) != f}
+        cambios.update(r for r in self.firmas if r not in firmas)
+        self.firmas = firmas
+        intervalo = INTERVALO_MINIMO if cambios else min(self.intervalo * 2, INTERVALO_MAXIMO)
+        self.intervalo = max(intervalo, costo * FACTOR_SONDEO)
+        return cambios
+
+    def cerrar(self):
+        pass
+
+
+class ObservadorInotify:
+    nombre = "inotify"
+
+    def __init__(self, entradas, detenido):
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        # AttributeError fuera de Linux: se usa el sondeo
+        self._agregar = libc.inotify_add_watch
+        self._agregar.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._ctypes = ctypes
+        self.entradas = entradas
+        self.detenido = detenido
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        # wd -> (directorio, se vigila recursivamente)
+        self.vigilados = {}
+        try:
+            for raiz, _ in entradas.raices:
+                for directorio in _directorios(raiz):
+                    self._vigilar(directorio, True)
+            for ruta in entradas.sueltos:
+                padre = os.path.dirname(ruta) or os.curdir
+                if os.path.isdir(padre):
+                    self._vigilar(padre, False)
+        except OSError:
+            # p.ej. ENOSPC: se supero fs.inotify.max_user_watches
+            self.cerrar()
+            raise
+
+    def _vigilar(self, directorio, recursivo):
+        wd = self._agregar(self.fd, os.fsencode(directorio), MASCARA_INOTIFY)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directorio)
+        anterior = self.vigilados.get(wd)
+        self.vigilados[wd] = (directorio, recursivo or (anterior is not None and anterior[1]))
+
+    def esperar(self, timeout=None):
+        listos, _, _ = select.select([self.fd], [], [], INTERVALO_INACTIVO if timeout is None else timeout)
+        if not listos:
+            return set()
+        cambios = set()
+        while True:
+            try:
+                datos = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return cambios
+            k = 0
+            while k < len(datos):
+                wd, mascara, _, largo = EVENTO_INOTIFY.unpack_from(datos, k)
+                nombre = os.fsdecode(datos[k + EVENTO_INOTIFY.size:k + EVENTO_INOTIFY.size + largo].rstrip(b"\0"))
+                k += EVENTO_INOTIFY.size + largo
+                if mascara & IN_Q_OVERFLOW:
+                    return TODOS
+                if mascara & IN_IGNORED:
+                    self.vigilados.pop(wd, None)
+                    continue
+                if wd not in self.vigilados or mascara & IN_DELETE_SELF:
+                    continue
+                directorio, recursivo = self.vigilados[wd]
+                ruta = _unir(directorio, nombre)
+                if not mascara & IN_ISDIR:
+                    if self.entradas.acepta(ruta):
+                        cambios.add(ruta)
+                elif mascara & (IN_CREATE | IN_MOVED_TO) and recursivo:
+                    # un directorio nuevo: se vigila y sus archivos cuentan como cambiados
+                    firmas = {}
+                    for raiz, filtro in self.entradas.raices:
+                        if _dentro(ruta, raiz):
+                            _recorrer(ruta, filtro, firmas)
+                    for d in _directorios(ruta):
+                        self._vigilar(d, True)
+                    cambios.update(firmas)
+                elif recursivo:
+                    # un directorio borrado o movido afuera: sus archivos desaparecen sin aviso
+                    return TODOS
+
+    def cerrar(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+# -------------------- vigilancia --------------------
+class Vigilante:
+    def __init__(self, entradas, trabajadores=None, espera=ESPERA_RAFAGA, sondeo=False, extension=".py",
+                 **opciones):
+        # opciones: las de lote.analizar_ruta (dir_salida, mostrar_conjuntos, recuperar, ...)
+        self.entradas = Entradas(entradas, extension)
+        self.trabajadores = trabajadores or min(TRABAJADORES_VIGILANCIA, os.cpu_count() or 1)
+        self.espera = espera
+        self.trabajo = partial(analizar_ruta, **opciones)
+        self.detenido = threading.Event()
+        self.observador = None
+        if not sondeo:
+            try:
+                self.observador = ObservadorInotify(self.entradas, self.detenido)
+            except (AttributeError, OSError):
+                pass
+        if self.observador is None:
+            self.observador = ObservadorSondeo(self.entradas, self.detenido)
+        self.firmas = {}
+        self.huellas = {}
+        self._pool = None
+
+    def iniciar(self):
+        # analiza todas las entradas; devuelve los resultados en orden
+        return list(self._procesar(self.entradas.escanear()))
+
+    def vigilar(self, reportar, fin_rafaga=None):
+        # llama a reportar(resultado) por cada archivo analizado de nuevo (el dict de
+        # lote.analizar_ruta) o borrado ({"archivo": ..., "eliminado": True}) hasta detener();
+        # fin_rafaga() (si se da) despues de los resultados de cada rafaga
+        try:
+            while not self.detenido.is_set():
+                candidatos = self.observador.esperar()
+                if candidatos is not TODOS and not candidatos:
+                    continue
+                limite = time.monotonic() + ESPERA_MAXIMA
+                while candidatos is not TODOS and time.monotonic() < limite:
+                    mas = self.observador.esperar(self.espera)
+                    if mas is not TODOS and not mas:
+                        break
+                    candidatos = TODOS if mas is TODOS else candidatos | mas
+                if candidatos is TODOS:
+                    candidatos = set(self.firmas) | set(self.entradas.escanear())
+                for r in self._procesar(candidatos):
+                    reportar(r)
+                if fin_rafaga is not None:
+                    fin_rafaga()
+        finally:
+            self.cerrar()
+
+    def detener(self):
+        self.detenido.set()
+
+    def cerrar(self):
+        self.observador.cerrar()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _procesar(self, candidatos):
+        cambiados = []
+        for ruta in sorted(candidatos):
+            try:
+                actual = firma(os.stat(ruta))
+                if self.firmas.get(ruta) == actual:
+                    continue
+                huella = huella_archivo(ruta)
+            except OSError:
+                if self.firmas.pop(ruta, None) is not None:
+                    del self.huellas[ruta]
+                    yield {"archivo": ruta, "eliminado": True}
+                continue
+            self.firmas[ruta] = actual
+            # guardar sin cambios (o tocar el archivo) no vuelve a analizar
+            if self.huellas.get(ruta) != huella:
+                self.huellas[ruta] = huella
+                cambiados.append(ruta)
+        yield from self._analizar(cambiados)
+
+    def _analizar(self, rutas):
+        if self.trabajadores == 1 or len(rutas) <= 1:
+            yield from map(self.trabajo, rutas)
+            return
+        # el pool se crea con la primera rafaga de varios archivos y queda inactivo entre rafagas
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.trabajadores)
+        yield from self._pool.map(self.trabajo, rutas, chunksize=max(1, len(rutas) // (self.trabajadores * 4)))